@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Load test for the local Copilot metrics query server (--serve).
+
+Generates a synthetic export directory (or uses an existing one), starts the
+server in-process, and issues a mix of paginated, user-filtered and
+aggregated queries from concurrent clients. Reports throughput and
+p50/p99 latency.
+
+Usage:
+    python benchmarks/load_test_server.py --users 10000 --days 28 --concurrency 16 --requests 2000
+    python benchmarks/load_test_server.py --export-dir data
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from dashboard_scraper.copilot_aggregator import (  # noqa: E402
+    AggregationWindow,
+    aggregate_windows,
+    write_aggregated_json,
+)
+from dashboard_scraper.copilot_converter import convert_csv_row_to_copilot_json, write_copilot_json  # noqa: E402
+from dashboard_scraper.server import make_server  # noqa: E402
+from dashboard_scraper.store import MetricsStore  # noqa: E402
+
+ENTERPRISE_ID = "283613"
+
+
+def generate_dataset(export_dir: Path, num_users: int, num_days: int) -> list[str]:
+    """Write synthetic daily and aggregated Copilot files; return the user logins."""
+    rng = random.Random(42)
+    end = date(2025, 10, 28)
+    start = end - timedelta(days=num_days - 1)
+    daily_dir = export_dir / f"daily_exports_{start}_to_{end}"
+    users = [f"user{i:06d}@example.com" for i in range(num_users)]
+
+    daily = {}
+    for offset in range(num_days):
+        day = (start + timedelta(days=offset)).isoformat()
+        records = []
+        for user in users:
+            row = {
+                "User": user,
+                "Completions": rng.randint(0, 50),
+                "Accepted Completions": rng.randint(0, 20),
+                "Chat Messages": rng.randint(0, 10),
+                "Agent Messages": rng.randint(0, 10),
+                "Completion Lines of Code": rng.randint(0, 200),
+            }
+            records.append(convert_csv_row_to_copilot_json(row, str(start), str(end), ENTERPRISE_ID))
+        write_copilot_json(records, daily_dir / f"copilot_metrics_{day}.json")
+        daily[day] = records
+
+    window = AggregationWindow("all", str(start), str(end))
+    write_aggregated_json(aggregate_windows(daily, [window])["all"], daily_dir / "copilot_metrics_aggregated.json")
+    return users
+
+
+def run_load(base_url: str, users: list[str], days: list[str], concurrency: int, total: int) -> dict:
+    rng = random.Random(7)
+    prefix = f"{base_url}/enterprises/{ENTERPRISE_ID}/copilot/metrics/users"
+
+    def make_url() -> str:
+        kind = rng.random()
+        if kind < 0.4:
+            a, b = sorted(rng.sample(days, 2)) if len(days) > 1 else (days[0], days[0])
+            return f"{prefix}?since={a}&until={b}&per_page=100"
+        if kind < 0.8:
+            return f"{prefix}?user={rng.choice(users)}"
+        return f"{prefix}/aggregated?per_page=100&user={rng.choice(users)}"
+
+    urls = [make_url() for _ in range(total)]
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def fetch(url: str) -> None:
+        nonlocal errors
+        req = urllib.request.Request(url, headers={"Accept-Encoding": "gzip"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                body = resp.read()
+                if resp.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                json.loads(body)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fetch, urls))
+    wall = time.perf_counter() - t_start
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) >= 2 else latencies * 99
+    return {
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(total / wall, 1) if wall else 0.0,
+        "p50_ms": round(quantiles[49] * 1000, 2) if quantiles else None,
+        "p99_ms": round(quantiles[98] * 1000, 2) if quantiles else None,
+    }
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Load test the local Copilot metrics server")
+    p.add_argument("--export-dir", help="Existing export directory to serve (default: generate synthetic data)")
+    p.add_argument("--users", type=int, default=2000, help="Synthetic users per day")
+    p.add_argument("--days", type=int, default=28, help="Synthetic days")
+    p.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    p.add_argument("--requests", type=int, default=2000, help="Total requests to issue")
+    p.add_argument("--cache-windows", type=int, default=32, help="Store LRU size")
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.export_dir:
+            export_dir = Path(args.export_dir)
+        else:
+            export_dir = Path(tmp)
+            print(f"Generating {args.users} users x {args.days} days ...")
+            generate_dataset(export_dir, args.users, args.days)
+
+        store = MetricsStore(export_dir, cache_size=args.cache_windows)
+        days = store.available_days()
+        users = sorted(store.query_days(None, None).by_user) or ["nobody@example.com"]
+
+        server = make_server(store, "127.0.0.1", 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+            result = run_load(base_url, users, days, args.concurrency, args.requests)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark with stored baselines.
+
+Times each stage of the 28-day pipeline against the local synthetic API
+(dashboard_scraper.fake_server) at several user-count scales:
+
+    fetch       DashboardClient.fetch_endpoint for one day of user stats
+    format      DashboardClient._format_user_stats over the fetched records
+    write_csv   export.write_csv of the formatted rows
+    convert     copilot_converter.convert_csv_to_copilot_json
+    aggregate   copilot_aggregator.aggregate_daily_json_files over --days files
+    pipeline    daily_metrics.process_last_28_days over --days days
+
+Each stage reports wall time (best of --repeat), records/sec and peak traced
+memory (a separate tracemalloc pass, so timings are not distorted).
+
+With --replay the API is answered from a cassette recorded with
+``python -m dashboard_scraper --record ...`` instead of the synthetic server,
+so the stages run on production-shaped payloads without network access.
+Requests are matched on endpoint path only, so any recorded day serves the
+benchmark dates.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py --scales 100,1000,10000 --output benchmarks/baseline.json
+    python benchmarks/pipeline_benchmark.py --compare benchmarks/baseline.json --threshold 0.25
+    python benchmarks/pipeline_benchmark.py --replay cassettes/prod.cassette.jsonl.gz --output replay_baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from dashboard_scraper.client import DashboardClient  # noqa: E402
+from dashboard_scraper.config import Settings  # noqa: E402
+from dashboard_scraper.copilot_aggregator import aggregate_daily_json_files  # noqa: E402
+from dashboard_scraper.copilot_converter import convert_csv_to_copilot_json  # noqa: E402
+from dashboard_scraper.cookie_auth import CookieAuth  # noqa: E402
+from dashboard_scraper.daily_metrics import process_last_28_days  # noqa: E402
+from dashboard_scraper.export import write_csv  # noqa: E402
+from dashboard_scraper.http import HTTPClient  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+BENCH_DAY = datetime(2025, 10, 28, tzinfo=timezone.utc)
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, int, Any]:
+    """Return (best wall seconds, peak traced bytes, last result) for ``fn``."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+@contextlib.contextmanager
+def fake_api(num_users: int, extra_args: Sequence[str] = ()):
+    """Run the synthetic API in a subprocess so it does not share this process's CPU or traced memory."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [sys.path[0], os.environ.get("PYTHONPATH")])))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "dashboard_scraper.fake_server", "--users", str(num_users), "--port", str(port),
+         *extra_args],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("fake API server failed to start")
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}/"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def bench_scale(
+    num_days: int,
+    repeat: int,
+    workdir: Path,
+    base_url: str,
+    cassette: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    cookie_file = workdir / "cookies.json"
+    cookie_file.write_text(json.dumps({"_session": "bench"}))
+    replay: Dict[str, Any] = {}
+    if cassette:
+        replay = {"cassette_mode": "replay", "cassette_file": cassette, "cassette_match_query": False}
+    settings = Settings(
+        metrics_api_base_url=base_url,
+        scrape_endpoints="user_stats",
+        export_dir=str(workdir / "export"),
+        _env_file=None,
+        **replay,
+    )
+    client = DashboardClient(settings, HTTPClient(settings, cookie_auth=CookieAuth(cookie_file)))
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def record(stage: str, seconds: float, peak: int, items: int) -> None:
+        results[stage] = {
+            "seconds": round(seconds, 6),
+            "items": items,
+            "items_per_second": round(items / seconds, 1) if seconds > 0 else None,
+            "peak_memory_bytes": peak,
+        }
+
+    day_end = BENCH_DAY.replace(hour=23, minute=59, second=59)
+    seconds, peak, data = measure(
+        lambda: client.fetch_endpoint(settings.user_feature_stats_endpoint, BENCH_DAY, day_end), repeat)
+    raw = data.get("userFeatureStats", [])
+    record("fetch", seconds, peak, len(raw))
+
+    seconds, peak, rows = measure(lambda: [client._format_user_stats(r) for r in raw], repeat)
+    record("format", seconds, peak, len(rows))
+
+    csv_dir = workdir / "csv"
+    seconds, peak, csv_path = measure(lambda: write_csv(rows, csv_dir, "bench.csv"), repeat)
+    record("write_csv", seconds, peak, len(rows))
+
+    json_path = workdir / "bench.json"
+    seconds, peak, converted = measure(
+        lambda: convert_csv_to_copilot_json(csv_path, json_path, "2025-10-01", "2025-10-28"), repeat)
+    record("convert", seconds, peak, converted)
+
+    json_files: List[Path] = []
+    for i in range(num_days):
+        day_file = workdir / f"copilot_metrics_{i:02d}.json"
+        shutil.copyfile(json_path, day_file)
+        json_files.append(day_file)
+    seconds, peak, _ = measure(
+        lambda: aggregate_daily_json_files(json_files, workdir / "aggregated.json", "2025-10-01", "2025-10-28"),
+        repeat)
+    record("aggregate", seconds, peak, converted * num_days)
+
+    start = BENCH_DAY - timedelta(days=num_days - 1)
+
+    def run_pipeline() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_last_28_days(client, settings, start, day_end)
+
+    seconds, peak, _ = measure(run_pipeline, 1)
+    record("pipeline", seconds, peak, len(raw) * num_days)
+
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List regressions where throughput dropped or peak memory grew by more than ``threshold``."""
+    regressions: List[str] = []
+    for scale, stages in current["scales"].items():
+        base_stages = baseline.get("scales", {}).get(scale)
+        if not base_stages:
+            continue
+        for stage, now in stages.items():
+            before = base_stages.get(stage)
+            if not before:
+                continue
+            if before.get("items_per_second") and now.get("items_per_second"):
+                drop = 1 - now["items_per_second"] / before["items_per_second"]
+                if drop > threshold:
+                    regressions.append(
+                        f"{scale} users / {stage}: throughput {now['items_per_second']:.0f}/s "
+                        f"vs baseline {before['items_per_second']:.0f}/s ({drop:.0%} slower)")
+            if before.get("peak_memory_bytes") and now.get("peak_memory_bytes"):
+                growth = now["peak_memory_bytes"] / before["peak_memory_bytes"] - 1
+                if growth > threshold:
+                    regressions.append(
+                        f"{scale} users / {stage}: peak memory {now['peak_memory_bytes'] / 1e6:.1f} MB "
+                        f"vs baseline {before['peak_memory_bytes'] / 1e6:.1f} MB ({growth:.0%} more)")
+    return regressions
+
+
+def print_table(report: Dict[str, Any]) -> None:
+    print(f"{'users':>8} {'stage':<10} {'seconds':>10} {'items/s':>12} {'peak MB':>9}")
+    for scale, stages in report["scales"].items():
+        for stage, r in stages.items():
+            rate = f"{r['items_per_second']:.0f}" if r["items_per_second"] else "-"
+            print(f"{scale:>8} {stage:<10} {r['seconds']:>10.4f} {rate:>12} {r['peak_memory_bytes'] / 1e6:>9.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark each stage of the metrics pipeline")
+    p.add_argument("--scales", default="100,1000,10000", help="Comma-separated synthetic user counts")
+    p.add_argument("--days", type=int, default=7, help="Days for the aggregate and full-pipeline stages")
+    p.add_argument("--repeat", type=int, default=3, help="Timed repetitions per stage (best is kept)")
+    p.add_argument("--output", help=f"Write results as a baseline JSON file (e.g. {DEFAULT_BASELINE.name})")
+    p.add_argument("--compare", metavar="BASELINE", help="Compare against a baseline and fail on regressions")
+    p.add_argument("--replay", metavar="CASSETTE",
+                   help="Serve the API from a recorded cassette instead of the synthetic server (--scales is ignored)")
+    p.add_argument("--threshold", type=float, default=0.25,
+                   help="Allowed relative throughput drop / memory growth before flagging (default 0.25)")
+    args = p.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    scales = [] if args.replay else [int(s) for s in args.scales.split(",") if s.strip()]
+
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "days": args.days,
+        "scales": {},
+    }
+    if args.replay:
+        # Replayed responses never touch the network; the host is only used to build URLs
+        print(f"Benchmarking replay of {args.replay} ...", file=sys.stderr)
+        report["cassette"] = Path(args.replay).name
+        with tempfile.TemporaryDirectory() as tmp:
+            report["scales"]["replay"] = bench_scale(
+                args.days, args.repeat, Path(tmp), "http://replay.invalid/", cassette=args.replay)
+    for num_users in scales:
+        print(f"Benchmarking {num_users} users ...", file=sys.stderr)
+        with tempfile.TemporaryDirectory() as tmp, fake_api(num_users) as base_url:
+            report["scales"][str(num_users)] = bench_scale(args.days, args.repeat, Path(tmp), base_url)
+
+    print_table(report)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark.
+
+Sends the same number of requests from 1, 2, 4, ... threads sharing one
+HTTPClient against the local synthetic API (dashboard_scraper.fake_server,
+with simulated latency), and reports throughput and how many requests
+opened a new connection versus reused a pooled one, for several pool
+configurations. Requests are sent in rounds of one request per thread, the
+way a batch of days is fetched, so every round returns all its connections
+to the pool at once:
+
+    undersized  HTTP_POOL_MAXSIZE=2: connections beyond 2 are discarded at
+                the end of every round and reopened in the next (churn)
+    sized       HTTP_POOL_MAXSIZE equal to the number of threads
+    no-keepalive HTTP_KEEP_ALIVE=false: a new connection for every request
+
+Usage:
+    python benchmarks/pool_benchmark.py --concurrency 1,4,16 --requests 200 --latency-ms 20
+    python benchmarks/pool_benchmark.py --output pool_results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from dashboard_scraper.client import DashboardClient  # noqa: E402
+from dashboard_scraper.config import Settings  # noqa: E402
+from dashboard_scraper.cookie_auth import CookieAuth  # noqa: E402
+from dashboard_scraper.http import HTTPClient  # noqa: E402
+from pipeline_benchmark import BENCH_DAY, fake_api  # noqa: E402
+
+
+def pool_configs(threads: int) -> Dict[str, Dict[str, Any]]:
+    return {
+        "undersized": {"http_pool_maxsize": 2},
+        "sized": {"http_pool_maxsize": threads},
+        "no-keepalive": {"http_pool_maxsize": threads, "http_keep_alive": False},
+    }
+
+
+def bench(base_url: str, cookie_file: Path, threads: int, total: int, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    settings = Settings(metrics_api_base_url=base_url, _env_file=None, **overrides)
+    http = HTTPClient(settings, cookie_auth=CookieAuth(cookie_file))
+    client = DashboardClient(settings, http)
+    day_end = BENCH_DAY.replace(hour=23, minute=59, second=59)
+
+    def fetch(_: int) -> None:
+        client.fetch_endpoint(settings.tenant_feature_stats_endpoint, BENCH_DAY, day_end)
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            for _ in range(max(1, total // threads)):
+                list(pool.map(fetch, range(threads)))
+        seconds = time.perf_counter() - started
+    finally:
+        http.close()
+    return {
+        "seconds": round(seconds, 4),
+        "requests_per_second": round(max(1, total // threads) * threads / seconds, 1),
+        "connections_opened": http.connections_opened,
+        "connections_reused": http.connections_reused,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark HTTP connection pool settings at several concurrency levels")
+    p.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated thread counts")
+    p.add_argument("--requests", type=int, default=200, help="Requests per run")
+    p.add_argument("--latency-ms", type=int, default=20, help="Simulated server latency per request")
+    p.add_argument("--output", help="Write the results as JSON")
+    args = p.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    # Threads beyond an undersized pool make urllib3 warn for every discarded connection
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
+
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "requests": args.requests,
+        "latency_ms": args.latency_ms,
+        "results": [],
+    }
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    print(f"{'threads':>7} {'pool':<13} {'seconds':>8} {'req/s':>8} {'opened':>7} {'reused':>7}")
+    with tempfile.TemporaryDirectory() as tmp, fake_api(10, ["--latency-ms", str(args.latency_ms)]) as base_url:
+        cookie_file = Path(tmp) / "cookies.json"
+        cookie_file.write_text(json.dumps({"_session": "bench"}))
+        for threads in levels:
+            for name, overrides in pool_configs(threads).items():
+                r = bench(base_url, cookie_file, threads, args.requests, overrides)
+                report["results"].append({"threads": threads, "pool": name, **r})
+                print(f"{threads:>7} {name:<13} {r['seconds']:>8.3f} {r['requests_per_second']:>8.1f} "
+                      f"{r['connections_opened']:>7} {r['connections_reused']:>7}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
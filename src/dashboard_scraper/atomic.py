@@ -0,0 +1,88 @@
+"""
+Crash-safe file writes.
+
+``atomic_write`` writes to a temporary file next to the target and renames
+it over the target only once the block completes, so readers (and the next
+run) see either the old file or the complete new one, never a truncated
+file. With ``keep_unchanged=True`` the existing file is left untouched
+(same mtime) when the new content is byte-identical, so sync tools see
+fewer modified files.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+
+def _same_content(a: Path, b: Path, chunk_size: int = 1 << 13) -> bool:
+    if a.stat().st_size != b.stat().st_size:
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        while True:
+            chunk = fa.read(chunk_size)
+            if chunk != fb.read(chunk_size):
+                return False
+            if not chunk:
+                return True
+
+
+def _temp_path(path: Path) -> Path:
+    # Unique per process and thread, so concurrent writers of one file never share it
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+@contextmanager
+def atomic_write(
+    path: Path,
+    mode: str = "w",
+    encoding: Optional[str] = "utf-8",
+    newline: Optional[str] = None,
+    fsync: bool = False,
+    keep_unchanged: bool = False,
+) -> Iterator[IO[Any]]:
+    """
+    Open a temporary file for writing and atomically replace ``path`` with it on success.
+
+    If the block raises, the temporary file is removed and ``path`` is left
+    as it was.
+
+    Args:
+        path: File to write
+        mode: "w" (text) or "wb" (binary)
+        encoding: Text encoding (ignored in binary mode)
+        newline: Passed to open() in text mode (e.g. "" for csv)
+        fsync: fsync the file before renaming it into place
+        keep_unchanged: Keep the existing file if the new content is identical
+
+    Yields:
+        The open temporary file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _temp_path(path)
+    binary = "b" in mode
+    try:
+        with open(tmp, mode, encoding=None if binary else encoding, newline=None if binary else newline) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if keep_unchanged and path.exists() and _same_content(tmp, path):
+            tmp.unlink()
+            return
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_text_atomic(path: Path, text: str, keep_unchanged: bool = False) -> None:
+    """Write ``text`` (UTF-8) to ``path`` atomically."""
+    with atomic_write(path, keep_unchanged=keep_unchanged) as f:
+        f.write(text)
@@ -0,0 +1,231 @@
+"""
+Record and replay HTTP traffic through a cassette file.
+
+A cassette is gzip-compressed JSON Lines: a header line followed by one
+line per HTTP exchange::
+
+    {"cassette": 1, "created_at": "..."}
+    {"method": "GET", "url": "/api/user-feature-stats?startDate=...",
+     "status": 200, "reason": "OK", "headers": {...}, "latency": 0.153,
+     "body": "..."}                      # or "body_b64" for non-UTF-8 bodies
+
+URLs are stored without scheme and host, so a cassette recorded against one
+base URL replays against any other. Bodies are stored decoded (after any
+Content-Encoding), so replayed responses carry no Content-Encoding.
+Request headers are not recorded, and response headers that carry
+credentials (``Set-Cookie``) are dropped, so cassettes can be shared
+without leaking session tokens.
+
+Both modes are requests transport adapters mounted on a session:
+``RecordingAdapter`` performs real requests and appends every exchange
+(including retried error responses) to the cassette; ``ReplayAdapter``
+answers from the cassette without touching the network, optionally
+sleeping for the recorded latency.
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import io
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("record", "replay")
+
+# Headers that describe the wire encoding rather than the stored body
+_WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+# Headers that would put session tokens into a cassette file
+_SECRET_HEADERS = {"set-cookie", "cookie", "authorization"}
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recorded exchange matches a request."""
+
+
+def _request_key(method: str, url: str, match_query: bool = True) -> Tuple[str, str]:
+    parts = urlsplit(url)
+    path = "/" + parts.path.lstrip("/")
+    if match_query and parts.query:
+        path += "?" + parts.query
+    return method.upper(), path
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, path: Path, **kwargs: Any) -> None:
+        """
+        Initialize a recording adapter that appends to ``path``.
+
+        Args:
+            path: Cassette file to create (an existing file is replaced)
+            **kwargs: Passed to requests' HTTPAdapter
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.recorded = 0
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        header = {"cassette": CASSETTE_VERSION, "created_at": datetime.now(timezone.utc).isoformat()}
+        self._file.write(json.dumps(header) + "\n")
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        started = time.perf_counter()
+        resp = super().send(request, **kwargs)
+        body = resp.content  # Reads the body so the latency covers the full transfer
+        latency = time.perf_counter() - started
+
+        entry: Dict[str, Any] = {
+            "method": request.method,
+            "url": _request_key(request.method or "GET", request.url or "")[1],
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": {k: v for k, v in resp.headers.items()
+                        if k.lower() not in _WIRE_HEADERS and k.lower() not in _SECRET_HEADERS},
+            "latency": round(latency, 6),
+        }
+        try:
+            entry["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(body).decode("ascii")
+
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                self.recorded += 1
+        return resp
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info("Recorded %d HTTP exchanges to %s", self.recorded, self.path)
+        super().close()
+
+
+def load_cassette(path: Path) -> List[Dict[str, Any]]:
+    """Read every recorded exchange from a cassette file."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("cassette") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette file: {path}")
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, path: Path, latency_scale: float = 0.0, match_query: bool = True) -> None:
+        """
+        Initialize a replay adapter from a cassette.
+
+        Exchanges recorded for the same request are served in recorded order
+        (so a 503 followed by a 200 replays as such); once exhausted, the
+        sequence starts over.
+
+        Args:
+            path: Cassette file to replay
+            latency_scale: Multiplier for the recorded latency slept before
+                each response (0 replays as fast as possible)
+            match_query: Match on path and query string; when False only the
+                path is matched, so any date range is answered by the
+                recorded responses for that endpoint in rotation
+        """
+        super().__init__()
+        self.path = path
+        self.latency_scale = latency_scale
+        self.match_query = match_query
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._recorded: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for entry in load_cassette(path):
+            self._recorded[_request_key(entry["method"], entry["url"], match_query)].append(entry)
+        self._pending: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+        logger.info("Loaded %d recorded requests from %s", sum(map(len, self._recorded.values())), path)
+
+    def _next_entry(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            recorded = self._recorded.get(key)
+            if not recorded:
+                return None
+            pending = self._pending.get(key)
+            if not pending:
+                pending = self._pending[key] = deque(recorded)
+            self.replayed += 1
+            return pending.popleft()
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        key = _request_key(request.method or "GET", request.url or "", self.match_query)
+        entry = self._next_entry(key)
+        if entry is None:
+            raise CassetteMissError(f"No recorded response for {key[0]} {key[1]} in {self.path}")
+
+        if self.latency_scale > 0:
+            time.sleep(entry["latency"] * self.latency_scale)
+
+        if "body_b64" in entry:
+            body = base64.b64decode(entry["body_b64"])
+        else:
+            body = entry["body"].encode("utf-8")
+
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = entry.get("reason", "")
+        resp.headers = CaseInsensitiveDict(entry["headers"])
+        resp.headers["Content-Length"] = str(len(body))
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        # Served from a file-like object, so stream=True callers can read incrementally
+        resp.raw = io.BytesIO(body)
+        resp.url = request.url or ""
+        resp.request = request
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+def mount_cassette(
+    session: requests.Session,
+    mode: str,
+    path: Path,
+    latency_scale: float = 0.0,
+    match_query: bool = True,
+    **adapter_kwargs: Any,
+) -> RecordingAdapter | ReplayAdapter:
+    """
+    Mount a recording or replaying adapter on ``session`` for http and https.
+
+    Args:
+        session: Session to mount on
+        mode: "record" or "replay"
+        path: Cassette file
+        latency_scale: Replay only; see ReplayAdapter
+        match_query: Replay only; see ReplayAdapter
+        **adapter_kwargs: Record only; passed to requests' HTTPAdapter (pool sizing)
+
+    Returns:
+        The mounted adapter (close it to finish a recording)
+    """
+    adapter: RecordingAdapter | ReplayAdapter
+    if mode == "record":
+        adapter = RecordingAdapter(path, **adapter_kwargs)
+    elif mode == "replay":
+        adapter = ReplayAdapter(path, latency_scale=latency_scale, match_query=match_query)
+    else:
+        raise ValueError(f"Unknown cassette mode '{mode}'. Expected one of: {', '.join(CASSETTE_MODES)}")
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
@@ -1,21 +1,135 @@
 from __future__ import annotations
 
+import contextvars
 import logging
-from datetime import datetime
-from typing import Any, Dict, Iterator, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from urllib.parse import quote
 import json
 
+import requests
+
 from .config import Settings
-from .http import HTTPClient
+from .http import CircuitOpenError, HTTPClient
+from .json_stream import iter_array_items
+from .tracing import current_span, get_tracer
 
 logger = logging.getLogger(__name__)
 
+DateRange = Tuple[datetime, datetime]
+
+
+class IncompleteStreamError(Exception):
+    """Raised when a streamed response fails after some of its records were already yielded."""
+    pass
+
+
+def range_days(start: datetime, end: datetime) -> int:
+    """Number of calendar days in the inclusive range (the API only sees dates)."""
+    return (end.date() - start.date()).days + 1
+
+
+def split_range(start: datetime, end: datetime) -> Tuple[DateRange, DateRange]:
+    """
+    Split an inclusive day range into two non-overlapping halves.
+
+    Args:
+        start: First day of the range
+        end: Last day of the range (at least one day after start)
+
+    Returns:
+        ((start, end of the first half), (start of the second half, end))
+    """
+    half = range_days(start, end) // 2
+    left_end = (start + timedelta(days=half - 1)).replace(hour=23, minute=59, second=59, microsecond=999999)
+    right_start = (start + timedelta(days=half)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (start, left_end), (right_start, end)
+
+
+def _should_split(error: requests.RequestException) -> bool:
+    """Timeouts, dropped connections and 5xx suggest the range is too big; 4xx, 429 and an open circuit do not."""
+    if isinstance(error, CircuitOpenError):
+        # Nothing was sent; smaller ranges would be skipped the same way
+        return False
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code >= 500
+    return isinstance(error, (requests.Timeout, requests.ConnectionError, requests.exceptions.ChunkedEncodingError))
+
+
+def _timed(chunks: Iterator[bytes], total: List[float]) -> Iterator[bytes]:
+    """Pass ``chunks`` through, adding the time spent producing them to ``total[0]``."""
+    while True:
+        started = time.perf_counter()
+        chunk = next(chunks, None)
+        total[0] += time.perf_counter() - started
+        if chunk is None:
+            return
+        yield chunk
+
+
+def merge_user_stats(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge user-stats responses for two adjacent date ranges.
+
+    Records are matched on userEmail. Numeric counters are summed,
+    firstSeen/lastSeen take the earliest/latest value and the acceptance
+    rate is recomputed from the summed completions.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for data in (left, right):
+        for record in data.get("userFeatureStats") or []:
+            email = record.get("userEmail", "")
+            current = merged.get(email)
+            if current is None:
+                merged[email] = dict(record)
+                continue
+            for key, value in record.items():
+                old = current.get(key)
+                if key == "firstSeen":
+                    current[key] = min(filter(None, (old, value)), default=old)
+                elif key == "lastSeen":
+                    current[key] = max(filter(None, (old, value)), default=old)
+                elif key == "acceptanceRatePercentage":
+                    continue
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    current[key] = (old or 0) + value
+                elif old is None:
+                    current[key] = value
+            completions = current.get("totalCompletionsInTimePeriod") or 0
+            accepted = current.get("acceptedCompletionsInTimePeriod") or 0
+            current["acceptanceRatePercentage"] = round(100.0 * accepted / completions, 2) if completions else None
+    return {"userFeatureStats": list(merged.values())}
+
+
+def merge_counters(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge two responses whose numeric fields are additive over days (e.g. tenant stats)."""
+    merged = dict(left)
+    for key, value in right.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            merged[key] = (merged.get(key) or 0) + value
+        else:
+            merged.setdefault(key, value)
+    return merged
+
+
+# Endpoints whose responses can be rebuilt from the two halves of a range.
+# MAU is a distinct count and cannot be merged, so it is never split.
+RANGE_MERGERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = {
+    "user_stats": merge_user_stats,
+    "tenant_stats": merge_counters,
+}
+
 
 class DashboardClient:
     def __init__(self, settings: Settings, http: HTTPClient) -> None:
         self.s = settings
         self.http = http
+        # Threads (besides the caller's) available for fetching split halves concurrently
+        workers = self.s.range_split_workers - 1
+        self._split_slots = threading.BoundedSemaphore(workers) if workers > 0 else None
 
     def _format_date_param(self, dt: datetime) -> str:
         """
@@ -37,7 +151,13 @@ class DashboardClient:
         end_param = self._format_date_param(end)
         return f"{base_url}{endpoint}?startDate={start_param}&endDate={end_param}"
 
-    def fetch_endpoint(self, endpoint: str, start: datetime, end: datetime) -> Dict[str, Any]:
+    def fetch_endpoint(
+        self,
+        endpoint: str,
+        start: datetime,
+        end: datetime,
+        retry_timeouts: bool = True
+    ) -> Dict[str, Any]:
         """
         Fetch data from a specific endpoint.
 
@@ -45,17 +165,134 @@ class DashboardClient:
             endpoint: The API endpoint path (e.g., "/api/user-feature-stats")
             start: Start date
             end: End date
+            retry_timeouts: Retry the request if it times out
 
         Returns:
             The JSON response from the API
         """
         url = self._build_url(endpoint, start, end)
-        logger.info("Fetching %s", url)
-        resp = self.http.request("GET", url)
-        data = resp.json()
-        logger.info("Fetched data from %s", endpoint)
+        logger.debug("Fetching %s", url)
+        attributes = {"endpoint": endpoint, "start": start.date().isoformat(), "end": end.date().isoformat()}
+        with get_tracer().start_span("fetch_endpoint", attributes):
+            resp = self.http.request("GET", url, retry_timeouts=retry_timeouts)
+            data = resp.json()
+        logger.debug("Fetched data from %s", endpoint)
         return data
 
+    def _can_split(self, name: str, start: datetime, end: datetime) -> bool:
+        return self.s.range_split and name in RANGE_MERGERS and range_days(start, end) > 1
+
+    def fetch_range(self, name: str, endpoint: str, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Fetch an endpoint for a date range, bisecting the range if the call keeps failing.
+
+        When a mergeable endpoint (see RANGE_MERGERS) times out or still
+        returns 5xx after the HTTP retries, the range is split in two, each
+        half is fetched the same way (recursively, and concurrently when
+        RANGE_SPLIT_WORKERS > 1) and the halves are merged. Timeouts of a
+        splittable range are not retried, since the same request would
+        likely time out again.
+
+        Args:
+            name: Endpoint name from Settings.get_endpoints_to_scrape()
+            endpoint: The API endpoint path
+            start: Start date
+            end: End date
+
+        Returns:
+            The (possibly merged) JSON response
+        """
+        splittable = self._can_split(name, start, end)
+        try:
+            return self.fetch_endpoint(endpoint, start, end, retry_timeouts=not splittable)
+        except requests.RequestException as e:
+            if not splittable or not _should_split(e):
+                raise
+            return self._fetch_split(name, endpoint, start, end, e)
+
+    def _fetch_split(
+        self,
+        name: str,
+        endpoint: str,
+        start: datetime,
+        end: datetime,
+        error: Exception
+    ) -> Dict[str, Any]:
+        (left_start, left_end), (right_start, right_end) = split_range(start, end)
+        logger.warning(
+            "%s failed for %s..%s (%s); splitting into %s..%s and %s..%s",
+            name, start.date(), end.date(), error,
+            left_start.date(), left_end.date(), right_start.date(), right_end.date(),
+        )
+        current_span().add_event("range_split", {"endpoint": endpoint, "days": range_days(start, end),
+                                                 "error": type(error).__name__})
+
+        if self._split_slots is not None and self._split_slots.acquire(blocking=False):
+            try:
+                with ThreadPoolExecutor(max_workers=1, thread_name_prefix="range-split") as pool:
+                    # Copy the context so spans in the worker nest under the current one
+                    future = pool.submit(contextvars.copy_context().run,
+                                         self.fetch_range, name, endpoint, right_start, right_end)
+                    left = self.fetch_range(name, endpoint, left_start, left_end)
+                    right = future.result()
+            finally:
+                self._split_slots.release()
+        else:
+            left = self.fetch_range(name, endpoint, left_start, left_end)
+            right = self.fetch_range(name, endpoint, right_start, right_end)
+        return RANGE_MERGERS[name](left, right)
+
+    def stream_endpoint_items(
+        self,
+        endpoint: str,
+        key: str,
+        start: datetime,
+        end: datetime,
+        retry_timeouts: bool = True
+    ) -> Iterator[Any]:
+        """
+        Stream the elements of one array in an endpoint's JSON response.
+
+        The body is read with ``stream=True`` and decoded incrementally, so
+        only one element is held in memory at a time.
+
+        Args:
+            endpoint: The API endpoint path
+            key: Name of the top-level array (e.g. "userFeatureStats")
+            start: Start date
+            end: End date
+            retry_timeouts: Retry the request if it times out
+
+        Yields:
+            Decoded array elements
+        """
+        url = self._build_url(endpoint, start, end)
+        logger.debug("Streaming %s", url)
+        attributes = {"endpoint": endpoint, "start": start.date().isoformat(), "end": end.date().isoformat()}
+        # The span covers the request up to the response headers. It must not stay
+        # current across the yields below, where the caller's own spans would nest
+        # under it; the body's read time and record count are added once it is read
+        with get_tracer().start_span("fetch_endpoint", attributes) as span:
+            resp = self.http.request("GET", url, stream=True, retry_timeouts=retry_timeouts)
+        count = 0
+        read_seconds = [0.0]
+        try:
+            with resp:
+                body = _timed(self.http.iter_body(resp), read_seconds)
+                for item in iter_array_items(body, key):
+                    count += 1
+                    yield item
+                # Read what follows the closing brace (e.g. the gzip trailer) so the
+                # connection can be reused and the transfer is fully counted
+                for _ in body:
+                    pass
+        except Exception as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.set_attribute("records", count)
+            span.set_attribute("body.read_seconds", round(read_seconds[0], 6))
+
     def _format_user_stats(self, record: Dict[str, Any]) -> Dict[str, Any]:
         """
         Format user stats record to match dashboard table format.
@@ -96,7 +333,12 @@ class DashboardClient:
             "CLI Agent Lines of Code": record.get("cliAgentLinesOfCode", 0),
         }
 
-    def iter_metrics(self, start: datetime, end: datetime) -> Iterator[Dict[str, Any]]:
+    def iter_metrics(
+        self,
+        start: datetime,
+        end: datetime,
+        failed: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
         """
         Fetch metrics from all configured endpoints.
         Yields records formatted for CSV export.
@@ -104,16 +346,43 @@ class DashboardClient:
         Args:
             start: Start date
             end: End date
+            failed: If given, the names of endpoints that failed or were skipped
+                by an open circuit are appended to it
 
         Yields:
             Individual metric records formatted for the dashboard table
+
+        Raises:
+            IncompleteStreamError: If a streamed response fails part way through
+                (other endpoint failures are logged and skipped)
         """
         endpoints = self.s.get_endpoints_to_scrape()
 
         for name, endpoint in endpoints:
-            logger.info("Scraping %s from %s", name, endpoint)
+            logger.debug("Scraping %s from %s", name, endpoint)
             try:
-                data = self.fetch_endpoint(endpoint, start, end)
+                if name == "user_stats" and self.s.stream_json:
+                    # Decode and yield one user at a time instead of buffering the body
+                    count = 0
+                    splittable = self._can_split(name, start, end)
+                    try:
+                        for record in self.stream_endpoint_items(endpoint, "userFeatureStats", start, end,
+                                                                 retry_timeouts=not splittable):
+                            count += 1
+                            yield self._format_user_stats(record)
+                        logger.debug("Streamed %d user records", count)
+                        continue
+                    except Exception as e:
+                        if count:
+                            # Records already yielded can be neither taken back nor merged with a
+                            # split retry, so the whole range fails instead of keeping part of it
+                            raise IncompleteStreamError(
+                                f"{name} response failed after {count} records: {e}") from e
+                        if not isinstance(e, requests.RequestException) or not splittable or not _should_split(e):
+                            raise
+                        data = self._fetch_split(name, endpoint, start, end, e)
+                else:
+                    data = self.fetch_range(name, endpoint, start, end)
 
                 # Handle different response formats based on endpoint
                 if name == "user_stats":
@@ -121,7 +390,7 @@ class DashboardClient:
                     records = data.get("userFeatureStats", [])
                     for record in records:
                         yield self._format_user_stats(record)
-                    logger.info("Fetched %d user records", len(records))
+                    logger.debug("Fetched %d user records", len(records))
 
                 elif name == "tenant_stats":
                     # Tenant stats is a single summary object
@@ -132,7 +401,7 @@ class DashboardClient:
                         "Lines of Code": data.get("linesOfCode", 0),
                     }
                     yield summary
-                    logger.info("Fetched tenant summary")
+                    logger.debug("Fetched tenant summary")
 
                 elif name == "tenant_mau":
                     # MAU is a single value
@@ -141,7 +410,7 @@ class DashboardClient:
                         "Value": data.get("monthlyActiveUsers", 0),
                     }
                     yield mau
-                    logger.info("Fetched MAU: %d", data.get("monthlyActiveUsers", 0))
+                    logger.debug("Fetched MAU: %d", data.get("monthlyActiveUsers", 0))
 
                 else:
                     # Fallback for unknown endpoints
@@ -159,10 +428,19 @@ class DashboardClient:
                             record["_source"] = name
                             record["_endpoint"] = endpoint
                         yield record
-                    logger.info("Fetched %d records from %s", len(records), name)
+                    logger.debug("Fetched %d records from %s", len(records), name)
 
+            except IncompleteStreamError:
+                raise
+            except CircuitOpenError as e:
+                logger.warning("Skipped %s: %s", name, e)
+                if failed is not None:
+                    failed.append(name)
+                continue
             except Exception as e:
                 logger.error("Failed to fetch %s: %s", name, e)
+                if failed is not None:
+                    failed.append(name)
                 # Continue with other endpoints even if one fails
                 continue
 
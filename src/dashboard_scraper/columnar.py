@@ -0,0 +1,303 @@
+"""
+Compact columnar binary snapshot of one day's per-user counters.
+
+Layout of a ``.dscol`` file (all integers little-endian)::
+
+    magic      8 bytes   b"DSCOL\\x00\\x00\\x01"
+    hdr_len    u32       length of the JSON header
+    header     hdr_len   UTF-8 JSON describing rows, columns and the string table
+    padding    to an 8-byte boundary
+    data       8-byte aligned column and string-table blocks; header offsets
+               are relative to the start of this section
+
+Column types:
+
+- ``i64``: signed 64-bit integers, one per row
+- ``pct``: signed 64-bit integers holding hundredths of a percent
+- ``str``: signed 64-bit indexes into the interned string table
+
+The string table stores each distinct string once as UTF-8 bytes plus an
+``i64`` array of ``count`` end offsets. Snapshots are loaded with ``mmap``
+and integer columns are exposed as zero-copy ``memoryview`` casts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Union
+
+from .atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DSCOL\x00\x00\x01"
+SNAPSHOT_VERSION = 1
+_ALIGN = 8
+
+# (column name, type) in dashboard order; see DashboardClient._format_user_stats
+USER_COLUMNS = (
+    ("User", "str"),
+    ("First Seen", "str"),
+    ("Last Seen", "str"),
+    ("Active Days", "i64"),
+    ("Completions", "i64"),
+    ("Accepted Completions", "i64"),
+    ("Accept Rate", "pct"),
+    ("Chat Messages", "i64"),
+    ("Agent Messages", "i64"),
+    ("Remote Agent Messages", "i64"),
+    ("Interactive CLI Agent Messages", "i64"),
+    ("Non-Interactive CLI Agent Messages", "i64"),
+    ("Tool Uses", "i64"),
+    ("Total Modified Lines of Code", "i64"),
+    ("Completion Lines of Code", "i64"),
+    ("Instruction Lines of Code", "i64"),
+    ("Agent Lines of Code", "i64"),
+    ("Remote Agent Lines of Code", "i64"),
+    ("CLI Agent Lines of Code", "i64"),
+)
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _to_pct(value: Any) -> int:
+    try:
+        if isinstance(value, str):
+            value = value.replace("%", "")
+        return int(round(float(value) * 100))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _native_le(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def write_snapshot(rows: Iterable[Dict[str, Any]], output_path: Path) -> int:
+    """
+    Write per-user dashboard rows to a columnar snapshot.
+
+    Rows without a "User" value (tenant summaries, MAU) are not stored.
+
+    Args:
+        rows: Rows as produced by DashboardClient._format_user_stats
+        output_path: Path to the .dscol file
+
+    Returns:
+        Number of rows written
+    """
+    strings: List[str] = []
+    interned: Dict[str, int] = {}
+    columns = {name: array("q") for name, _ in USER_COLUMNS}
+
+    def intern(value: Any) -> int:
+        text = "" if value is None else str(value)
+        index = interned.get(text)
+        if index is None:
+            index = interned[text] = len(strings)
+            strings.append(text)
+        return index
+
+    num_rows = 0
+    for row in rows:
+        if not str(row.get("User", "")).strip():
+            continue
+        for name, kind in USER_COLUMNS:
+            value = row.get(name, 0)
+            if kind == "str":
+                columns[name].append(intern(value))
+            elif kind == "pct":
+                columns[name].append(_to_pct(value))
+            else:
+                columns[name].append(_to_int(value))
+        num_rows += 1
+
+    string_bytes = bytearray()
+    string_ends = array("q")
+    for text in strings:
+        string_bytes += text.encode("utf-8")
+        string_ends.append(len(string_bytes))
+
+    blocks: List[bytes] = [_native_le(columns[name]) for name, _ in USER_COLUMNS]
+    blocks.append(_native_le(string_ends))
+    blocks.append(bytes(string_bytes))
+
+    # Block offsets are relative to the start of the (aligned) data section
+    offsets: List[int] = []
+    position = 0
+    for block in blocks:
+        offsets.append(position)
+        position += len(block) + _pad(len(block))
+
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "rows": num_rows,
+        "columns": [
+            {"name": name, "type": kind, "offset": offsets[i], "length": len(blocks[i])}
+            for i, (name, kind) in enumerate(USER_COLUMNS)
+        ],
+        "strings": {
+            "count": len(strings),
+            "ends_offset": offsets[-2],
+            "data_offset": offsets[-1],
+            "data_length": len(blocks[-1]),
+        },
+    }, separators=(",", ":")).encode("utf-8")
+    prefix_len = len(MAGIC) + 4 + len(header)
+
+    with atomic_write(output_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(b"\x00" * _pad(prefix_len))
+        for block in blocks:
+            f.write(block)
+            f.write(b"\x00" * _pad(len(block)))
+
+    logger.debug("Wrote snapshot with %d rows and %d strings to %s", num_rows, len(strings), output_path)
+    return num_rows
+
+
+class StringColumn(Sequence[str]):
+    """Lazily decoded view of a ``str`` column."""
+
+    def __init__(self, snapshot: "Snapshot", indexes: memoryview) -> None:
+        self._snapshot = snapshot
+        self._indexes = indexes
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self._snapshot.string(j) for j in self._indexes[i]]
+        return self._snapshot.string(self._indexes[i])
+
+
+class Snapshot:
+    """A memory-mapped columnar snapshot. Use as a context manager or call close()."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty snapshot file: {path}")
+        self._buf = memoryview(self._mm)
+
+        if bytes(self._buf[:len(MAGIC)]) != MAGIC:
+            self.close()
+            raise ValueError(f"Not a columnar snapshot: {path}")
+        (header_len,) = struct.unpack_from("<I", self._buf, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header: Dict[str, Any] = json.loads(bytes(self._buf[start:start + header_len]))
+        self._data_start = start + header_len + _pad(start + header_len)
+        if self.header.get("version") != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {self.header.get('version')}: {path}")
+
+        self.rows: int = self.header["rows"]
+        self._columns = {spec["name"]: spec for spec in self.header["columns"]}
+        strings = self.header["strings"]
+        self._string_ends = self._ints(strings["ends_offset"], strings["count"] * 8)
+        data_offset = self._data_start + strings["data_offset"]
+        self._string_data = self._buf[data_offset:data_offset + strings["data_length"]]
+        self._string_cache: Dict[int, str] = {}
+
+    def _ints(self, offset: int, length: int) -> Union[memoryview, array]:
+        offset += self._data_start
+        raw = self._buf[offset:offset + length]
+        if sys.byteorder == "little":
+            return raw.cast("q")
+        values = array("q", bytes(raw))
+        values.byteswap()
+        return values
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Views must be released before the map can be closed
+        for attr in ("_string_ends", "_string_data", "_buf"):
+            view = getattr(self, attr, None)
+            if isinstance(view, memoryview):
+                view.release()
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                # A caller still holds a column view; the map is freed with it
+                logger.debug("Snapshot %s still has live column views", self.path)
+            self._mm = None  # type: ignore[assignment]
+        self._file.close()
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._columns)
+
+    def string(self, index: int) -> str:
+        text = self._string_cache.get(index)
+        if text is None:
+            start = self._string_ends[index - 1] if index else 0
+            text = self._string_cache[index] = str(self._string_data[start:self._string_ends[index]], "utf-8")
+        return text
+
+    def column(self, name: str) -> Sequence[Any]:
+        """
+        Get a column by name.
+
+        ``i64`` and ``pct`` columns are zero-copy integer views over the map;
+        ``str`` columns decode strings on access.
+        """
+        spec = self._columns[name]
+        values = self._ints(spec["offset"], spec["length"])
+        if spec["type"] == "str":
+            return StringColumn(self, values)
+        return values
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """Yield rows in the dashboard format (Accept Rate as "12.34%")."""
+        names = self.column_names
+        columns = [self.column(name) for name in names]
+        kinds = [self._columns[name]["type"] for name in names]
+        for i in range(self.rows):
+            row: Dict[str, Any] = {}
+            for name, kind, column in zip(names, kinds, columns):
+                value = column[i]
+                row[name] = f"{value / 100:.2f}%" if kind == "pct" else value
+            yield row
+
+
+def open_snapshot(path: Path) -> Snapshot:
+    """Memory-map a snapshot file."""
+    return Snapshot(path)
+
+
+def read_snapshot_rows(path: Path) -> List[Dict[str, Any]]:
+    """Read every row of a snapshot into dashboard-format dictionaries."""
+    with open_snapshot(path) as snapshot:
+        return list(snapshot.iter_rows())
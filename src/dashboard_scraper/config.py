@@ -8,6 +8,8 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     # Cookie authentication
     cookie_file: str = "secrets/cookies.json"
+    # Write cookies rotated by the server (Set-Cookie) back to the cookie file
+    persist_cookies: bool = True
 
     # API
     metrics_api_base_url: str = "https://app.augmentcode.com/"
@@ -25,14 +27,87 @@ class Settings(BaseSettings):
     lookback_days: int = 30
     export_dir: str = "data"
     log_level: str = "INFO"
+    # Per-day progress output: auto, tty, log or silent
+    progress: str = "auto"
+    # Days buffered between pipeline stages in --last-28-days runs (bounds memory)
+    pipeline_queue_size: int = 2
+    # Background threads writing output files (0 = write on the main thread)
+    output_workers: int = 2
+    # fsync every output file (and its directory) before the run finishes
+    output_fsync: bool = False
+    # Where per-day files go: "range" (one daily_exports_<start>_to_<end> directory per run)
+    # or "partitioned" (stored once per day under partitions/year=/month=/day=)
+    output_layout: str = "range"
+    # Keep a day's files when its fetched data is unchanged since the last run (see manifest.json)
+    skip_unchanged_days: bool = True
+
+    # Tenants scraped concurrently with --tenants
+    tenant_workers: int = 4
+
+    # Resident scheduler (--daemon): daily sync times (comma-separated HH:MM, UTC)
+    daemon_schedule: str = "03:00"
+    # Run once immediately when the daemon starts
+    daemon_run_on_start: bool = True
+    # Path of the status file; empty writes daemon_status.json to the export dir
+    daemon_status_file: str = ""
 
     # Copilot conversion settings
     enterprise_id: str = "283613"  # Default enterprise ID for Copilot JSON
 
+    # Extra aggregate windows written alongside copilot_metrics_aggregated.json
+    # (comma-separated day counts, plus "month" for the calendar month of the last day)
+    aggregate_windows: str = "1,7,28"
+
+    # Local query server (--serve)
+    serve_host: str = "127.0.0.1"
+    serve_port: int = 8787
+    serve_cache_windows: int = 32
+    # Seconds between checks of the export directory for new exports (0 = every request)
+    serve_refresh_seconds: float = 5.0
+
+    # Run metrics (JSON + Prometheus textfile written at the end of each run)
+    run_metrics: bool = False
+    # Path of the .prom file; empty writes dashboard_scraper.prom to the export dir
+    run_metrics_textfile: str = ""
+
+    # Tracing (OTLP JSON spans written at the end of each run)
+    tracing: bool = False
+    # Path of the trace file; empty writes trace_<timestamp>.json to the export dir
+    trace_file: str = ""
+
     # HTTP
+    # Decode userFeatureStats incrementally from a streamed response
+    stream_json: bool = False
+    # Accept-Encoding: auto (gzip, deflate and br when available), identity, or an explicit header value
+    accept_encoding: str = "auto"
     request_timeout_seconds: int = 30
+    # Connection pool: per-host pools kept, and connections kept open per host
+    # (at least the number of concurrent fetch threads, or extra connections are churned)
+    http_pool_connections: int = 4
+    http_pool_maxsize: int = 16
+    # Reuse connections between requests (false sends Connection: close)
+    http_keep_alive: bool = True
+    # Maximum API requests per second, retries included (0 = unlimited)
+    max_requests_per_second: float = 0.0
     max_retries: int = 3
     retry_backoff_seconds: float = 0.5
+    # Circuit breaker per endpoint: after this many consecutive failed requests the
+    # endpoint is skipped without sending (0 = disabled)
+    circuit_breaker_threshold: int = 3
+    # Seconds an open circuit waits before letting one probe request through
+    circuit_breaker_reset_seconds: float = 60.0
+    # Bisect date ranges whose user/tenant stats requests time out or keep failing with 5xx
+    range_split: bool = True
+    # Fetch the halves of a split range on up to this many threads (1 = sequentially)
+    range_split_workers: int = 1
+
+    # HTTP cassette (record real traffic, or replay it offline): "", record or replay
+    cassette_mode: str = ""
+    cassette_file: str = "cassettes/augment.cassette.jsonl.gz"
+    # Replay: multiplier for the recorded latencies (0 = no delay)
+    cassette_latency_scale: float = 0.0
+    # Replay: match requests on path and query (false = path only, any dates)
+    cassette_match_query: bool = True
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -41,6 +116,11 @@ class Settings(BaseSettings):
         p.mkdir(parents=True, exist_ok=True)
         return p
 
+    def run_metrics_textfile_path(self) -> Path:
+        if self.run_metrics_textfile:
+            return Path(self.run_metrics_textfile)
+        return self.export_dir_path() / "dashboard_scraper.prom"
+
     def cookie_file_path(self) -> Path:
         p = Path(self.cookie_file)
         p.parent.mkdir(parents=True, exist_ok=True)
@@ -66,6 +146,15 @@ class Settings(BaseSettings):
         requested = [s.strip().lower() for s in self.scrape_endpoints.split(",")]
         return [(name, endpoint) for name, endpoint in all_endpoints if name in requested]
 
+    def get_aggregate_windows(self) -> List[str]:
+        """
+        Get the list of aggregate window specs.
+
+        Returns:
+            List of window specs (e.g. ["1", "7", "28", "month"])
+        """
+        return [w.strip().lower() for w in self.aggregate_windows.split(",") if w.strip()]
+
 
 def load_settings() -> Settings:
     return Settings()  # type: ignore[arg-type]
@@ -5,8 +5,11 @@ Simple authentication method - just copy your session cookie from the browser.
 import json
 import logging
 import os
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+from .atomic import atomic_write
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,11 @@ class CookieAuth:
 
     Uses a session cookie that you copy from your browser after
     logging in manually to the dashboard.
+
+    The parsed file is cached and only re-read when it changes, so
+    repeated lookups are cheap and edits on disk (e.g. --auth while a
+    daemon runs) are still picked up. Cookies the server rotates can be
+    written back with update_cookies().
     """
     
     def __init__(self, cookie_file: Path):
@@ -28,36 +36,83 @@ class CookieAuth:
         """
         self.cookie_file = cookie_file
         self.cookie_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._cached: Optional[Dict[str, str]] = None
+        self._cached_version: Optional[Tuple[int, int]] = None
+
+    def file_version(self) -> Optional[Tuple[int, int]]:
+        """(mtime in ns, size) of the cookie file, or None if it doesn't exist; changes when the file does."""
+        try:
+            st = self.cookie_file.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
     
     def save_cookies(self, cookies: Dict[str, str]) -> None:
         """
         Save cookies to file with restricted permissions.
 
+        The file is replaced atomically, so a concurrent reader never sees
+        a partially written file.
+
         Args:
             cookies: Dictionary of cookie name -> value
         """
         logger.info("Saving cookies to %s", self.cookie_file)
-        with open(self.cookie_file, "w") as f:
+        with self._lock:
+            self._save(cookies)
+
+    def _save(self, cookies: Dict[str, str]) -> None:
+        with atomic_write(self.cookie_file) as f:
+            # Restrict permissions to owner only (read/write) before the file is visible
+            os.chmod(f.name, 0o600)
             json.dump(cookies, f, indent=2)
-        # Restrict permissions to owner only (read/write) for security
-        os.chmod(self.cookie_file, 0o600)
+        self._cached = dict(cookies)
+        self._cached_version = self.file_version()
         logger.debug("Set cookie file permissions to 0600")
+
+    def update_cookies(self, changes: Dict[str, str]) -> bool:
+        """
+        Merge changed cookie values (e.g. from Set-Cookie) into the file.
+
+        Args:
+            changes: Cookie name -> new value
+
+        Returns:
+            True if any value differed and the file was rewritten
+        """
+        with self._lock:
+            current = self._load() or {}
+            if all(current.get(name) == value for name, value in changes.items()):
+                return False
+            self._save({**current, **changes})
+        logger.info("Saved %d refreshed cookie(s) to %s", len(changes), self.cookie_file)
+        return True
     
     def load_cookies(self) -> Optional[Dict[str, str]]:
         """
-        Load cookies from file.
+        Load cookies from file (cached until the file changes on disk).
         
         Returns:
             Dictionary of cookie name -> value, or None if file doesn't exist
         """
-        if not self.cookie_file.exists():
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> Optional[Dict[str, str]]:
+        version = self.file_version()
+        if version is None:
             logger.warning("Cookie file not found: %s", self.cookie_file)
+            self._cached = self._cached_version = None
             return None
+        if self._cached is not None and version == self._cached_version:
+            return dict(self._cached)
         
         try:
             with open(self.cookie_file, "r") as f:
                 cookies = json.load(f)
             logger.info("Loaded %d cookies from %s", len(cookies), self.cookie_file)
+            self._cached, self._cached_version = dict(cookies), version
             return cookies
         except (json.JSONDecodeError, IOError) as e:
             logger.error("Failed to load cookies: %s", e)
@@ -9,12 +9,248 @@ from __future__ import annotations
 
 import json
 import logging
-from collections import defaultdict
+from datetime import date, timedelta
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from .json_index import write_indexed_json
+from .tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
+# Additive counters present at the record root and in each totals_by_feature entry
+COUNTER_FIELDS = (
+    "user_initiated_interaction_count",
+    "code_generation_activity_count",
+    "code_acceptance_activity_count",
+    "loc_suggested_to_add_sum",
+    "loc_suggested_to_delete_sum",
+    "loc_added_sum",
+    "loc_deleted_sum",
+)
+
+
+class AggregationWindow(NamedTuple):
+    """A named, inclusive range of days (YYYY-MM-DD) to aggregate over."""
+    name: str
+    start_day: str
+    end_day: str
+
+
+def _new_user_metrics() -> Dict[str, Any]:
+    metrics: Dict[str, Any] = {field: 0 for field in COUNTER_FIELDS}
+    metrics["used_agent"] = False
+    metrics["used_chat"] = False
+    metrics["totals_by_feature"] = {}
+    return metrics
+
+
+def _parse_record(record: Dict[str, Any]) -> Tuple[Tuple[int, ...], List[Tuple[str, Tuple[int, ...]]], bool, bool]:
+    """Extract the additive counters and flags of a daily record once."""
+    totals = tuple(record.get(field, 0) for field in COUNTER_FIELDS)
+    features = [
+        (feature_record["feature"], tuple(feature_record.get(field, 0) for field in COUNTER_FIELDS))
+        for feature_record in record.get("totals_by_feature", [])
+    ]
+    return totals, features, record.get("used_agent", False), record.get("used_chat", False)
+
+
+def _add_parsed_record(metrics: Dict[str, Any], parsed: Tuple[Any, ...]) -> None:
+    totals, features, used_agent, used_chat = parsed
+
+    # Aggregate top-level metrics
+    for field, value in zip(COUNTER_FIELDS, totals):
+        metrics[field] += value
+
+    # Aggregate boolean flags (OR operation)
+    metrics["used_agent"] = metrics["used_agent"] or used_agent
+    metrics["used_chat"] = metrics["used_chat"] or used_chat
+
+    # Aggregate totals_by_feature
+    for feature, values in features:
+        feature_metrics = metrics["totals_by_feature"].get(feature)
+        if feature_metrics is None:
+            feature_metrics = metrics["totals_by_feature"][feature] = {field: 0 for field in COUNTER_FIELDS}
+        for field, value in zip(COUNTER_FIELDS, values):
+            feature_metrics[field] += value
+
+
+def _build_aggregated_record(
+    identity: Dict[str, Any],
+    metrics: Dict[str, Any],
+    report_start_day: str,
+    report_end_day: str
+) -> Dict[str, Any]:
+    # Convert totals_by_feature from dict to list
+    totals_by_feature = [
+        {"feature": feature, **feature_metrics}
+        for feature, feature_metrics in metrics["totals_by_feature"].items()
+    ]
+
+    return {
+        "report_start_day": report_start_day,
+        "report_end_day": report_end_day,
+        "day": report_end_day,  # Use end date as reporting day
+        "enterprise_id": identity["enterprise_id"],
+        "user_id": identity["user_id"],
+        "user_login": identity["user_login"],
+        "user_initiated_interaction_count": metrics["user_initiated_interaction_count"],
+        "code_generation_activity_count": metrics["code_generation_activity_count"],
+        "code_acceptance_activity_count": metrics["code_acceptance_activity_count"],
+        "totals_by_feature": totals_by_feature,
+        "used_agent": metrics["used_agent"],
+        "used_chat": metrics["used_chat"],
+        "loc_suggested_to_add_sum": metrics["loc_suggested_to_add_sum"],
+        "loc_suggested_to_delete_sum": metrics["loc_suggested_to_delete_sum"],
+        "loc_added_sum": metrics["loc_added_sum"],
+        "loc_deleted_sum": metrics["loc_deleted_sum"],
+    }
+
+
+def write_aggregated_json(records: List[Dict[str, Any]], output_path: Path) -> None:
+    """
+    Write aggregated Copilot records to a JSON file.
+
+    Args:
+        records: Aggregated per-user records
+        output_path: Path to write aggregated JSON file
+    """
+    with get_tracer().start_span("aggregate.write_json", {"file": output_path.name, "records": len(records)}):
+        write_indexed_json(records, output_path)
+
+
+def resolve_windows(specs: Iterable[str], start_day: str, end_day: str) -> List[AggregationWindow]:
+    """
+    Turn window specs into concrete day ranges ending on ``end_day``.
+
+    A numeric spec ("7") means the last N days; "month" means the calendar
+    month containing ``end_day``. Windows are clipped to ``start_day`` so they
+    never reach before the data that was fetched.
+
+    Args:
+        specs: Window specs, e.g. ["1", "7", "28", "month"]
+        start_day: First available day in YYYY-MM-DD format
+        end_day: Last available day in YYYY-MM-DD format
+
+    Returns:
+        List of resolved windows, named "1d", "7d", "28d", "month", ...
+    """
+    first = date.fromisoformat(start_day)
+    last = date.fromisoformat(end_day)
+
+    windows: List[AggregationWindow] = []
+    for spec in specs:
+        spec = spec.strip().lower()
+        if spec == "month":
+            name = "month"
+            window_start = last.replace(day=1)
+        else:
+            try:
+                num_days = int(spec)
+            except ValueError:
+                logger.warning("Ignoring invalid aggregate window: %r", spec)
+                continue
+            if num_days < 1:
+                logger.warning("Ignoring invalid aggregate window: %r", spec)
+                continue
+            name = f"{num_days}d"
+            window_start = last - timedelta(days=num_days - 1)
+
+        if window_start < first:
+            logger.warning("Window %s starts before %s; clipping to available data", name, start_day)
+            window_start = first
+
+        windows.append(AggregationWindow(name, window_start.isoformat(), end_day))
+
+    return windows
+
+
+class WindowAggregator:
+    """
+    Incremental multi-window aggregation: add days one at a time, then build the results.
+
+    Only per-user counters are kept, so memory grows with the number of users
+    and windows, not with the number of days.
+    """
+
+    def __init__(self, windows: List[AggregationWindow]) -> None:
+        self.windows = windows
+        self.days = 0
+        self._identities: Dict[str, Dict[str, Any]] = {}
+        self._window_metrics: List[Dict[str, Dict[str, Any]]] = [{} for _ in windows]
+
+    def add_day(self, day: str, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add one day's Copilot records to every window containing the day.
+
+        Each record is parsed once and each user is indexed once.
+
+        Args:
+            day: Day of the records (YYYY-MM-DD)
+            records: The day's per-user Copilot records
+        """
+        active = [
+            self._window_metrics[i]
+            for i, window in enumerate(self.windows)
+            if window.start_day <= day <= window.end_day
+        ]
+        if not active:
+            return
+        self.days += 1
+
+        for record in records:
+            user_login = record["user_login"]
+            if user_login not in self._identities:
+                self._identities[user_login] = {
+                    "user_login": user_login,
+                    "user_id": record["user_id"],
+                    "enterprise_id": record["enterprise_id"],
+                }
+
+            parsed = _parse_record(record)
+            for user_metrics in active:
+                metrics = user_metrics.get(user_login)
+                if metrics is None:
+                    metrics = user_metrics[user_login] = _new_user_metrics()
+                _add_parsed_record(metrics, parsed)
+
+    def results(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Mapping of window name to its aggregated per-user records."""
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for window, user_metrics in zip(self.windows, self._window_metrics):
+            results[window.name] = [
+                _build_aggregated_record(self._identities[user_login], metrics, window.start_day, window.end_day)
+                for user_login, metrics in user_metrics.items()
+            ]
+            logger.info("Aggregated %d users for window %s (%s to %s)",
+                        len(results[window.name]), window.name, window.start_day, window.end_day)
+        return results
+
+
+def aggregate_windows(
+    daily_records: Dict[str, List[Dict[str, Any]]],
+    windows: List[AggregationWindow]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Aggregate in-memory daily Copilot records over several windows in one pass.
+
+    Each daily record is parsed once and each user is indexed once; the
+    parsed counters are then added to every window that contains the day.
+
+    Args:
+        daily_records: Mapping of day (YYYY-MM-DD) to that day's Copilot records
+        windows: Windows to aggregate over
+
+    Returns:
+        Mapping of window name to its aggregated per-user records
+    """
+    attributes = {"days": len(daily_records), "windows": ",".join(w.name for w in windows)}
+    with get_tracer().start_span("aggregate.windows", attributes):
+        aggregator = WindowAggregator(windows)
+        for day in sorted(daily_records):
+            aggregator.add_day(day, daily_records[day])
+        return aggregator.results()
+
 
 def aggregate_daily_json_files(
     json_files: List[Path],
@@ -24,131 +260,62 @@ def aggregate_daily_json_files(
 ) -> int:
     """
     Aggregate multiple daily Copilot JSON files into a single consolidated file.
-    
+
     This function:
     1. Reads all daily JSON files
     2. Groups records by user_login
     3. Sums metrics across all days for each user
     4. Writes a single aggregated JSON file
-    
+
     Args:
         json_files: List of paths to daily JSON files
         output_path: Path to write aggregated JSON file
         report_start_day: Start date in YYYY-MM-DD format
         report_end_day: End date in YYYY-MM-DD format
-    
+
     Returns:
         Number of unique users in aggregated output
     """
     logger.info("Aggregating %d daily JSON files", len(json_files))
-    
-    # Dictionary to accumulate metrics per user
-    user_metrics: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
-        "user_initiated_interaction_count": 0,
-        "code_generation_activity_count": 0,
-        "code_acceptance_activity_count": 0,
-        "loc_suggested_to_add_sum": 0,
-        "loc_suggested_to_delete_sum": 0,
-        "loc_added_sum": 0,
-        "loc_deleted_sum": 0,
-        "used_agent": False,
-        "used_chat": False,
-        "totals_by_feature": defaultdict(lambda: {
-            "user_initiated_interaction_count": 0,
-            "code_generation_activity_count": 0,
-            "code_acceptance_activity_count": 0,
-            "loc_suggested_to_add_sum": 0,
-            "loc_suggested_to_delete_sum": 0,
-            "loc_added_sum": 0,
-            "loc_deleted_sum": 0,
-        })
-    })
-    
+
+    # Dictionaries to accumulate metrics per user
+    identities: Dict[str, Dict[str, Any]] = {}
+    user_metrics: Dict[str, Dict[str, Any]] = {}
+
     # Read and aggregate all daily files
-    for json_file in json_files:
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                daily_records = json.load(f)
-            
-            for record in daily_records:
-                user_login = record["user_login"]
-                user_id = record["user_id"]
-                enterprise_id = record["enterprise_id"]
-                
-                # Initialize user if first time seeing them
-                if "user_login" not in user_metrics[user_login]:
-                    user_metrics[user_login]["user_login"] = user_login
-                    user_metrics[user_login]["user_id"] = user_id
-                    user_metrics[user_login]["enterprise_id"] = enterprise_id
-                
-                # Aggregate top-level metrics
-                user_metrics[user_login]["user_initiated_interaction_count"] += record.get("user_initiated_interaction_count", 0)
-                user_metrics[user_login]["code_generation_activity_count"] += record.get("code_generation_activity_count", 0)
-                user_metrics[user_login]["code_acceptance_activity_count"] += record.get("code_acceptance_activity_count", 0)
-                user_metrics[user_login]["loc_suggested_to_add_sum"] += record.get("loc_suggested_to_add_sum", 0)
-                user_metrics[user_login]["loc_suggested_to_delete_sum"] += record.get("loc_suggested_to_delete_sum", 0)
-                user_metrics[user_login]["loc_added_sum"] += record.get("loc_added_sum", 0)
-                user_metrics[user_login]["loc_deleted_sum"] += record.get("loc_deleted_sum", 0)
-                
-                # Aggregate boolean flags (OR operation)
-                user_metrics[user_login]["used_agent"] = user_metrics[user_login]["used_agent"] or record.get("used_agent", False)
-                user_metrics[user_login]["used_chat"] = user_metrics[user_login]["used_chat"] or record.get("used_chat", False)
-                
-                # Aggregate totals_by_feature
-                for feature_record in record.get("totals_by_feature", []):
-                    feature = feature_record["feature"]
-                    feature_metrics = user_metrics[user_login]["totals_by_feature"][feature]
-                    
-                    feature_metrics["user_initiated_interaction_count"] += feature_record.get("user_initiated_interaction_count", 0)
-                    feature_metrics["code_generation_activity_count"] += feature_record.get("code_generation_activity_count", 0)
-                    feature_metrics["code_acceptance_activity_count"] += feature_record.get("code_acceptance_activity_count", 0)
-                    feature_metrics["loc_suggested_to_add_sum"] += feature_record.get("loc_suggested_to_add_sum", 0)
-                    feature_metrics["loc_suggested_to_delete_sum"] += feature_record.get("loc_suggested_to_delete_sum", 0)
-                    feature_metrics["loc_added_sum"] += feature_record.get("loc_added_sum", 0)
-                    feature_metrics["loc_deleted_sum"] += feature_record.get("loc_deleted_sum", 0)
-        
-        except Exception as e:
-            logger.error("Failed to read %s: %s", json_file, e)
-            continue
-    
+    with get_tracer().start_span("aggregate.files", {"files": len(json_files)}):
+        for json_file in json_files:
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    daily_records = json.load(f)
+
+                for record in daily_records:
+                    user_login = record["user_login"]
+
+                    # Initialize user if first time seeing them
+                    if user_login not in user_metrics:
+                        identities[user_login] = {
+                            "user_login": user_login,
+                            "user_id": record["user_id"],
+                            "enterprise_id": record["enterprise_id"],
+                        }
+                        user_metrics[user_login] = _new_user_metrics()
+
+                    _add_parsed_record(user_metrics[user_login], _parse_record(record))
+
+            except Exception as e:
+                logger.error("Failed to read %s: %s", json_file, e)
+                continue
+
     # Convert aggregated data to output format
-    aggregated_records = []
-    
-    for user_login, metrics in user_metrics.items():
-        # Convert totals_by_feature from dict to list
-        totals_by_feature = [
-            {"feature": feature, **feature_metrics}
-            for feature, feature_metrics in metrics["totals_by_feature"].items()
-        ]
-        
-        record = {
-            "report_start_day": report_start_day,
-            "report_end_day": report_end_day,
-            "day": report_end_day,  # Use end date as reporting day
-            "enterprise_id": metrics["enterprise_id"],
-            "user_id": metrics["user_id"],
-            "user_login": user_login,
-            "user_initiated_interaction_count": metrics["user_initiated_interaction_count"],
-            "code_generation_activity_count": metrics["code_generation_activity_count"],
-            "code_acceptance_activity_count": metrics["code_acceptance_activity_count"],
-            "totals_by_feature": totals_by_feature,
-            "used_agent": metrics["used_agent"],
-            "used_chat": metrics["used_chat"],
-            "loc_suggested_to_add_sum": metrics["loc_suggested_to_add_sum"],
-            "loc_suggested_to_delete_sum": metrics["loc_suggested_to_delete_sum"],
-            "loc_added_sum": metrics["loc_added_sum"],
-            "loc_deleted_sum": metrics["loc_deleted_sum"],
-        }
-        
-        aggregated_records.append(record)
-    
+    aggregated_records = [
+        _build_aggregated_record(identities[user_login], metrics, report_start_day, report_end_day)
+        for user_login, metrics in user_metrics.items()
+    ]
+
     # Write aggregated JSON
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(aggregated_records, f, indent=2)
-    
+    write_aggregated_json(aggregated_records, output_path)
+
     logger.info("Aggregated %d users to %s", len(aggregated_records), output_path)
-    
-    return len(aggregated_records)
 
+    return len(aggregated_records)
@@ -8,11 +8,14 @@ Augment's per-user metrics into the GitHub Copilot per-user JSON format.
 from __future__ import annotations
 
 import hashlib
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
+
+from .columnar import open_snapshot
+from .json_index import write_indexed_json
+from .tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -153,67 +156,131 @@ def convert_csv_row_to_copilot_json(
     return record
 
 
-def convert_csv_to_copilot_json(
+def _rows_to_copilot_records(
+    rows: Iterable[Dict[str, Any]],
+    report_start_day: str,
+    report_end_day: str,
+    enterprise_id: str
+) -> List[Dict[str, Any]]:
+    records = []
+
+    for row in rows:
+        # Skip empty or invalid rows
+        user = str(row.get("User", "")).strip()
+        if not user:
+            continue
+
+        # Skip rows with zero active days (optional)
+        active_days = row.get("Active Days", "0")
+        try:
+            if int(active_days) == 0:
+                logger.debug("Skipping user %s with 0 active days", user)
+                continue
+        except (ValueError, TypeError):
+            pass
+
+        # Convert row to Copilot format
+        record = convert_csv_row_to_copilot_json(
+            row,
+            report_start_day,
+            report_end_day,
+            enterprise_id
+        )
+
+        records.append(record)
+
+    return records
+
+
+def read_csv_as_copilot_records(
     csv_path: Path,
-    output_path: Path,
     report_start_day: str,
     report_end_day: str,
     enterprise_id: str = "283613"
-) -> int:
+) -> List[Dict[str, Any]]:
     """
-    Convert an Augment CSV file to Copilot JSON format.
+    Read an Augment CSV file and convert its rows to Copilot JSON records.
 
     Args:
         csv_path: Path to input CSV file
-        output_path: Path to output JSON file
         report_start_day: Start date in YYYY-MM-DD format
         report_end_day: End date in YYYY-MM-DD format
         enterprise_id: Enterprise ID (default: "283613")
 
     Returns:
-        Number of records converted
+        List of records in Copilot per-user JSON format
     """
     import csv
 
-    records = []
+    with get_tracer().start_span("convert.read_csv", {"file": csv_path.name}) as span:
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            records = _rows_to_copilot_records(csv.DictReader(f), report_start_day, report_end_day, enterprise_id)
+        span.set_attribute("records", len(records))
+    return records
 
-    logger.info("Converting CSV to Copilot JSON: %s -> %s", csv_path, output_path)
 
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+def read_snapshot_as_copilot_records(
+    snapshot_path: Path,
+    report_start_day: str,
+    report_end_day: str,
+    enterprise_id: str = "283613"
+) -> List[Dict[str, Any]]:
+    """
+    Convert a columnar day snapshot (see columnar.py) to Copilot JSON records.
 
-        for row in reader:
-            # Skip empty or invalid rows
-            user = row.get("User", "").strip()
-            if not user:
-                continue
+    Args:
+        snapshot_path: Path to input .dscol snapshot
+        report_start_day: Start date in YYYY-MM-DD format
+        report_end_day: End date in YYYY-MM-DD format
+        enterprise_id: Enterprise ID (default: "283613")
 
-            # Skip rows with zero active days (optional)
-            active_days = row.get("Active Days", "0")
-            try:
-                if int(active_days) == 0:
-                    logger.debug("Skipping user %s with 0 active days", user)
-                    continue
-            except (ValueError, TypeError):
-                pass
+    Returns:
+        List of records in Copilot per-user JSON format
+    """
+    with get_tracer().start_span("convert.read_snapshot", {"file": snapshot_path.name}) as span:
+        with open_snapshot(snapshot_path) as snapshot:
+            records = _rows_to_copilot_records(snapshot.iter_rows(), report_start_day, report_end_day, enterprise_id)
+        span.set_attribute("records", len(records))
+    return records
+
+
+def write_copilot_json(records: List[Dict[str, Any]], output_path: Path) -> None:
+    """
+    Write Copilot JSON records to a file.
 
-            # Convert row to Copilot format
-            record = convert_csv_row_to_copilot_json(
-                row,
-                report_start_day,
-                report_end_day,
-                enterprise_id
-            )
+    Args:
+        records: Records in Copilot per-user JSON format
+        output_path: Path to output JSON file
+    """
+    with get_tracer().start_span("convert.write_json", {"file": output_path.name, "records": len(records)}):
+        write_indexed_json(records, output_path)
+
+
+def convert_csv_to_copilot_json(
+    csv_path: Path,
+    output_path: Path,
+    report_start_day: str,
+    report_end_day: str,
+    enterprise_id: str = "283613"
+) -> int:
+    """
+    Convert an Augment CSV file to Copilot JSON format.
 
-            records.append(record)
+    Args:
+        csv_path: Path to input CSV file
+        output_path: Path to output JSON file
+        report_start_day: Start date in YYYY-MM-DD format
+        report_end_day: End date in YYYY-MM-DD format
+        enterprise_id: Enterprise ID (default: "283613")
 
-    # Write JSON output
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    Returns:
+        Number of records converted
+    """
+    logger.info("Converting CSV to Copilot JSON: %s -> %s", csv_path, output_path)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(records, f, indent=2)
+    records = read_csv_as_copilot_records(csv_path, report_start_day, report_end_day, enterprise_id)
+    write_copilot_json(records, output_path)
 
     logger.info("Converted %d records to %s", len(records), output_path)
 
     return len(records)
-
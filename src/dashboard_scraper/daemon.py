@@ -0,0 +1,247 @@
+"""
+Resident scheduler mode (--daemon).
+
+Instead of one cron invocation per day, the daemon stays running and runs
+the 28-day sync at the times of day listed in ``DAEMON_SCHEDULE`` (UTC).
+Imports, settings and the ``HTTPClient`` (its ``requests.Session``
+connection pool, cookies and negotiated encodings) are set up once and
+reused by every run. The cookie file is checked before each run and
+reloaded when it changed on disk, so ``--auth`` takes effect without a
+restart; after a run fails on expired cookies, the daemon also runs again
+as soon as the cookie file changes instead of waiting for the next slot.
+
+The daemon's state and the last run's outcome and stage timings are
+written to a status file (``DAEMON_STATUS_FILE``) after every state change,
+for health checks.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from datetime import datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .atomic import write_text_atomic
+from .client import DashboardClient
+from .config import Settings
+from .cookie_auth import CookieAuth
+from .date_utils import compute_last_28_days, isoformat_utc
+from .http import AuthenticationExpiredError, HTTPClient
+from .metrics import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+# How often an idle daemon checks the cookie file after an authentication failure
+_COOKIE_POLL_SECONDS = 30.0
+
+SyncFn = Callable[[DashboardClient, RunMetrics], None]
+
+
+def parse_schedule(spec: str) -> List[dtime]:
+    """
+    Parse a comma-separated list of HH:MM times (UTC).
+
+    Raises:
+        ValueError: If the list is empty or a time is malformed
+    """
+    times = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            parsed = datetime.strptime(part, "%H:%M")
+        except ValueError:
+            raise ValueError(f"Invalid schedule time '{part}'. Expected HH:MM (e.g., 03:00)")
+        times.append(dtime(parsed.hour, parsed.minute, tzinfo=timezone.utc))
+    if not times:
+        raise ValueError("DAEMON_SCHEDULE must list at least one HH:MM time")
+    return sorted(set(times))
+
+
+def next_run_time(schedule: List[dtime], now: datetime) -> datetime:
+    """First scheduled time strictly after ``now``."""
+    now = now.astimezone(timezone.utc)
+    for day in (now.date(), now.date() + timedelta(days=1)):
+        for t in schedule:
+            candidate = datetime.combine(day, t)
+            if candidate > now:
+                return candidate
+    raise AssertionError("unreachable: schedule is non-empty")
+
+
+class Daemon:
+    def __init__(
+        self,
+        settings: Settings,
+        http: HTTPClient,
+        status_path: Path,
+        sync: Optional[SyncFn] = None,
+        progress_mode: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the daemon.
+
+        Args:
+            settings: Application settings
+            http: HTTP client kept open across runs
+            status_path: Where the status file is written
+            sync: One run; defaults to the 28-day sync
+            progress_mode: Progress output of each run (see progress.py)
+        """
+        self.s = settings
+        self.http = http
+        self.client = DashboardClient(settings, http)
+        self.status_path = status_path
+        self.schedule = parse_schedule(settings.daemon_schedule)
+        self.sync = sync or self._sync_last_28_days
+        self.progress_mode = progress_mode
+        self.status: Dict[str, Any] = {
+            "pid": os.getpid(),
+            "started_at": isoformat_utc(datetime.now(timezone.utc)),
+            "state": "idle",
+            "schedule": [t.strftime("%H:%M") for t in self.schedule],
+            "runs": 0,
+            "failed_runs": 0,
+            "next_run_at": None,
+            "last_run": None,
+        }
+
+    def _sync_last_28_days(self, client: DashboardClient, metrics: RunMetrics) -> None:
+        from .daily_metrics import process_last_28_days
+
+        start, end = compute_last_28_days()
+        process_last_28_days(client, self.s, start, end, metrics=metrics, progress_mode=self.progress_mode)
+        if not metrics.gauges.get("days_successful"):
+            raise RuntimeError("no data fetched for any day")
+
+    def _write_status(self, **changes: Any) -> None:
+        self.status.update(changes)
+        try:
+            write_text_atomic(self.status_path, json.dumps(self.status, indent=2) + "\n")
+        except OSError as e:
+            logger.error("Failed to write daemon status %s: %s", self.status_path, e)
+
+    def run_once(self) -> Dict[str, Any]:
+        """
+        Run one sync on the warm session and record it in the status file.
+
+        Returns:
+            The run's entry in the status file ("last_run")
+        """
+        if self.http.reload_cookies_if_changed():
+            self.status["cookies_reloaded_at"] = isoformat_utc(datetime.now(timezone.utc))
+
+        metrics = RunMetrics()
+        # Per-run metrics on the long-lived client
+        self.http.metrics = metrics
+        started_at = datetime.now(timezone.utc)
+        self._write_status(state="running", current_run_started_at=isoformat_utc(started_at))
+        started = time.perf_counter()
+
+        status, error = "ok", ""
+        try:
+            self.sync(self.client, metrics)
+        except AuthenticationExpiredError as e:
+            status, error = "auth_expired", str(e)
+            logger.error("Authentication failed: %s", e)
+            print(f"❌ {e} (re-authenticate with --auth; the daemon retries once the cookie file changes)")
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error("Scheduled run failed: %s", e, exc_info=True)
+            print(f"❌ Scheduled run failed: {e}")
+
+        summary = metrics.to_dict()
+        last_run = {
+            "started_at": isoformat_utc(started_at),
+            "finished_at": isoformat_utc(datetime.now(timezone.utc)),
+            "seconds": round(time.perf_counter() - started, 3),
+            "status": status,
+            "error": error,
+            "days_successful": summary["gauges"].get("days_successful"),
+            "days_failed": summary["gauges"].get("days_failed"),
+            "requests": sum(e["requests"] for e in summary["endpoints"].values()),
+            "stages": summary["stages"],
+        }
+        metrics.set_gauge("run_success", 1 if status == "ok" else 0)
+        if self.s.run_metrics:
+            try:
+                metrics.write(self.s.export_dir_path() / "run_metrics.json", self.s.run_metrics_textfile_path())
+            except OSError as e:
+                logger.error("Failed to write run metrics: %s", e)
+
+        self.status.pop("current_run_started_at", None)
+        self._write_status(
+            state="idle",
+            runs=self.status["runs"] + 1,
+            failed_runs=self.status["failed_runs"] + (status != "ok"),
+            last_run=last_run,
+        )
+        return last_run
+
+    def _wait(self, until: datetime, stop: threading.Event, watch_cookies: bool) -> bool:
+        """Sleep until ``until``; returns False if stopped, True early if watched cookies changed."""
+        while not stop.is_set():
+            remaining = (until - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                return True
+            stop.wait(min(remaining, _COOKIE_POLL_SECONDS) if watch_cookies else remaining)
+            if watch_cookies and not stop.is_set() and self.http.reload_cookies_if_changed():
+                self.status["cookies_reloaded_at"] = isoformat_utc(datetime.now(timezone.utc))
+                logger.info("Cookie file changed; running now")
+                return True
+        return False
+
+    def run_forever(self, stop: threading.Event, run_on_start: bool = True) -> None:
+        """
+        Run on schedule until ``stop`` is set.
+
+        Args:
+            stop: Set to shut down (between runs, or after the current run)
+            run_on_start: Run once immediately before waiting for the first slot
+        """
+        if run_on_start and not stop.is_set():
+            self.run_once()
+        while not stop.is_set():
+            next_run = next_run_time(self.schedule, datetime.now(timezone.utc))
+            self._write_status(next_run_at=isoformat_utc(next_run))
+            logger.info("Next run at %s", next_run)
+            print(f"⏰ Next run at {isoformat_utc(next_run)}")
+            auth_failed = (self.status["last_run"] or {}).get("status") == "auth_expired"
+            if not self._wait(next_run, stop, watch_cookies=auth_failed):
+                break
+            self.run_once()
+        self._write_status(state="stopped", next_run_at=None)
+
+
+def run_daemon(settings: Settings, cookie_auth: CookieAuth, progress_mode: Optional[str] = None) -> None:
+    """Run the daemon until SIGINT or SIGTERM."""
+    if settings.daemon_status_file:
+        status_path = Path(settings.daemon_status_file)
+    else:
+        status_path = settings.export_dir_path() / "daemon_status.json"
+
+    stop = threading.Event()
+
+    def handle_signal(signum: int, frame: Any) -> None:
+        logger.info("Received signal %d; stopping after the current run", signum)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    http = HTTPClient(settings, cookie_auth=cookie_auth)
+    try:
+        daemon = Daemon(settings, http, status_path, progress_mode=progress_mode or "log")
+        print(f"🕒 Daemon started: daily sync at {', '.join(daemon.status['schedule'])} UTC")
+        print(f"   Status file: {status_path}")
+        daemon.run_forever(stop, run_on_start=settings.daemon_run_on_start)
+    finally:
+        http.close()
+    print("👋 Daemon stopped.")
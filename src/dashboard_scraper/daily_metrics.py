@@ -1,18 +1,33 @@
 from __future__ import annotations
 
 import logging
+from contextlib import ExitStack
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Iterator
+from typing import Any, Callable, ContextManager, Dict, List, Iterator, Optional, Sequence, Tuple
 
 from .client import DashboardClient
 from .config import Settings
-from .export import write_csv
-from .copilot_converter import convert_csv_to_copilot_json
-from .copilot_aggregator import aggregate_daily_json_files
+from .columnar import open_snapshot, write_snapshot
+from .copilot_converter import read_snapshot_as_copilot_records
+from .enterprise_summary import build_enterprise_day_summary_from_snapshot
+from .copilot_aggregator import AggregationWindow, resolve_windows
+from .manifest import DayManifest, hash_day_input
+from .metrics import NULL_METRICS, NullMetrics, RunMetrics
+from .output_executor import OutputExecutor
+from .pipeline import DayBatch, Sink, run_pipeline
+from .profiling import StageProfiler
+from .progress import create_progress
+from .sinks import AggregateSink, CopilotJsonSink, CsvSink, EnterpriseSummarySink
+from .tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
+# "range": every file in daily_exports_<start>_to_<end>; "partitioned": per-day
+# files stored once under partitions/year=/month=/day=, range outputs in the range directory
+OUTPUT_LAYOUTS = ("range", "partitioned")
+PARTITIONS_DIR = "partitions"
+
 
 def _generate_date_range(start: datetime, end: datetime) -> List[datetime]:
     """
@@ -42,6 +57,19 @@ def _generate_date_range(start: datetime, end: datetime) -> List[datetime]:
     return dates
 
 
+def _stage(
+    name: str,
+    profiler: Optional[StageProfiler],
+    metrics: RunMetrics | NullMetrics
+) -> ContextManager[None]:
+    """Record a block as stage ``name`` in the run metrics and, with --profile, the profiler."""
+    stack = ExitStack()
+    stack.enter_context(metrics.stage(name))
+    if profiler is not None:
+        stack.enter_context(profiler.stage(name))
+    return stack
+
+
 def _create_daily_export_dir(export_dir: Path, start: datetime, end: datetime) -> Path:
     """
     Create directory for daily CSV exports.
@@ -64,11 +92,17 @@ def _create_daily_export_dir(export_dir: Path, start: datetime, end: datetime) -
     return daily_dir
 
 
+def _partition_dir(root: Path, date: datetime) -> Path:
+    """Directory of one day's files in the partitioned layout (``year=YYYY/month=MM/day=DD``)."""
+    return root / f"year={date:%Y}" / f"month={date:%m}" / f"day={date:%d}"
+
+
 def _fetch_single_day_metrics(
     client: DashboardClient,
     date: datetime,
     day_num: int,
-    total_days: int
+    total_days: int,
+    failed_endpoints: Optional[List[str]] = None
 ) -> List[Dict[str, Any]] | None:
     """
     Fetch metrics for a single day.
@@ -88,6 +122,8 @@ def _fetch_single_day_metrics(
         date: The date to fetch metrics for
         day_num: Current day number (for progress logging)
         total_days: Total number of days being processed
+        failed_endpoints: If given, the endpoints that failed or were skipped
+            while the rest of the day was fetched are appended to it
 
     Returns:
         List of metric records for this day, or None if an error occurred.
@@ -99,78 +135,154 @@ def _fetch_single_day_metrics(
     # End of day (23:59:59.999999)
     day_end = date.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-    logger.info("Processing day %d of %d: %s", day_num, total_days, date.date())
-    print(f"📅 Processing day {day_num} of {total_days}: {date.date()}")
+    logger.debug("Processing day %d of %d: %s", day_num, total_days, date.date())
 
-    try:
-        # Fetch metrics for this single day
-        # The API uses inclusive date ranges, so we use the same day for both start and end
-        records = list(client.iter_metrics(day_start, day_end))
+    with get_tracer().start_span("day", {"day": date.date().isoformat(), "day_num": day_num}) as span:
+        try:
+            # Fetch metrics for this single day
+            # The API uses inclusive date ranges, so we use the same day for both start and end
+            records = list(client.iter_metrics(day_start, day_end, failed_endpoints))
 
-        logger.info("Fetched %d records for %s", len(records), date.date())
-        print(f"   ✅ Fetched {len(records)} records")
+            logger.debug("Fetched %d records for %s", len(records), date.date())
+            span.set_attribute("records", len(records))
 
-        return records
+            return records
 
-    except Exception as e:
-        logger.error("Failed to fetch metrics for %s: %s", date.date(), e)
-        print(f"   ❌ Error: {e}")
-        return None
+        except Exception as e:
+            logger.error("Failed to fetch metrics for %s: %s", date.date(), e)
+            span.set_error(str(e))
+            return None
 
 
-def _write_daily_csv(
+def _write_daily_snapshot(
     records: List[Dict[str, Any]],
     daily_dir: Path,
     date: datetime
 ) -> Path:
     """
-    Write daily metrics to a CSV file.
+    Write the day's per-user counters to a columnar snapshot (see columnar.py).
+
+    The snapshot is the source for conversion and summaries; the CSV is
+    written for export only.
 
     Args:
         records: List of metric records for the day
-        daily_dir: Directory to write CSV files to
+        daily_dir: Directory to write the snapshot to
         date: The date for this data
 
     Returns:
-        Path to the written CSV file
+        Path to the written snapshot file
     """
     date_str = date.strftime("%Y-%m-%d")
-    filename = f"augment_metrics_{date_str}.csv"
-
-    # Use the existing write_csv function
-    csv_path = write_csv(
-        records,
-        daily_dir,
-        filename=filename,
-        start_date=date,
-        end_date=date
+    snapshot_path = daily_dir / f"augment_metrics_{date_str}.dscol"
+    num_rows = write_snapshot(records, snapshot_path)
+    logger.debug("Wrote daily snapshot: %s (%d users)", snapshot_path, num_rows)
+    return snapshot_path
+
+
+def _load_snapshot(batch: DayBatch, report_start: str, report_end: str, enterprise_id: str) -> None:
+    """Convert the batch's snapshot into its Copilot records and enterprise day summary."""
+    batch.copilot = read_snapshot_as_copilot_records(
+        batch.snapshot_path,
+        report_start,
+        report_end,
+        enterprise_id=enterprise_id
     )
+    # Enterprise summary reduced directly over the snapshot's columns
+    with open_snapshot(batch.snapshot_path) as snapshot:
+        batch.summary = build_enterprise_day_summary_from_snapshot(batch.day, snapshot)
+
+
+def _read_partitions(
+    partitions_dir: Path,
+    manifest: DayManifest,
+    dates: List[datetime],
+    enterprise_id: str
+) -> Iterator[DayBatch]:
+    """
+    Read back the stored partition of every day in ``dates`` that has one.
+
+    Only days recorded in the partitions manifest are read, i.e. days whose
+    files were all written from a complete fetch, by this run or an earlier one.
 
-    logger.info("Wrote daily CSV: %s", csv_path)
-    print(f"   📄 Wrote CSV: {csv_path.name}")
+    Args:
+        partitions_dir: Root of the day partitions
+        manifest: The partitions manifest
+        dates: Days of the range
+        enterprise_id: Enterprise id of the Copilot records
+
+    Yields:
+        One converted batch per stored day
+    """
+    for date in dates:
+        batch = DayBatch(date, None, _partition_dir(partitions_dir, date))
+        if manifest.get(batch.day) is None:
+            continue
+        batch.snapshot_path = batch.directory / f"augment_metrics_{batch.day}.dscol"
+        try:
+            _load_snapshot(batch, batch.day, batch.day, enterprise_id)
+        except Exception as e:
+            logger.error("Failed to read partition %s: %s", batch.directory, e)
+            continue
+        yield batch
 
-    return csv_path
 
 def process_last_28_days(
     client: DashboardClient,
     settings: Settings,
     start: datetime,
-    end: datetime
+    end: datetime,
+    profiler: Optional[StageProfiler] = None,
+    metrics: RunMetrics | NullMetrics = NULL_METRICS,
+    progress_mode: Optional[str] = None,
+    extra_sinks: Sequence[Sink] = ()
 ) -> None:
     """
     Process metrics for the last 28 days and generate Copilot-compatible output.
 
-    This function:
-    1. Fetches daily metrics for each of the 28 days
-    2. Generates individual CSV files for each day
-    3. Creates a consolidated JSON file in Copilot's per-user format
+    Days stream through a pipeline (see pipeline.py) whose stages overlap:
+
+    1. fetch: daily metrics from the API, one day at a time
+    2. normalize: the day's columnar snapshot
+    3. convert: Copilot records and the enterprise day summary, from the snapshot
+    4. sinks: the export CSV and Copilot JSON for the day, the enterprise
+       summary (augment_enterprise_daily.json), and the consolidated
+       aggregate plus one per configured window (see
+       Settings.aggregate_windows), written once all days have arrived.
+       Sinks run on background output workers (see output_executor.py).
+
+    With Settings.skip_unchanged_days, a day whose fetched records hash the
+    same as on the previous run over this range (see manifest.py) keeps its
+    snapshot, CSV and Copilot JSON files instead of rewriting them.
+
+    With Settings.output_layout "partitioned", the per-day files go to
+    ``partitions/year=YYYY/month=MM/day=DD`` under the export directory,
+    shared by every run that covers the day, and are indexed by
+    ``partitions/manifest.json``. Their Copilot records report the day
+    itself rather than the run's range, so they do not depend on the range.
+    Only completely fetched days are written there: a day with a failed or
+    skipped endpoint keeps its stored partition. The enterprise summary and
+    the window aggregates are then assembled from the stored partitions of
+    the range, so a day this run could not fetch still counts with its last
+    complete copy.
 
     Args:
         client: DashboardClient instance for API calls
         settings: Settings instance for configuration
         start: Start date (28 days ago at 00:00:00)
         end: End date (yesterday at 23:59:59)
+        profiler: Optional profiler; stages are recorded on it when given,
+            and run one after another on the calling thread
+        metrics: Run metrics recorder for stage durations and day counts
+        progress_mode: Progress output mode (see progress.py); defaults to
+            Settings.progress
+        extra_sinks: Additional outputs that receive every day (e.g. a StoreSink)
     """
+    if settings.output_layout not in OUTPUT_LAYOUTS:
+        raise ValueError(
+            f"Unknown output layout '{settings.output_layout}'. Expected one of: {', '.join(OUTPUT_LAYOUTS)}")
+    partitioned = settings.output_layout == "partitioned"
+
     logger.info("Starting 28-day metrics processing")
     logger.info("Date range: %s to %s", start.date(), end.date())
 
@@ -191,31 +303,148 @@ def process_last_28_days(
     # Create output directory for daily CSV files
     daily_dir = _create_daily_export_dir(settings.export_dir_path(), start, end)
     print(f"Output directory: {daily_dir}")
+    partitions_dir = settings.export_dir_path() / PARTITIONS_DIR
+    if partitioned:
+        print(f"Day partitions: {partitions_dir}")
     print()
 
-    # Track results
-    daily_data: Dict[str, List[Dict[str, Any]]] = {}
-    csv_files: List[Path] = []
-    successful_days = 0
-    failed_days = 0
-
-    # Fetch metrics for each day and write CSV files
-    for i, date in enumerate(dates, 1):
-        records = _fetch_single_day_metrics(client, date, i, total_days)
+    start_str = start.strftime("%Y-%m-%d")
+    end_str = end.strftime("%Y-%m-%d")
 
-        if records is not None:
-            # Successfully fetched (may be empty list if no data for this day)
-            date_key = date.strftime("%Y-%m-%d")
-            daily_data[date_key] = records
+    # The full range and every configured window are aggregated as days arrive
+    windows = [AggregationWindow("all", start_str, end_str)]
+    windows += resolve_windows(settings.get_aggregate_windows(), start_str, end_str)
+
+    csv_sink = CsvSink()
+    json_sink = CopilotJsonSink()
+    summary_sink = EnterpriseSummarySink(daily_dir / "augment_enterprise_daily.json")
+    aggregate_sink = AggregateSink(daily_dir, windows)
+    range_sinks: List[Sink] = [summary_sink, aggregate_sink]
+    sinks: List[Sink] = [csv_sink, json_sink, *range_sinks, *extra_sinks]
+    # With partitions, the range outputs are assembled from the stored days instead
+    day_sinks = [sink for sink in sinks if sink not in range_sinks] if partitioned else sinks
+
+    manifest = DayManifest(partitions_dir if partitioned else daily_dir)
+    # (day, input hash, rows, files) of each converted day, recorded in the manifest once written
+    written_days: List[Tuple[str, str, int, List[Path]]] = []
+    unchanged_days = 0
+
+    def fetch_days() -> Iterator[DayBatch]:
+        for i, date in enumerate(dates, 1):
+            failed_endpoints: List[str] = []
+            with _stage("fetch", profiler, metrics):
+                records = _fetch_single_day_metrics(client, date, i, total_days, failed_endpoints)
+            if partitioned and records is not None and failed_endpoints:
+                # A partition is shared by every run; it must not be replaced by part of a day
+                logger.error("Not writing the %s partition: %s failed", date.date(), ", ".join(failed_endpoints))
+                records = None
+            yield DayBatch(date, records, _partition_dir(partitions_dir, date) if partitioned else daily_dir)
+
+    def report_range(batch: DayBatch) -> Tuple[str, str]:
+        # Partitions are shared between runs, so their records cover just their day
+        return (batch.day, batch.day) if partitioned else (start_str, end_str)
+
+    def normalize(batch: DayBatch) -> DayBatch:
+        if batch.fetched:
+            with _stage("normalize", profiler, metrics):
+                records = batch.records or []
+                report_start, report_end = report_range(batch)
+                batch.input_hash = hash_day_input(
+                    records, start=report_start, end=report_end, enterprise_id=settings.enterprise_id)
+                if settings.skip_unchanged_days and manifest.is_unchanged(batch.day, batch.input_hash):
+                    batch.unchanged = True
+                    batch.files = [manifest.directory / name for name in manifest.days[batch.day]["files"]]
+                    batch.snapshot_path = batch.directory / f"augment_metrics_{batch.day}.dscol"
+                else:
+                    batch.snapshot_path = _write_daily_snapshot(records, batch.directory, batch.date)
+                    batch.files.append(batch.snapshot_path)
+        return batch
+
+    def convert(batch: DayBatch) -> DayBatch:
+        if batch.snapshot_path is None:
+            return batch
+        try:
+            with _stage("convert", profiler, metrics):
+                _load_snapshot(batch, *report_range(batch), settings.enterprise_id)
+        except Exception as e:
+            logger.error("Failed to convert %s to JSON: %s", batch.snapshot_path, e)
+            batch.copilot = batch.summary = None
+        return batch
 
-            # Write daily CSV file
-            csv_path = _write_daily_csv(records, daily_dir, date)
-            csv_files.append(csv_path)
+    successful_days = 0
+    failed_days = 0
 
-            successful_days += 1
-        else:
-            # Error occurred during fetch
-            failed_days += 1
+    progress = create_progress(
+        progress_mode or settings.progress, "Processing", total_days,
+        bytes_source=lambda: client.http.bytes_received)
+
+    def update_manifest() -> None:
+        # Days with a failed write are forgotten, so the next run rewrites them
+        failed_writes = {error.label for error in output.errors}
+        for day, input_hash, rows, files in written_days:
+            if day in failed_writes:
+                manifest.discard(day)
+            else:
+                manifest.record(day, input_hash, rows, files)
+        try:
+            manifest.save()
+        except OSError as e:
+            logger.error("Failed to write %s: %s", manifest.path, e)
+
+    def timed(name: str, fn: Callable[..., List[Path]], *args: Any) -> List[Path]:
+        with _stage(name, profiler, metrics):
+            return fn(*args)
+
+    # Sinks write on background threads while the next days are fetched and converted.
+    # With --profile everything runs on this thread (cProfile is per-thread).
+    output = OutputExecutor(
+        max_workers=settings.output_workers if profiler is None else 0,
+        fsync=settings.output_fsync,
+    )
+    with output, progress:
+        batches = run_pipeline(
+            fetch_days(),
+            [("normalize", normalize), ("convert", convert)],
+            queue_size=settings.pipeline_queue_size,
+            threaded=profiler is None,
+        )
+        for batch in batches:
+            for sink in day_sinks:
+                output.submit(sink.name, batch.day, timed, sink.name, sink.write, batch)
+
+            if batch.converted and batch.input_hash is not None:
+                written_days.append((batch.day, batch.input_hash, len(batch.records or []), batch.files))
+            unchanged_days += batch.unchanged
+
+            if batch.fetched:
+                successful_days += 1
+                progress.advance(records=len(batch.records or []))
+            else:
+                failed_days += 1
+                progress.advance(failed=True)
+
+        if partitioned:
+            # The day partitions must be on disk and in the manifest before they are read back
+            output.drain()
+            update_manifest()
+            with _stage("read_partitions", profiler, metrics):
+                for stored in _read_partitions(partitions_dir, manifest, dates, settings.enterprise_id):
+                    for sink in range_sinks:
+                        output.submit(sink.name, stored.day, timed, sink.name, sink.write, stored)
+
+        # Range-level outputs are written when their sinks are closed
+        for sink in sinks:
+            output.submit(sink.name, "the date range", timed, sink.name, sink.close)
+        output.drain()
+
+    metrics.set_gauge("days_successful", successful_days)
+    metrics.set_gauge("days_failed", failed_days)
+
+    for error in output.errors:
+        print(f"❌ Failed to write {error.lane} output for {error.label}: {error.error}")
+
+    if not partitioned:
+        update_manifest()
 
     # Summary
     print()
@@ -225,7 +454,8 @@ def process_last_28_days(
     print(f"Total days processed: {total_days}")
     print(f"Successful: {successful_days}")
     print(f"Failed: {failed_days}")
-    print(f"CSV files generated: {len(csv_files)}")
+    print(f"Unchanged (not rewritten): {unchanged_days}")
+    print(f"CSV files generated: {len(csv_sink.files)}")
     print()
 
     if successful_days == 0:
@@ -233,88 +463,31 @@ def process_last_28_days(
         print("❌ No data fetched. Please check your authentication and try again.")
         return
 
-    # List generated CSV files
-    print("Generated CSV files:")
-    for csv_file in csv_files:
-        print(f"  - {csv_file}")
-    print()
-
-    # Generate Copilot JSON files from CSV files
-    print("=" * 80)
-    print("📄 Converting CSV to Copilot JSON format")
-    print("=" * 80)
-
-    json_files: List[Path] = []
-    start_str = start.strftime("%Y-%m-%d")
-    end_str = end.strftime("%Y-%m-%d")
-
-    for csv_file in csv_files:
-        # Extract date from filename (augment_metrics_YYYY-MM-DD.csv)
-        date_str = csv_file.stem.replace("augment_metrics_", "")
-
-        # Create JSON filename
-        json_filename = f"copilot_metrics_{date_str}.json"
-        json_path = daily_dir / json_filename
-
-        try:
-            # Convert CSV to JSON
-            num_records = convert_csv_to_copilot_json(
-                csv_file,
-                json_path,
-                start_str,
-                end_str,
-                enterprise_id=settings.enterprise_id
-            )
-
-            json_files.append(json_path)
-            print(f"✅ {csv_file.name} -> {json_filename} ({num_records} users)")
-
-        except Exception as e:
-            logger.error("Failed to convert %s to JSON: %s", csv_file, e)
-            print(f"❌ Failed to convert {csv_file.name}: {e}")
+    if summary_sink.written:
+        print(f"✅ Created enterprise daily summary: {summary_sink.path.name}")
 
+    for window, path, users in aggregate_sink.files:
+        print(f"✅ Created aggregated metrics file: {path.name} ({window.start_day} to {window.end_day})")
+        print(f"   Total unique users: {users}")
     print()
 
-    # Generate aggregated JSON file
-    if json_files:
-        print("=" * 80)
-        print("📊 Aggregating metrics across all days")
-        print("=" * 80)
-
-        aggregated_json_path = daily_dir / "copilot_metrics_aggregated.json"
-
-        try:
-            num_users = aggregate_daily_json_files(
-                json_files,
-                aggregated_json_path,
-                start_str,
-                end_str
-            )
-
-            print(f"✅ Created aggregated metrics file: {aggregated_json_path.name}")
-            print(f"   Total unique users: {num_users}")
-            print()
-        except Exception as e:
-            logger.error("Failed to aggregate JSON files: %s", e)
-            print(f"❌ Failed to create aggregated file: {e}")
-            print()
-
     print("=" * 80)
     print("📊 Final Summary")
     print("=" * 80)
     print(f"Total days processed: {total_days}")
     print(f"Successful: {successful_days}")
     print(f"Failed: {failed_days}")
-    print(f"CSV files generated: {len(csv_files)}")
-    print(f"JSON files generated: {len(json_files)}")
+    print(f"CSV files generated: {len(csv_sink.files)}")
+    print(f"JSON files generated: {len(json_sink.files)}")
     print()
 
     logger.info("28-day processing complete: %d successful, %d failed", successful_days, failed_days)
     print("✅ Processing complete!")
     print(f"📁 Output directory: {daily_dir}")
+    if partitioned:
+        print(f"📁 Day partitions: {partitions_dir} (indexed by {manifest.path.name})")
     print()
     print("Files generated:")
-    print(f"  - {len(csv_files)} CSV files (Augment format)")
-    print(f"  - {len(json_files)} JSON files (Copilot format)")
-    print(f"  - 1 aggregated JSON file (copilot_metrics_aggregated.json)")
-
+    print(f"  - {len(csv_sink.files)} CSV files (Augment format)")
+    print(f"  - {len(json_sink.files)} JSON files (Copilot format)")
+    print(f"  - {len(aggregate_sink.files)} aggregated JSON files (copilot_metrics_aggregated*.json)")
@@ -0,0 +1,171 @@
+"""
+Build enterprise-level daily summaries from per-user Augment records.
+
+The output follows the tenant daily format documented in
+augment_metrics_format.json (total_active_users, total_engaged_users and
+per-feature engaged counts). Editor and language breakdowns are not available
+from the per-user stats endpoint and are therefore omitted.
+
+Each day's rows are transposed into integer columns once, and every summary
+figure is a column-wise reduction, so the cost stays linear in the number of
+users with a small constant.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from array import array
+from operator import add
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+from .atomic import write_text_atomic
+from .columnar import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Dashboard columns that are reduced into the summary
+SUMMARY_COLUMNS = (
+    "Active Days",
+    "Completions",
+    "Accepted Completions",
+    "Chat Messages",
+    "Agent Messages",
+    "Remote Agent Messages",
+    "Interactive CLI Agent Messages",
+    "Non-Interactive CLI Agent Messages",
+    "Tool Uses",
+    "Completion Lines of Code",
+    "Agent Lines of Code",
+    "Remote Agent Lines of Code",
+    "CLI Agent Lines of Code",
+)
+
+
+def _to_int(value: Any) -> int:
+    try:
+        if isinstance(value, str):
+            value = value.replace("%", "")
+        return int(float(value))
+    except (ValueError, TypeError):
+        return 0
+
+
+def _columns(rows: Iterable[Dict[str, Any]]) -> Dict[str, array]:
+    """Transpose per-user rows into one signed 64-bit column per summary field."""
+    columns = {name: array("q") for name in SUMMARY_COLUMNS}
+    for row in rows:
+        if not str(row.get("User", "")).strip():
+            continue
+        for name in SUMMARY_COLUMNS:
+            columns[name].append(_to_int(row.get(name, 0)))
+    return columns
+
+
+def _count_positive(column: Iterable[int]) -> int:
+    return sum(map(bool, column))
+
+
+def build_enterprise_day_summary(day: str, rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce one day of per-user dashboard rows to an enterprise summary.
+
+    Args:
+        day: The day in YYYY-MM-DD format
+        rows: Per-user rows as produced by DashboardClient._format_user_stats
+
+    Returns:
+        Dictionary in the enterprise daily format
+    """
+    return _summarize(day, _columns(rows))
+
+
+def build_enterprise_day_summary_from_snapshot(day: str, snapshot: Snapshot) -> Dict[str, Any]:
+    """
+    Reduce a columnar day snapshot to an enterprise summary.
+
+    The snapshot's integer columns are reduced in place without building rows.
+
+    Args:
+        day: The day in YYYY-MM-DD format
+        snapshot: Open snapshot of the day's per-user counters
+
+    Returns:
+        Dictionary in the enterprise daily format
+    """
+    return _summarize(day, {name: snapshot.column(name) for name in SUMMARY_COLUMNS})
+
+
+def _summarize(day: str, c: Mapping[str, Sequence[int]]) -> Dict[str, Any]:
+    cli_messages = array("q", map(add, c["Interactive CLI Agent Messages"], c["Non-Interactive CLI Agent Messages"]))
+    ide_agent_messages = c["Agent Messages"]
+    remote_agent_messages = c["Remote Agent Messages"]
+    agent_messages = array("q", map(add, ide_agent_messages, remote_agent_messages))
+    chat_or_agent = array("q", map(add, c["Chat Messages"], ide_agent_messages))
+
+    # A user is engaged when they accepted a completion or sent any message
+    engaged = map(
+        add,
+        map(add, c["Accepted Completions"], c["Chat Messages"]),
+        map(add, agent_messages, cli_messages),
+    )
+
+    return {
+        "date": day,
+        "total_active_users": _count_positive(c["Active Days"]),
+        "total_engaged_users": _count_positive(engaged),
+        "augment_ide_code_completions": {
+            "total_engaged_users": _count_positive(c["Accepted Completions"]),
+            "total_completions": sum(c["Completions"]),
+            "total_accepted_completions": sum(c["Accepted Completions"]),
+            "total_completion_lines_of_code": sum(c["Completion Lines of Code"]),
+        },
+        "augment_ide_chat": {
+            "total_engaged_users": _count_positive(chat_or_agent),
+            "total_chat_messages": sum(c["Chat Messages"]),
+            "total_agent_messages": sum(ide_agent_messages),
+        },
+        "augment_agent": {
+            "total_engaged_users": _count_positive(agent_messages),
+            "total_agent_messages": sum(agent_messages),
+            "total_tool_uses": sum(c["Tool Uses"]),
+            "total_agent_lines_of_code": sum(c["Agent Lines of Code"]) + sum(c["Remote Agent Lines of Code"]),
+            "environments": [
+                {
+                    "name": "ide",
+                    "total_engaged_users": _count_positive(ide_agent_messages),
+                    "total_agent_messages": sum(ide_agent_messages),
+                    "total_agent_lines_of_code": sum(c["Agent Lines of Code"]),
+                },
+                {
+                    "name": "remote",
+                    "total_engaged_users": _count_positive(remote_agent_messages),
+                    "total_remote_agent_messages": sum(remote_agent_messages),
+                    "total_remote_agent_lines_of_code": sum(c["Remote Agent Lines of Code"]),
+                },
+            ],
+        },
+        "augment_cli_agent": {
+            "total_engaged_users": _count_positive(cli_messages),
+            "total_interactive_messages": sum(c["Interactive CLI Agent Messages"]),
+            "total_non_interactive_messages": sum(c["Non-Interactive CLI Agent Messages"]),
+            "total_cli_agent_lines_of_code": sum(c["CLI Agent Lines of Code"]),
+        },
+    }
+
+
+def write_enterprise_summary(summaries: List[Dict[str, Any]], output_path: Path) -> None:
+    """
+    Write enterprise daily summaries to a JSON file, ordered by date.
+
+    An existing file with identical content is left untouched.
+
+    Args:
+        summaries: Per-day summaries from build_enterprise_day_summary
+        output_path: Path to output JSON file
+    """
+    write_text_atomic(output_path, json.dumps(sorted(summaries, key=lambda s: s["date"]), indent=2),
+                      keep_unchanged=True)
+
+    logger.info("Wrote %d enterprise daily summaries to %s", len(summaries), output_path)
@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 
+from .atomic import atomic_write, write_text_atomic
 from .date_utils import isoformat_utc
 
 logger = logging.getLogger(__name__)
@@ -120,7 +121,7 @@ def write_csv(
             filename = _generate_filename(start_date, end_date)
         out_path = out_dir / filename
         # Create empty file
-        out_path.touch()
+        write_text_atomic(out_path, "")
         return out_path
 
     # union of keys
@@ -136,7 +137,7 @@ def write_csv(
         filename = _generate_filename(start_date, end_date)
     out_path = out_dir / filename
 
-    with open(out_path, "w", newline="", encoding="utf-8") as f:
+    with atomic_write(out_path, newline="") as f:
         w = csv.DictWriter(f, fieldnames=cols, extrasaction="ignore", quoting=csv.QUOTE_MINIMAL)
         w.writeheader()
         for r in flat_rows:
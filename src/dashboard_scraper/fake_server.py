@@ -0,0 +1,396 @@
+"""
+Synthetic stand-in for the Augment dashboard API, for offline load and scale testing.
+
+Implements the three endpoints the scraper uses, with the same date-parameter
+encoding as DashboardClient._format_date_param
+(``startDate=%7B%22year%22%3A2025%2C%22month%22%3A10%2C%22day%22%3A22%7D``):
+
+    GET /api/user-feature-stats
+    GET /api/tenant-feature-stats
+    GET /api/tenant-monthly-active-users
+
+Tenants are generated deterministically from a seed and a user count (10 to
+1M users), so repeated runs see identical data. Latency, a 5xx error rate,
+429 rate-limit responses, 504s for oversized date ranges and endpoints that
+are down (always 503) can be injected.
+Large user-stats responses are streamed with chunked transfer encoding, so
+memory stays flat at any scale, and are gzip-compressed when the request's
+Accept-Encoding allows it.
+
+Usage:
+    python -m dashboard_scraper.fake_server --users 100000 --port 8099 --latency-ms 50 --error-rate 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+_FIRST_SEEN_BASE = date(2024, 1, 1)
+# Records per chunk written to the socket for user stats
+_CHUNK_RECORDS = 500
+
+
+def _mix(x: int) -> int:
+    """SplitMix64 finalizer: a fast, well-distributed 64-bit hash."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class SyntheticTenant:
+    """Deterministic synthetic usage data for ``num_users`` users."""
+
+    def __init__(self, num_users: int, seed: int = 1, activity: float = 0.7, domain: str = "example.com") -> None:
+        self.num_users = num_users
+        self.seed = seed
+        self.activity_threshold = int(activity * 256)
+        self.domain = domain
+
+    def user_email(self, user: int) -> str:
+        return f"user{user:07d}@{self.domain}"
+
+    def _day_counters(self, user: int, ordinal: int) -> Optional[Tuple[int, ...]]:
+        """Counters for one user on one day, or None if the user was inactive."""
+        h1 = _mix((self.seed << 48) ^ (user << 20) ^ ordinal)
+        if (h1 & 0xFF) >= self.activity_threshold:
+            return None
+        h2 = _mix(h1)
+        completions = (h1 >> 8) % 80
+        accepted = completions * ((h1 >> 16) % 60) // 100
+        chat = (h1 >> 24) % 12
+        agent = (h1 >> 32) % 25
+        remote = (h1 >> 40) % 4
+        cli_interactive = (h1 >> 44) % 6
+        cli_non_interactive = (h1 >> 48) % 3
+        tool_uses = agent * ((h2 & 0xF) + 1)
+        completion_loc = accepted * ((h2 >> 4) % 6 + 1)
+        instruction_loc = (h2 >> 8) % 20
+        agent_loc = agent * ((h2 >> 16) % 40)
+        remote_loc = remote * ((h2 >> 24) % 60)
+        cli_loc = (cli_interactive + cli_non_interactive) * ((h2 >> 32) % 30)
+        return (
+            completions, accepted, chat, agent, remote, cli_interactive, cli_non_interactive,
+            tool_uses, completion_loc, instruction_loc, agent_loc, remote_loc, cli_loc,
+        )
+
+    def user_stats(self, user: int, start: date, end: date) -> Optional[Dict[str, Any]]:
+        """API record for one user over an inclusive day range, or None if inactive."""
+        totals = [0] * 13
+        active_days = 0
+        last_active: Optional[date] = None
+        day = start
+        while day <= end:
+            counters = self._day_counters(user, day.toordinal())
+            if counters is not None:
+                active_days += 1
+                last_active = day
+                for i, value in enumerate(counters):
+                    totals[i] += value
+            day += timedelta(days=1)
+
+        if not active_days:
+            return None
+
+        (completions, accepted, chat, agent, remote, cli_interactive, cli_non_interactive,
+         tool_uses, completion_loc, instruction_loc, agent_loc, remote_loc, cli_loc) = totals
+        first_seen = _FIRST_SEEN_BASE + timedelta(days=_mix(self.seed ^ user) % 365)
+        return {
+            "userEmail": self.user_email(user),
+            "firstSeen": f"{min(first_seen, start).isoformat()}T09:00:00.000000Z",
+            "lastSeen": f"{last_active.isoformat()}T17:30:00.000000Z",
+            "totalActiveDays": active_days,
+            "totalCompletionsInTimePeriod": completions,
+            "acceptedCompletionsInTimePeriod": accepted,
+            "acceptanceRatePercentage": round(100.0 * accepted / completions, 2) if completions else None,
+            "totalChatMessagesInTimePeriod": chat,
+            "totalAgentChatMessagesInTimePeriod": agent,
+            "totalRemoteAgentMessagesInTimePeriod": remote,
+            "totalInteractiveCliAgentMessagesInTimePeriod": cli_interactive,
+            "totalNoninteractiveCliAgentMessagesInTimePeriod": cli_non_interactive,
+            "totalToolUsesInTimePeriod": tool_uses,
+            "totalModifiedLinesOfCode": completion_loc + instruction_loc + agent_loc + remote_loc + cli_loc,
+            "completionLinesOfCode": completion_loc,
+            "instructionLinesOfCode": instruction_loc,
+            "agentLinesOfCode": agent_loc,
+            "remoteAgentLinesOfCode": remote_loc,
+            "cliAgentLinesOfCode": cli_loc,
+        }
+
+    def iter_user_stats(self, start: date, end: date) -> Iterator[Dict[str, Any]]:
+        for user in range(self.num_users):
+            record = self.user_stats(user, start, end)
+            if record is not None:
+                yield record
+
+    def tenant_stats(self, start: date, end: date) -> Dict[str, Any]:
+        user_messages = tool_calls = lines_of_code = 0
+        for record in self.iter_user_stats(start, end):
+            user_messages += (
+                record["totalChatMessagesInTimePeriod"]
+                + record["totalAgentChatMessagesInTimePeriod"]
+                + record["totalRemoteAgentMessagesInTimePeriod"]
+                + record["totalInteractiveCliAgentMessagesInTimePeriod"]
+                + record["totalNoninteractiveCliAgentMessagesInTimePeriod"]
+            )
+            tool_calls += record["totalToolUsesInTimePeriod"]
+            lines_of_code += record["totalModifiedLinesOfCode"]
+        return {"userMessages": user_messages, "toolCalls": tool_calls, "linesOfCode": lines_of_code}
+
+    def monthly_active_users(self, start: date, end: date) -> Dict[str, Any]:
+        month_start = end.replace(day=1)
+        count = sum(1 for _ in self.iter_user_stats(month_start, end))
+        return {"monthlyActiveUsers": count}
+
+
+class FaultInjector:
+    """Latency, 5xx and 429 injection shared by all request threads."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: int = 1,
+        seed: int = 1,
+        max_range_days: int = 0,
+        down_endpoints: Iterable[str] = (),
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        # Ranges longer than this many days are answered with 504 (0 = no limit)
+        self.max_range_days = max_range_days
+        # Endpoint names (user_stats, tenant_stats, tenant_mau) answered with 503 on every request
+        self.down_endpoints = frozenset(down_endpoints)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self) -> None:
+        if self.latency_ms or self.jitter_ms:
+            with self._lock:
+                jitter = self._rng.uniform(0, self.jitter_ms)
+            time.sleep((self.latency_ms + jitter) / 1000.0)
+
+    def fault(self) -> Optional[int]:
+        """Status code to fail this request with, or None to serve it."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+
+def parse_date_param(value: str) -> date:
+    """
+    Parse a date parameter in the API encoding: ``{"year":2025,"month":10,"day":22}``.
+
+    ``value`` is expected to be already percent-decoded (as by parse_qs).
+    """
+    obj = json.loads(value)
+    return date(int(obj["year"]), int(obj["month"]), int(obj["day"]))
+
+
+class FakeAugmentHandler(BaseHTTPRequestHandler):
+    server_version = "fake-augment"
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle's algorithm the body waits
+    # for the client's delayed ACK (~40 ms) on every kept-alive connection
+    disable_nagle_algorithm = True
+
+    # Set by make_fake_server()
+    tenant: SyntheticTenant
+    faults: FaultInjector
+    endpoints: Dict[str, str]
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _write_chunk(self, data: bytes) -> None:
+        if data:
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    def _stream_user_stats(self, start: date, end: date) -> None:
+        accepted = {e.split(";")[0].strip().lower() for e in self.headers.get("Accept-Encoding", "").split(",")}
+        # wbits=31 produces a gzip container
+        gzip_stream = zlib.compressobj(6, zlib.DEFLATED, 31) if "gzip" in accepted else None
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if gzip_stream is not None:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write(data: bytes) -> None:
+            self._write_chunk(gzip_stream.compress(data) if gzip_stream is not None else data)
+
+        write(b'{"userFeatureStats":[')
+        batch: List[str] = []
+        first = True
+        for record in self.tenant.iter_user_stats(start, end):
+            batch.append(json.dumps(record, separators=(",", ":")))
+            if len(batch) >= _CHUNK_RECORDS:
+                write((("" if first else ",") + ",".join(batch)).encode("utf-8"))
+                first = False
+                batch = []
+        if batch:
+            write((("" if first else ",") + ",".join(batch)).encode("utf-8"))
+        write(b"]}")
+        if gzip_stream is not None:
+            self._write_chunk(gzip_stream.flush())
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        # The client joins base URL and endpoint with a possible double slash
+        path = re.sub(r"/+", "/", url.path)
+        name = self.endpoints.get(path)
+        if name is None:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            params = parse_qs(url.query)
+            start = parse_date_param(params["startDate"][0])
+            end = parse_date_param(params["endDate"][0])
+        except (KeyError, ValueError, TypeError) as e:
+            self._send_json(400, {"error": f"invalid date parameters: {e}"})
+            return
+
+        self.faults.delay()
+        if name in self.faults.down_endpoints:
+            self._send_json(503, {"error": "endpoint down"})
+            return
+        if self.faults.max_range_days and (end - start).days + 1 > self.faults.max_range_days:
+            self._send_json(504, {"error": "range too large"})
+            return
+        status = self.faults.fault()
+        if status == 429:
+            self._send_json(429, {"error": "rate limited"},
+                            {"Retry-After": str(self.faults.retry_after_seconds)})
+            return
+        if status is not None:
+            self._send_json(status, {"error": "injected failure"})
+            return
+
+        if name == "user_stats":
+            self._stream_user_stats(start, end)
+        elif name == "tenant_stats":
+            self._send_json(200, self.tenant.tenant_stats(start, end))
+        else:
+            self._send_json(200, self.tenant.monthly_active_users(start, end))
+
+
+def make_fake_server(
+    tenant: SyntheticTenant,
+    faults: Optional[FaultInjector] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    user_feature_stats_endpoint: str = "/api/user-feature-stats",
+    tenant_feature_stats_endpoint: str = "/api/tenant-feature-stats",
+    tenant_mau_endpoint: str = "/api/tenant-monthly-active-users",
+) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a fake Augment API server.
+
+    Args:
+        tenant: Synthetic tenant to serve
+        faults: Fault injection settings (default: none)
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+    """
+    endpoints = {
+        user_feature_stats_endpoint: "user_stats",
+        tenant_feature_stats_endpoint: "tenant_stats",
+        tenant_mau_endpoint: "tenant_mau",
+    }
+    attrs = {"tenant": tenant, "faults": faults or FaultInjector(), "endpoints": endpoints}
+    handler = type("BoundFakeAugmentHandler", (FakeAugmentHandler,), attrs)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_fake_server(
+    tenant: SyntheticTenant,
+    faults: Optional[FaultInjector] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Start a fake server on a background thread.
+
+    Returns:
+        Tuple of (server, base URL ending in "/"); call server.shutdown() when done
+    """
+    server = make_fake_server(tenant, faults, host, port)
+    threading.Thread(target=server.serve_forever, name="fake-augment", daemon=True).start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}/"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Synthetic Augment dashboard API for load testing")
+    p.add_argument("--users", type=int, default=1000, help="Number of synthetic users (10 to 1,000,000)")
+    p.add_argument("--seed", type=int, default=1, help="Seed for deterministic data")
+    p.add_argument("--activity", type=float, default=0.7, help="Probability a user is active on a given day")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8099)
+    p.add_argument("--latency-ms", type=float, default=0.0, help="Fixed latency added to every request")
+    p.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency, uniform in [0, jitter]")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    p.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    p.add_argument("--max-range-days", type=int, default=0,
+                   help="Answer ranges longer than this many days with 504 (0 = no limit)")
+    p.add_argument("--down", default="",
+                   help="Comma-separated endpoints that always answer 503 (user_stats, tenant_stats, tenant_mau)")
+    args = p.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    tenant = SyntheticTenant(args.users, seed=args.seed, activity=args.activity)
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate, seed=args.seed,
+                           max_range_days=args.max_range_days,
+                           down_endpoints=[e.strip() for e in args.down.split(",") if e.strip()])
+    server = make_fake_server(tenant, faults, args.host, args.port)
+    print(f"🧪 Fake Augment API with {args.users} users on http://{args.host}:{server.server_address[1]}/")
+    print(f"   Set METRICS_API_BASE_URL=http://{args.host}:{server.server_address[1]}/ to scrape it")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down fake server.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
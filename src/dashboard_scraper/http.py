@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import importlib.util
+import io
 import logging
+import threading
 import time
-from typing import Optional
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
 
+from .cassette import mount_cassette
 from .config import Settings
 from .cookie_auth import CookieAuth
+from .metrics import NULL_METRICS, NullMetrics, RunMetrics, endpoint_label
+from .tracing import SPAN_KIND_CLIENT, current_span, get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +30,307 @@ class AuthenticationExpiredError(Exception):
     pass
 
 
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to an endpoint whose circuit breaker is open."""
+    pass
+
+
+def supported_encodings() -> List[str]:
+    """Content codings this process can decode: gzip and deflate, plus br when a Brotli module is installed."""
+    encodings = ["gzip", "deflate"]
+    # urllib3 decodes br with either of these packages
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    return encodings
+
+
+def resolve_accept_encoding(setting: str) -> str:
+    """Translate the accept_encoding setting into an Accept-Encoding header value."""
+    value = setting.strip().lower()
+    if value == "auto":
+        return ", ".join(supported_encodings())
+    if value in ("", "none", "identity"):
+        return "identity"
+    return setting.strip()
+
+
+# Compressed JSON bodies inflate 10-20x, so compressed bodies are read in
+# smaller wire chunks to keep each decoded chunk near the requested size
+_COMPRESSION_READ_DIVISOR = 16
+
+
+class _ContentDecoder:
+    """Incremental decoder for a Content-Encoding header value (e.g. "gzip" or "gzip, br")."""
+
+    def __init__(self, content_encoding: str) -> None:
+        codings = [c.strip().lower() for c in content_encoding.split(",") if c.strip()]
+        # Codings are listed in the order they were applied
+        self._decoders = [self._new(c) for c in reversed(codings) if c != "identity"]
+
+    @property
+    def compressed(self) -> bool:
+        return bool(self._decoders)
+
+    @staticmethod
+    def _new(coding: str):
+        if coding in ("gzip", "x-gzip"):
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if coding == "deflate":
+            return _DeflateDecoder()
+        if coding == "br":
+            try:
+                import brotli
+            except ImportError:
+                import brotlicffi as brotli
+            return brotli.Decompressor()
+        raise requests.exceptions.ContentDecodingError(f"Unsupported Content-Encoding: {coding}")
+
+    def decompress(self, data: bytes) -> bytes:
+        for d in self._decoders:
+            data = d.process(data) if hasattr(d, "process") else d.decompress(data)
+        return data
+
+    def flush(self) -> bytes:
+        data = b""
+        for d in self._decoders:
+            if data:
+                data = d.process(data) if hasattr(d, "process") else d.decompress(data)
+            if hasattr(d, "flush"):
+                data += d.flush()
+        return data
+
+
+class _DeflateDecoder:
+    """Decodes zlib-wrapped deflate, falling back to the raw deflate some servers send."""
+
+    def __init__(self) -> None:
+        self._obj = zlib.decompressobj()
+        self._probing = True
+
+    def decompress(self, data: bytes) -> bytes:
+        if not self._probing:
+            return self._obj.decompress(data)
+        self._probing = False
+        try:
+            return self._obj.decompress(data)
+        except zlib.error:
+            self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class RateLimiter:
+    """Spaces requests at least ``1 / per_second`` apart, across all threads sharing it."""
+
+    def __init__(self, per_second: float) -> None:
+        """
+        Initialize the limiter.
+
+        Args:
+            per_second: Maximum request rate; 0 or less disables limiting
+        """
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Wait for the next request slot; returns the seconds waited."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def is_outage(error: requests.RequestException) -> bool:
+    """Whether a failed request means the endpoint is unavailable: connection errors, timeouts, 429 and 5xx."""
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else 0
+        return status == 429 or status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError))
+
+
+class CircuitBreaker:
+    """
+    Fails fast on an endpoint that keeps failing.
+
+    Closed: requests go through; ``failure_threshold`` consecutive failed
+    requests (after their retries) open the circuit. Only failures that say
+    the endpoint is unavailable count (see ``is_outage``); a 4xx is about the
+    request, not the endpoint. Open: requests are refused without being sent.
+    After ``reset_seconds`` the circuit is half-open: one probe request goes
+    through, and closes the circuit if it succeeds or opens it for another
+    ``reset_seconds`` if it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Returned by allow(): a request in the closed state, or the half-open probe
+    PASS = "pass"
+    PROBE = "probe"
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Time the circuit stays open before a probe is allowed
+            clock: Monotonic time source (for tests)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.skipped = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[str]:
+        """
+        Whether a request may be sent now.
+
+        Returns:
+            PASS while the circuit is closed, PROBE for the one request let
+            through while half-open (it must end in record_success,
+            record_failure or release), or None (counting the skip) while the
+            circuit is open or the probe is still in flight
+        """
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return self.PASS
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return self.PROBE
+            self.skipped += 1
+            return None
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit closed again after a successful probe")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+    def release(self) -> None:
+        """End a request whose outcome says nothing about the endpoint's health."""
+        with self._lock:
+            self._probing = False
+
+
+# Set when a send had to open a TCP connection, either a new pooled connection
+# or a reconnect of one the server closed (per thread, since a thread sends one
+# request at a time)
+_connection_state = threading.local()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        _connection_state.opened = True
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        _connection_state.opened = True
+        super().connect()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with explicit pool sizing and no urllib3-level retries.
+
+    Retries, backoff and range splitting are done by HTTPClient, so urllib3
+    is told never to retry on its own (a hidden retry would double the
+    attempts and skew the latency metrics). Each send reports whether it
+    reused a pooled keep-alive connection or had to open a new one.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int,
+        pool_maxsize: int,
+        on_send: Optional[Callable[[bool], None]] = None,
+    ) -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            pool_connections: Number of per-host pools kept
+            pool_maxsize: Connections kept open per host; should be at least
+                the number of threads sending concurrently
+            on_send: Called after each send with True if a pooled connection
+                was reused
+        """
+        self.on_send = on_send
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                         max_retries=Retry(total=0, read=False, redirect=False))
+
+    def init_poolmanager(self, *args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:  # type: ignore[override]
+        _connection_state.opened = False
+        resp = super().send(request, **kwargs)
+        if self.on_send is not None:
+            self.on_send(not _connection_state.opened)
+        return resp
+
+
+class TransferStats:
+    def __init__(self) -> None:
+        self.responses = 0
+        self.wire_bytes = 0
+        self.body_bytes = 0
+        self.encodings: Dict[str, int] = {}
+
+
 class HTTPClient:
     def __init__(
         self,
         settings: Settings,
-        cookie_auth: CookieAuth
+        cookie_auth: CookieAuth,
+        metrics: RunMetrics | NullMetrics = NULL_METRICS
     ) -> None:
         """
         Initialize HTTP client with cookie authentication.
@@ -29,18 +338,129 @@ class HTTPClient:
         Args:
             settings: Application settings
             cookie_auth: Cookie authentication manager
+            metrics: Run metrics recorder (no-op unless run metrics are enabled)
         """
         self.s = settings
         self.cookie_auth = cookie_auth
+        self.metrics = metrics
         self.session = requests.Session()
+        self.rate_limiter = RateLimiter(self.s.max_requests_per_second)
+
+        # Sized connection pool; new vs. reused connections are counted per request
+        self.connections_opened = 0
+        self.connections_reused = 0
+        adapter = PooledAdapter(self.s.http_pool_connections, self.s.http_pool_maxsize, on_send=self._count_connection)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not self.s.http_keep_alive:
+            self.session.headers["Connection"] = "close"
+
+        # Negotiate compression explicitly rather than relying on library defaults
+        self.session.headers["Accept-Encoding"] = resolve_accept_encoding(self.s.accept_encoding)
+
+        # One circuit breaker per endpoint path (CIRCUIT_BREAKER_THRESHOLD=0 disables them)
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+        # Running total of bytes received on the wire (read by progress reporting)
+        # and per-endpoint wire vs. decoded byte counts
+        self.bytes_received = 0
+        self.transfer: Dict[str, TransferStats] = {}
+        self._bytes_lock = threading.Lock()
+
+        # Record or replay traffic through a cassette instead of the plain transport
+        self.cassette = None
+        if self.s.cassette_mode:
+            self.cassette = mount_cassette(
+                self.session,
+                self.s.cassette_mode,
+                Path(self.s.cassette_file),
+                latency_scale=self.s.cassette_latency_scale,
+                match_query=self.s.cassette_match_query,
+                pool_connections=self.s.http_pool_connections,
+                pool_maxsize=self.s.http_pool_maxsize,
+            )
+            logger.info("HTTP cassette %s: %s", self.s.cassette_mode, self.s.cassette_file)
 
         # Set up cookies
+        self._cookie_version = self.cookie_auth.file_version()
         cookies = self.cookie_auth.get_cookies_dict()
         if cookies:
             self.session.cookies.update(cookies)
             logger.info("Loaded %d cookies into session", len(cookies))
+        # Cookies rotated by the server are written back to the cookie file (not when replaying)
+        self.persist_cookies = self.s.persist_cookies and self.s.cassette_mode != "replay"
+
+    def _breaker(self, url: str) -> Optional[CircuitBreaker]:
+        if self.s.circuit_breaker_threshold <= 0:
+            return None
+        key = endpoint_label(url)
+        with self._breakers_lock:
+            breaker = self.breakers.get(key)
+            if breaker is None:
+                breaker = self.breakers[key] = CircuitBreaker(self.s.circuit_breaker_threshold,
+                                                              self.s.circuit_breaker_reset_seconds)
+            return breaker
+
+    def _count_connection(self, reused: bool) -> None:
+        with self._bytes_lock:
+            if reused:
+                self.connections_reused += 1
+            else:
+                self.connections_opened += 1
+        self.metrics.record_connection(reused)
+
+    def _apply_rotated_cookies(self, resp: requests.Response) -> None:
+        changes = {cookie.name: cookie.value for cookie in resp.cookies if cookie.value is not None}
+        # Cookies loaded from the file have no domain, so the server's domain-scoped
+        # replacement is stored next to them; drop the stale copy or both would be sent
+        for cookie in list(self.session.cookies):
+            if cookie.name in changes and not cookie.domain:
+                self.session.cookies.clear(cookie.domain, cookie.path, cookie.name)
+        if not self.persist_cookies:
+            return
+        # Persisting lets the next run (or a restarted daemon) start from the rotated
+        # session instead of an expired one
+        try:
+            if self.cookie_auth.update_cookies(changes):
+                self._cookie_version = self.cookie_auth.file_version()
+        except OSError as e:
+            logger.warning("Failed to save refreshed cookies to %s: %s", self.cookie_auth.cookie_file, e)
 
-    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+    def reload_cookies_if_changed(self) -> bool:
+        """
+        Reload the session cookies if the cookie file changed since they were loaded.
+
+        Long-running processes (--daemon) call this before each run, so
+        re-authenticating with --auth takes effect without a restart.
+
+        Returns:
+            True if the cookies were reloaded
+        """
+        version = self.cookie_auth.file_version()
+        if version == self._cookie_version:
+            return False
+        self._cookie_version = version
+        self.session.cookies.clear()
+        self.session.cookies.update(self.cookie_auth.get_cookies_dict())
+        logger.info("Reloaded cookies from %s", self.cookie_auth.cookie_file)
+        return True
+
+    def request(self, method: str, url: str, retry_timeouts: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying connection errors, timeouts and 429/5xx responses with backoff.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            retry_timeouts: Retry requests that time out; callers that can make
+                a smaller request instead pass False (their failures then do not
+                count towards the endpoint's circuit breaker)
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            The successful response (body already read unless stream=True)
+        """
         headers = kwargs.pop("headers", {})
         kwargs["headers"] = headers
         kwargs.setdefault("timeout", self.s.request_timeout_seconds)
@@ -49,34 +469,204 @@ class HTTPClient:
         backoff = self.s.retry_backoff_seconds
         max_retries = self.s.max_retries
 
-        while True:
-            try:
-                resp = self.session.request(method, url, **kwargs)
-                if resp.status_code == 401:
-                    # Cookie auth failed - session expired
-                    logger.error("⚠️  401 Unauthorized - Session has expired")
-                    logger.error("Run with --auth to manually set up new cookies.")
-                    raise AuthenticationExpiredError(
-                        "Session expired. Please re-authenticate with --auth"
-                    )
-
-                if resp.status_code in {429, 500, 502, 503, 504} and attempt < max_retries:
-                    attempt += 1
-                    sleep = backoff * (2 ** (attempt - 1))
-                    logger.warning("HTTP %s; retrying in %.1fs (attempt %d/%d)", resp.status_code, sleep, attempt, max_retries)
-                    time.sleep(sleep)
-                    continue
-                resp.raise_for_status()
-                return resp
-            except AuthenticationExpiredError:
-                raise
-            except requests.RequestException as e:
-                if attempt < max_retries:
-                    attempt += 1
-                    sleep = backoff * (2 ** (attempt - 1))
-                    logger.warning("Request error %s; retrying in %.1fs (attempt %d/%d)", e, sleep, attempt, max_retries)
-                    time.sleep(sleep)
-                    continue
-                logger.error("Request failed after %d attempts", attempt)
-                raise
+        metrics = self.metrics
+        breaker = self._breaker(url)
+        admission = None
+        if breaker is not None:
+            admission = breaker.allow()
+            if admission is None:
+                metrics.record_skip(url)
+                logger.debug("Circuit open for %s; skipping request", endpoint_label(url))
+                raise CircuitOpenError(f"Circuit open for {endpoint_label(url)} after repeated failures; "
+                                       f"request skipped")
+            if admission == CircuitBreaker.PROBE:
+                # The probe gets one attempt; the circuit reopens if it fails
+                max_retries = 0
+        # Bodies are always read here (or in iter_body) so wire bytes can be counted
+        stream = kwargs.get("stream", False)
+        kwargs["stream"] = True
+
+        try:
+            span_attributes = {"http.request.method": method, "url.path": endpoint_label(url)}
+            with get_tracer().start_span(f"HTTP {method}", span_attributes, kind=SPAN_KIND_CLIENT) as span:
+                while True:
+                    self.rate_limiter.acquire()
+                    started = time.perf_counter()
+                    try:
+                        resp = self.session.request(method, url, **kwargs)
+                        if resp.cookies:
+                            self._apply_rotated_cookies(resp)
+                        span.set_attribute("http.response.status_code", resp.status_code)
+                        if not stream or resp.status_code >= 400:
+                            # Streamed bodies are counted as they are read (see iter_body); error
+                            # bodies are read here so the connection can be reused
+                            resp._content = self._read_body(resp)
+                        if metrics.enabled:
+                            metrics.observe_request(url, str(resp.status_code), time.perf_counter() - started)
+                        if resp.status_code == 401:
+                            # Cookie auth failed - session expired
+                            logger.error("⚠️  401 Unauthorized - Session has expired")
+                            logger.error("Run with --auth to manually set up new cookies.")
+                            raise AuthenticationExpiredError(
+                                "Session expired. Please re-authenticate with --auth"
+                            )
+
+                        if resp.status_code in {429, 500, 502, 503, 504} and attempt < max_retries:
+                            attempt += 1
+                            metrics.record_retry(url)
+                            sleep = backoff * (2 ** (attempt - 1))
+                            span.add_event("retry", {"attempt": attempt, "http.response.status_code": resp.status_code,
+                                                     "backoff_seconds": sleep})
+                            resp.close()
+                            logger.warning("HTTP %s; retrying in %.1fs (attempt %d/%d)",
+                                           resp.status_code, sleep, attempt, max_retries)
+                            time.sleep(sleep)
+                            continue
+                        resp.raise_for_status()
+                        span.set_attribute("http.retry_count", attempt)
+                        if breaker is not None:
+                            breaker.record_success()
+                        return resp
+                    except requests.RequestException as e:
+                        if not isinstance(e, requests.HTTPError):
+                            # HTTP errors were already observed with their status code
+                            metrics.observe_request(url, "error", time.perf_counter() - started)
+                        if attempt < max_retries and (retry_timeouts or not isinstance(e, requests.Timeout)):
+                            attempt += 1
+                            metrics.record_retry(url)
+                            sleep = backoff * (2 ** (attempt - 1))
+                            span.add_event("retry", {"attempt": attempt, "error": str(e), "backoff_seconds": sleep})
+                            logger.warning("Request error %s; retrying in %.1fs (attempt %d/%d)",
+                                           e, sleep, attempt, max_retries)
+                            time.sleep(sleep)
+                            continue
+                        logger.error("Request failed after %d attempts", attempt)
+                        metrics.record_failure(url)
+                        # When the caller retries with smaller date ranges, a range that is too
+                        # big says nothing about whether the endpoint is up
+                        if breaker is not None and retry_timeouts and is_outage(e):
+                            self._record_breaker_failure(breaker, url)
+                        raise
+        except BaseException:
+            # However the probe ended (a cassette miss, an unreadable body, an interrupt, ...),
+            # free its slot so the half-open circuit is not stuck; after record_failure this
+            # is a no-op
+            if admission == CircuitBreaker.PROBE:
+                breaker.release()
+            raise
+
+    def _record_breaker_failure(self, breaker: CircuitBreaker, url: str) -> None:
+        was_open = breaker.state
+        breaker.record_failure()
+        if breaker.state == CircuitBreaker.OPEN:
+            current_span().add_event("circuit_open", {"url.path": endpoint_label(url)})
+            if was_open == CircuitBreaker.CLOSED:
+                logger.warning("Circuit opened for %s after %d consecutive failures; skipping it for %.0fs",
+                               endpoint_label(url), breaker.failures, breaker.reset_seconds)
+            else:
+                logger.warning("Probe of %s failed; circuit stays open for %.0fs",
+                               endpoint_label(url), breaker.reset_seconds)
+
+    def _add_received(self, size: int) -> None:
+        with self._bytes_lock:
+            self.bytes_received += size
+
+    def _record_transfer(self, url: str, resp: requests.Response, wire_bytes: int, body_bytes: int) -> None:
+        encoding = resp.headers.get("Content-Encoding", "identity").lower()
+        key = endpoint_label(url)
+        with self._bytes_lock:
+            stats = self.transfer.get(key)
+            if stats is None:
+                stats = self.transfer[key] = TransferStats()
+            stats.responses += 1
+            stats.wire_bytes += wire_bytes
+            stats.body_bytes += body_bytes
+            stats.encodings[encoding] = stats.encodings.get(encoding, 0) + 1
+        self.metrics.record_transfer(url, wire_bytes, body_bytes)
+
+    def transfer_summary(self) -> List[str]:
+        """
+        One line per endpoint (responses, wire vs. decoded bytes, encodings seen),
+        then tripped circuit breakers, then connection reuse.
+        """
+        lines = []
+        with self._bytes_lock:
+            items = sorted(self.transfer.items())
+            opened, reused = self.connections_opened, self.connections_reused
+        for path, t in items:
+            ratio = f"{t.body_bytes / t.wire_bytes:.1f}x" if t.wire_bytes else "-"
+            encodings = ", ".join(f"{name} {n}" for name, n in sorted(t.encodings.items()))
+            lines.append(f"{path}: {t.responses} responses, {t.wire_bytes / 1e6:.2f} MB on the wire, "
+                         f"{t.body_bytes / 1e6:.2f} MB decoded ({ratio}; {encodings})")
+        with self._breakers_lock:
+            breakers = sorted(self.breakers.items())
+        for path, breaker in breakers:
+            if breaker.skipped or breaker.state != CircuitBreaker.CLOSED:
+                lines.append(f"{path}: circuit {breaker.state.replace('_', '-')}, "
+                             f"{breaker.skipped} requests skipped")
+        if opened or reused:
+            lines.append(f"connections: {opened} opened, {reused} reused")
+        return lines
+
+    def _read_body(self, resp: requests.Response) -> bytes:
+        # Unlike b"".join(), which keeps every chunk alive until the end, a BytesIO
+        # frees each chunk once written and hands over its buffer without a copy,
+        # so a buffered response is held in memory once instead of twice
+        buf = io.BytesIO()
+        for chunk in self.iter_body(resp):
+            buf.write(chunk)
+        return buf.getvalue()
+
+    def iter_body(self, resp: requests.Response, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Iterate over the body of a ``stream=True`` response, counting bytes received.
+
+        Args:
+            resp: Response returned by request(..., stream=True)
+            chunk_size: Read size in bytes
+
+        Yields:
+            Decoded (decompressed) body chunks
+        """
+        wire_bytes = body_bytes = 0
+        try:
+            for chunk, wire in self._iter_wire(resp, chunk_size):
+                wire_bytes += wire
+                body_bytes += len(chunk)
+                self._add_received(wire)
+                if chunk:
+                    yield chunk
+        finally:
+            # Also counts bodies abandoned part way through
+            self._record_transfer(resp.url, resp, wire_bytes, body_bytes)
+
+    @staticmethod
+    def _iter_wire(resp: requests.Response, chunk_size: int) -> Iterator[Tuple[bytes, int]]:
+        """Yield (decoded chunk, wire bytes read for it) pairs for ``resp``'s body."""
+        raw = resp.raw
+        if resp._content_consumed or not hasattr(raw, "stream"):
+            # Already read (cassette recording) or not a urllib3 response (cassette
+            # replay): the transfer size is unknown, so count the decoded size
+            for chunk in resp.iter_content(chunk_size=chunk_size):
+                yield chunk, len(chunk)
+            return
+
+        decoder = _ContentDecoder(resp.headers.get("Content-Encoding", ""))
+        if decoder.compressed:
+            chunk_size = max(4096, chunk_size // _COMPRESSION_READ_DIVISOR)
+        try:
+            for data in raw.stream(chunk_size, decode_content=False):
+                yield decoder.decompress(data), len(data)
+            yield decoder.flush(), 0
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ReadTimeout(e)
+        except (DecodeError, zlib.error) as e:
+            raise requests.exceptions.ContentDecodingError(e)
+        finally:
+            resp._content_consumed = True
 
+    def close(self) -> None:
+        """Close the session (and finish a cassette recording)."""
+        self.session.close()
@@ -0,0 +1,141 @@
+"""
+Byte-offset index for random access into Copilot JSON array files.
+
+Writers emit the array exactly as ``json.dump(records, f, indent=2)`` would,
+while recording where each record starts and how long it is. The offsets are
+stored in a sidecar file (``<name>.json.idx``) keyed by ``user_login`` and
+``user_id``, so a single user's record can be decoded from a memory-mapped
+file without parsing the whole array.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+
+def index_path_for(path: Path) -> Path:
+    """Return the sidecar index path for a JSON file."""
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _encode_element(record: Dict[str, Any]) -> bytes:
+    # Same layout as an element nested inside json.dump(list, indent=2)
+    text = json.dumps(record, indent=2)
+    return ("  " + text.replace("\n", "\n  ")).encode("utf-8")
+
+
+def write_indexed_json(records: List[Dict[str, Any]], output_path: Path) -> None:
+    """
+    Write records as an indented JSON array plus a sidecar byte-offset index.
+
+    Both files are written atomically, and left untouched when their content
+    has not changed.
+
+    Args:
+        records: Copilot per-user records (must have user_login and user_id)
+        output_path: Path to output JSON file
+    """
+    by_login: Dict[str, List[Tuple[int, int]]] = {}
+    by_id: Dict[str, List[Tuple[int, int]]] = {}
+
+    with atomic_write(output_path, "wb", keep_unchanged=True) as f:
+        if not records:
+            f.write(b"[]")
+        else:
+            f.write(b"[\n")
+            offset = 2
+            for i, record in enumerate(records):
+                if i:
+                    f.write(b",\n")
+                    offset += 2
+                element = _encode_element(record)
+                f.write(element)
+                # Offsets point at the record's opening brace, after the indentation
+                entry = (offset + 2, len(element) - 2)
+                by_login.setdefault(record["user_login"], []).append(entry)
+                by_id.setdefault(str(record["user_id"]), []).append(entry)
+                offset += len(element)
+            f.write(b"\n]")
+
+    stat = os.stat(output_path)
+    index = {
+        "version": INDEX_VERSION,
+        "file": output_path.name,
+        "file_size": stat.st_size,
+        "file_mtime_ns": stat.st_mtime_ns,
+        "records": len(records),
+        "by_login": by_login,
+        "by_id": by_id,
+    }
+    with atomic_write(index_path_for(output_path), keep_unchanged=True) as f:
+        json.dump(index, f, separators=(",", ":"))
+
+
+def load_index(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load the sidecar index for ``path`` if it exists and matches the file.
+
+    Returns:
+        The index dictionary, or None if missing or stale
+    """
+    idx_path = index_path_for(path)
+    if not idx_path.exists():
+        return None
+
+    try:
+        with open(idx_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logger.warning("Ignoring unreadable index %s: %s", idx_path, e)
+        return None
+
+    stat = os.stat(path)
+    if (
+        index.get("version") != INDEX_VERSION
+        or index.get("file_size") != stat.st_size
+        or index.get("file_mtime_ns") != stat.st_mtime_ns
+    ):
+        logger.warning("Index %s is stale; ignoring it", idx_path)
+        return None
+    return index
+
+
+def lookup_records(path: Path, user: str) -> List[Dict[str, Any]]:
+    """
+    Find the records of one user by ``user_login`` or numeric ``user_id``.
+
+    Only the requested records are decoded, from a memory-mapped view of the
+    file. Files without a valid index fall back to a full parse.
+
+    Args:
+        path: Copilot JSON array file
+        user: user_login (e.g. "x@y.com") or user_id
+
+    Returns:
+        Matching records (empty if the user is not present)
+    """
+    index = load_index(path)
+    if index is None:
+        logger.warning("No valid index for %s; parsing the whole file", path)
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        return [r for r in records if r.get("user_login") == user or str(r.get("user_id")) == user]
+
+    entries = index["by_login"].get(user) or index["by_id"].get(user) or []
+    if not entries:
+        return []
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return [json.loads(mm[offset:offset + length]) for offset, length in entries]
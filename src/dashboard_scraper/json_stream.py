@@ -0,0 +1,128 @@
+"""
+Incremental decoding of one array inside a streamed JSON object.
+
+``iter_array_items`` reads a response body chunk by chunk and yields the
+elements of a top-level array (e.g. ``userFeatureStats``) as soon as each
+one is complete, so memory is bounded by the chunk size plus one element
+instead of the whole body and its object tree. Each element is decoded with
+``json.JSONDecoder.raw_decode``; the surrounding object is walked by hand.
+Other top-level members are decoded and discarded.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Buffer:
+    """Text buffer refilled from an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk; False once the input is exhausted."""
+        if self.eof:
+            return False
+        # Drop consumed text so the buffer stays around one chunk long
+        if self.pos > 65536 and self.pos > len(self.text) // 2:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._utf8.decode(chunk)
+                return True
+        self.text += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at end of input)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found[:1]!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A value ending exactly at the buffer end may be truncated (e.g. a number)
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Yield the elements of ``obj[key]`` from a streamed JSON object.
+
+    Args:
+        chunks: The response body as byte chunks (e.g. ``resp.iter_content``)
+        key: Name of the top-level array member to stream
+
+    Yields:
+        Decoded array elements, in order. Nothing is yielded if the key is
+        missing or null.
+
+    Raises:
+        ValueError: If the body is not a JSON object or is malformed
+    """
+    buf = _Buffer(chunks)
+    buf.expect("{")
+    if buf.peek() == "}":
+        return
+
+    while True:
+        name = buf.value()
+        if not isinstance(name, str):
+            raise ValueError(f"Expected an object key at offset {buf.pos}")
+        buf.expect(":")
+
+        if name == key and buf.peek() == "[":
+            buf.pos += 1
+            if buf.peek() == "]":
+                buf.pos += 1
+            else:
+                while True:
+                    yield buf.value()
+                    sep = buf.peek()
+                    buf.pos += 1
+                    if sep == "]":
+                        break
+                    if sep != ",":
+                        raise ValueError(f"Expected ',' or ']' in {key!r} at offset {buf.pos - 1}")
+        else:
+            buf.value()
+
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"Expected ',' or '}}' at offset {buf.pos - 1}")
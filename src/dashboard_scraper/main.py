@@ -1,18 +1,47 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
+import os
 import sys
+from contextlib import ExitStack
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
-from .client import DashboardClient
-from .config import load_settings
-from .cookie_auth import CookieAuth, interactive_cookie_setup
+# Only lightweight modules are imported here. Everything else (requests via
+# client/http, pydantic_settings via config, cookie auth, export, metrics,
+# progress, tracing) is imported on the code paths that need it, so --help and
+# --auth start without it (see tests/test_startup.py).
 from .date_utils import compute_lookback_window, compute_last_28_days
-from .export import write_csv
-from .http import HTTPClient, AuthenticationExpiredError
 from .logging_config import setup_logging
 
+if TYPE_CHECKING:
+    from .config import Settings
+    from .metrics import NullMetrics, RunMetrics
+
+# Settings used by --auth, with their defaults in config.Settings
+AUTH_SETTINGS = {"cookie_file": "secrets/cookies.json", "log_level": "INFO"}
+PROGRESS_CHOICES = "auto, tty, log or silent"
+
+
+def read_auth_settings() -> Dict[str, str]:
+    """
+    Resolve AUTH_SETTINGS as Settings would, without importing pydantic_settings.
+
+    Environment variables (any case) win over ``.env``, which wins over the
+    default. ``.env`` is parsed with python-dotenv, as pydantic_settings does.
+
+    Returns:
+        Setting name -> value
+    """
+    from dotenv import dotenv_values
+
+    environ = {name.lower(): value for name, value in os.environ.items()}
+    dotenv = {name.lower(): value for name, value in dotenv_values(".env").items() if value is not None}
+    return {name: environ.get(name, dotenv.get(name, default)) for name, default in AUTH_SETTINGS.items()}
+
 
 def parse_date(date_str: str) -> datetime:
     """
@@ -31,6 +60,53 @@ def parse_date(date_str: str) -> datetime:
         raise ValueError(f"Invalid date format: {date_str}. Expected MM-DD-YYYY (e.g., 10-20-2025)")
 
 
+def resolve_date_range(dates: List[str], lookback_days: int) -> Tuple[datetime, datetime]:
+    """
+    Compute the date range for the positional date arguments.
+
+    Args:
+        dates: Zero, one or two dates in MM-DD-YYYY format
+        lookback_days: Days to fetch when no date is given
+
+    Returns:
+        (start, end) datetimes in UTC
+
+    Raises:
+        ValueError: If a date is malformed or more than two are given
+    """
+    logger = logging.getLogger(__name__)
+
+    if not dates:
+        # Default: use lookback window from config
+        logger.info("Fetching metrics for last %d days", lookback_days)
+        return compute_lookback_window(lookback_days)
+
+    if len(dates) == 1:
+        # Single date: get metrics for that 24-hour period (or up to now if today)
+        start = parse_date(dates[0])
+        now = datetime.now(timezone.utc)
+
+        # End of day is 23:59:59.999999
+        end_of_day = start.replace(hour=23, minute=59, second=59, microsecond=999999)
+
+        # If the date is today, use current time instead of end of day
+        if start.date() == now.date():
+            logger.info("Fetching metrics for today (%s) up to now", start.date())
+            return start, now
+        logger.info("Fetching metrics for %s (full 24-hour period)", start.date())
+        return start, end_of_day
+
+    if len(dates) == 2:
+        # Date range: from start date 00:00:00 to end date 23:59:59
+        start = parse_date(dates[0])
+        end_date = parse_date(dates[1])
+        end = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        logger.info("Fetching metrics from %s to %s", start.date(), end.date())
+        return start, end
+
+    raise ValueError("Too many date arguments. Expected 0, 1, or 2 dates.")
+
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
         description="Dashboard metrics scraper with cookie-based authentication",
@@ -48,6 +124,31 @@ Examples:
   # Last 28 days (for Copilot-compatible daily metrics)
   python -m dashboard_scraper --last-28-days
 
+  # Profile each stage (fetch, csv, convert, aggregate) and write pstats + a hotspot summary
+  python -m dashboard_scraper --last-28-days --profile
+
+  # Write run_metrics.json and a Prometheus textfile (latency histograms, retries, stage timings)
+  python -m dashboard_scraper --last-28-days --metrics
+
+  # Write an OTLP JSON trace (per-day, endpoint and HTTP request spans; retries as events)
+  python -m dashboard_scraper --last-28-days --trace
+
+  # Record the API traffic of a run, then replay it offline (optionally with the recorded latencies)
+  python -m dashboard_scraper --last-28-days --record cassettes/run.cassette.jsonl.gz
+  python -m dashboard_scraper --last-28-days --replay cassettes/run.cassette.jsonl.gz --replay-latency 1
+
+  # Serve generated Copilot JSON over a local Copilot Metrics-style HTTP API
+  python -m dashboard_scraper --serve
+
+  # Look up one user's record in the latest aggregated file (uses the byte-offset index)
+  python -m dashboard_scraper --lookup user@example.com
+
+  # Stay resident and run the 28-day sync daily at DAEMON_SCHEDULE (UTC), reusing one HTTP session
+  python -m dashboard_scraper --daemon
+
+  # Scrape every tenant listed in a tenants file concurrently, with a combined report
+  python -m dashboard_scraper --last-28-days --tenants tenants.json
+
 Authentication:
   # Manual cookie setup (interactive)
   python -m dashboard_scraper --auth
@@ -59,21 +160,89 @@ Authentication:
     p.add_argument("--auth", action="store_true", help="Set up cookie-based authentication (interactive)")
     p.add_argument("--last-28-days", action="store_true",
                    help="Generate daily metrics for last 28 days (28 days ago to yesterday) in Copilot-compatible format")
+    p.add_argument("--profile", action="store_true",
+                   help="Profile CPU and peak memory per stage; reports go to a profile_* folder in the export dir")
+    p.add_argument("--metrics", action="store_true",
+                   help="Write run metrics as JSON and a Prometheus textfile at the end of the run (see RUN_METRICS)")
+    p.add_argument("--trace", action="store_true",
+                   help="Record tracing spans and write them as OTLP JSON at the end of the run (see TRACING)")
+    p.add_argument("--record", metavar="CASSETTE", help="Record all HTTP exchanges of this run to a cassette file")
+    p.add_argument("--replay", metavar="CASSETTE",
+                   help="Answer HTTP requests from a recorded cassette instead of the network")
+    p.add_argument("--replay-latency", type=float, default=None, metavar="SCALE",
+                   help="With --replay, sleep SCALE x the recorded latency per response (default 0)")
+    p.add_argument("--serve", action="store_true",
+                   help="Serve generated Copilot metrics from the export directory over a local HTTP API")
+    p.add_argument("--port", type=int, default=None, help="Port for --serve (overrides SERVE_PORT)")
+    p.add_argument("--lookup", metavar="USER",
+                   help="Print the records of one user (login or user_id) from an aggregated Copilot JSON file")
+    p.add_argument("--file", help="JSON file for --lookup (default: latest copilot_metrics_aggregated file)")
+    p.add_argument("--window", default="all", help="Aggregate window for --lookup when --file is not given")
+    p.add_argument("--daemon", action="store_true",
+                   help="Stay running and run the 28-day sync at the DAEMON_SCHEDULE times, reusing one session")
+    p.add_argument("--tenants", metavar="FILE",
+                   help="Scrape every tenant in a JSON tenants file concurrently (see TENANT_WORKERS)")
+    p.add_argument("--progress", default=None,
+                   help=f"Progress output for --last-28-days: {PROGRESS_CHOICES} (overrides PROGRESS; default auto)")
     p.add_argument("--log-level", default=None, help="Override log level (INFO/DEBUG/...)")
-    return p.parse_args()
+    args = p.parse_args()
+    if args.progress is not None:
+        # Checked here rather than with choices=, so --help does not import progress.py
+        from .progress import PROGRESS_MODES
+
+        if args.progress not in PROGRESS_MODES:
+            p.error(f"argument --progress: invalid choice: '{args.progress}' (choose from {PROGRESS_CHOICES})")
+    return args
 
 
 def main() -> None:
     args = parse_args()
-    s = load_settings()
-    setup_logging(args.log_level or s.log_level)
-
     logger = logging.getLogger(__name__)
 
     # Handle manual authentication setup
     if args.auth:
+        from .cookie_auth import interactive_cookie_setup
+
+        auth = read_auth_settings()
+        setup_logging(args.log_level or auth["log_level"])
         logger.info("Setting up cookie-based authentication")
-        interactive_cookie_setup(s.cookie_file_path())
+        cookie_file = Path(auth["cookie_file"])
+        cookie_file.parent.mkdir(parents=True, exist_ok=True)
+        interactive_cookie_setup(cookie_file)
+        return
+
+    from .config import load_settings
+
+    s = load_settings()
+    setup_logging(args.log_level or s.log_level)
+
+    # Serve already generated data; no API access or cookies required
+    if args.serve:
+        from .server import serve
+        from .store import MetricsStore
+
+        store = MetricsStore(s.export_dir_path(), cache_size=s.serve_cache_windows,
+                             refresh_seconds=s.serve_refresh_seconds)
+        serve(store, s.serve_host, args.port if args.port is not None else s.serve_port)
+        return
+
+    if args.lookup:
+        from .json_index import lookup_records
+        from .store import MetricsStore
+
+        if args.file:
+            path = Path(args.file)
+        else:
+            path = MetricsStore(s.export_dir_path()).aggregated_path(args.window)
+        if path is None or not path.exists():
+            print(f"❌ No aggregated file found for window '{args.window}'. Use --file to choose one.")
+            sys.exit(1)
+
+        records = lookup_records(path, args.lookup)
+        if not records:
+            print(f"❌ User {args.lookup} not found in {path}")
+            sys.exit(1)
+        print(json.dumps(records if len(records) > 1 else records[0], indent=2))
         return
 
     # Check for mutual exclusivity between --last-28-days and date arguments
@@ -83,20 +252,82 @@ def main() -> None:
         print("   Use either --last-28-days OR provide date(s) in MM-DD-YYYY format")
         sys.exit(1)
 
+    if args.daemon and (args.dates or args.tenants or args.profile or args.trace):
+        print("❌ Error: --daemon runs the 28-day sync and cannot be combined with dates, --tenants, "
+              "--profile or --trace")
+        sys.exit(1)
+
+    if args.tenants:
+        run_tenants_mode(args, s)
+        return
+
+    if args.record and args.replay:
+        print("❌ Error: --record and --replay cannot be used together")
+        sys.exit(1)
+    if args.record:
+        s = s.model_copy(update={"cassette_mode": "record", "cassette_file": args.record})
+    elif args.replay:
+        update = {"cassette_mode": "replay", "cassette_file": args.replay}
+        if args.replay_latency is not None:
+            update["cassette_latency_scale"] = args.replay_latency
+        s = s.model_copy(update=update)
+
+    from .cookie_auth import CookieAuth
+
     # Set up HTTP client with cookie authentication
     logger.info("Using cookie-based authentication")
     cookie_auth = CookieAuth(s.cookie_file_path())
-    if not cookie_auth.has_cookies():
+    # Replayed runs never reach the API, so they need no cookies
+    if not cookie_auth.has_cookies() and s.cassette_mode != "replay":
         logger.error("No cookies found. Run with --auth to set up cookies.")
         print("❌ No cookies found.")
         print("\nTo authenticate, run:")
         print("  python -m dashboard_scraper --auth")
         return
 
-    http = HTTPClient(s, cookie_auth=cookie_auth)
+    if args.daemon:
+        from .daemon import run_daemon
+
+        if args.metrics:
+            s = s.model_copy(update={"run_metrics": True})
+        try:
+            run_daemon(s, cookie_auth, progress_mode=args.progress)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        return
+
+    from .client import DashboardClient
+    from .export import write_csv
+    from .http import AuthenticationExpiredError, HTTPClient
+    from .metrics import NULL_METRICS, RunMetrics
+    from .tracing import Tracer, set_tracer
+
+    metrics: RunMetrics | NullMetrics = NULL_METRICS
+    if args.metrics or s.run_metrics:
+        metrics = RunMetrics()
+
+    http = HTTPClient(s, cookie_auth=cookie_auth, metrics=metrics)
 
     client = DashboardClient(s, http)
 
+    profiler = None
+    if args.profile:
+        from .profiling import StageProfiler
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        profiler = StageProfiler(s.export_dir_path() / f"profile_{stamp}")
+
+    run_ok = True
+
+    tracer = None
+    trace_scope = ExitStack()
+    if args.trace or s.tracing:
+        tracer = Tracer()
+        set_tracer(tracer)
+        mode = "last_28_days" if args.last_28_days else "range"
+        run_span = trace_scope.enter_context(tracer.start_span("run", {"mode": mode}))
+
     # Parse date arguments and fetch metrics
     try:
 
@@ -107,58 +338,106 @@ def main() -> None:
             start, end = compute_last_28_days()
             logger.info("Processing last 28 days: %s to %s", start.date(), end.date())
 
-            process_last_28_days(client, s, start, end)
+            process_last_28_days(client, s, start, end, profiler=profiler, metrics=metrics,
+                                 progress_mode=args.progress)
             return
 
-        if args.dates:
-            if len(args.dates) == 1:
-                # Single date: get metrics for that 24-hour period (or up to now if today)
-                start = parse_date(args.dates[0])
-                now = datetime.now(timezone.utc)
-
-                # End of day is 23:59:59.999999
-                end_of_day = start.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-                # If the date is today, use current time instead of end of day
-                if start.date() == now.date():
-                    end = now
-                    logger.info("Fetching metrics for today (%s) up to now", start.date())
-                else:
-                    end = end_of_day
-                    logger.info("Fetching metrics for %s (full 24-hour period)", start.date())
-
-            elif len(args.dates) == 2:
-                # Date range: from start date 00:00:00 to end date 23:59:59
-                start = parse_date(args.dates[0])
-                end_date = parse_date(args.dates[1])
-                end = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-                logger.info("Fetching metrics from %s to %s", start.date(), end.date())
-            else:
-                logger.error("Too many date arguments. Expected 0, 1, or 2 dates.")
-                print("❌ Error: Provide either 0 dates (default 30 days), 1 date (single day), or 2 dates (range)")
-                print("   Format: MM-DD-YYYY (e.g., 10-20-2025)")
-                return
-        else:
-            # Default: use lookback window from config
-            start, end = compute_lookback_window(s.lookback_days)
-            logger.info("Fetching metrics for last %d days", s.lookback_days)
+        if len(args.dates) > 2:
+            logger.error("Too many date arguments. Expected 0, 1, or 2 dates.")
+            print("❌ Error: Provide either 0 dates (default 30 days), 1 date (single day), or 2 dates (range)")
+            print("   Format: MM-DD-YYYY (e.g., 10-20-2025)")
+            return
+        start, end = resolve_date_range(args.dates, s.lookback_days)
 
         logger.info("Date range: %s to %s", start, end)
 
-        rows = client.iter_metrics(start, end)
-        out_path = write_csv(rows, s.export_dir_path(), args.out, start_date=start, end_date=end)
+        if profiler is None:
+            # Rows stream from the API into the CSV, so fetch and write share one stage
+            with metrics.stage("export"):
+                rows = client.iter_metrics(start, end)
+                out_path = write_csv(rows, s.export_dir_path(), args.out, start_date=start, end_date=end)
+        else:
+            # Materialize the rows so fetch and CSV writing are profiled separately
+            with metrics.stage("fetch"), profiler.stage("fetch"):
+                rows = list(client.iter_metrics(start, end))
+            with metrics.stage("csv"), profiler.stage("csv"):
+                out_path = write_csv(rows, s.export_dir_path(), args.out, start_date=start, end_date=end)
         print(f"✅ Metrics exported to: {out_path}")
 
     except AuthenticationExpiredError as e:
+        run_ok = False
         logger.error("Authentication failed: %s", e)
         print(f"\n❌ {e}")
         print("\nPlease re-authenticate:")
         print("  python -m dashboard_scraper --auth")
         sys.exit(1)
     except Exception as e:
+        run_ok = False
         logger.error("Error during scraping: %s", e, exc_info=True)
         print(f"\n❌ Error: {e}")
         sys.exit(1)
+    finally:
+        http.close()
+        transfer = http.transfer_summary()
+        if transfer:
+            print("📦 Transfer summary:")
+            for line in transfer:
+                print(f"   {line}")
+        if tracer is not None:
+            if not run_ok:
+                run_span.set_error("run failed")
+            trace_scope.close()
+            if s.trace_file:
+                trace_path = Path(s.trace_file)
+            else:
+                trace_path = s.export_dir_path() / f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            try:
+                tracer.write(trace_path)
+                print(f"🧭 Trace written to: {trace_path}")
+            except OSError as e:
+                logger.error("Failed to write trace: %s", e)
+        if profiler is not None:
+            profiler.write_reports()
+            profiler.close()
+            print(f"📈 Profiling reports written to: {profiler.output_dir}")
+        if metrics.enabled:
+            metrics.set_gauge("run_success", 1 if run_ok else 0)
+            try:
+                metrics.write(s.export_dir_path() / "run_metrics.json", s.run_metrics_textfile_path())
+                print(f"📈 Run metrics written to: {s.run_metrics_textfile_path()}")
+            except OSError as e:
+                logger.error("Failed to write run metrics: %s", e)
+
+
+def run_tenants_mode(args: argparse.Namespace, s: Settings) -> None:
+    """Scrape all tenants of ``--tenants`` and exit non-zero if any failed."""
+    from .tenants import build_report, load_tenants, print_report, run_tenants, write_report
+
+    if args.profile or args.record or args.replay or args.trace:
+        print("❌ Error: --tenants cannot be combined with --profile, --record, --replay or --trace")
+        sys.exit(1)
+
+    try:
+        tenants = load_tenants(Path(args.tenants), s)
+        if args.last_28_days:
+            start, end = compute_last_28_days()
+        else:
+            start, end = resolve_date_range(args.dates, s.lookback_days)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    print(f"🏢 Scraping {len(tenants)} tenants ({min(s.tenant_workers, len(tenants))} at a time)")
+    results = run_tenants(tenants, start, end, last_28_days=args.last_28_days, workers=s.tenant_workers,
+                          progress_mode=args.progress or "silent", write_metrics=args.metrics)
+    report = build_report(results, start, end)
+    print_report(report)
+    try:
+        print(f"📄 Report written to: {write_report(report, s.export_dir_path())}")
+    except OSError as e:
+        logging.getLogger(__name__).error("Failed to write tenants report: %s", e)
+    if report["failed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+Per-directory manifest of the days already written.
+
+``manifest.json`` records, for each day of a daily export directory, a hash
+of the fetched records (plus everything else the day's files depend on),
+the number of rows and the files written for it. On the next run over the
+same range, a day whose fetched data hashes the same and whose files all
+still exist is not rewritten, so unchanged files keep their mtime and
+incremental backups or syncs skip them.
+
+The manifest is only updated for days whose outputs were all written
+successfully, and is itself written atomically.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .atomic import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# Bump when the files written for a day change for the same input
+FORMAT_VERSION = 1
+
+
+def hash_day_input(records: Iterable[Dict[str, Any]], **params: Any) -> str:
+    """
+    Hash a day's fetched records and the parameters its outputs depend on.
+
+    Args:
+        records: The day's records as fetched
+        **params: Anything else that changes the written files (date range,
+            enterprise id, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"version": FORMAT_VERSION, **params}, sort_keys=True).encode("utf-8"))
+    for record in records:
+        digest.update(b"\n")
+        digest.update(json.dumps(record, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DayManifest:
+    """The manifest of one export directory."""
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Load ``manifest.json`` from ``directory`` (empty if missing or unreadable).
+
+        Args:
+            directory: The daily export directory
+        """
+        self.directory = directory
+        self.path = directory / MANIFEST_NAME
+        self.days: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.days = dict(data.get("days", {}))
+            except (OSError, ValueError, AttributeError) as e:
+                logger.warning("Ignoring unreadable manifest %s: %s", self.path, e)
+
+    def get(self, day: str) -> Optional[Dict[str, Any]]:
+        return self.days.get(day)
+
+    def is_unchanged(self, day: str, input_hash: str) -> bool:
+        """
+        Check whether ``day`` was already written from the same input.
+
+        Args:
+            day: The day (YYYY-MM-DD)
+            input_hash: Hash of the newly fetched input (see hash_day_input)
+
+        Returns:
+            True if the hash matches and every file recorded for the day exists
+        """
+        entry = self.days.get(day)
+        if not entry or entry.get("input_hash") != input_hash:
+            return False
+        return all((self.directory / name).exists() for name in entry.get("files", []))
+
+    def record(self, day: str, input_hash: str, rows: int, files: List[Path]) -> None:
+        """Record that ``files`` were written for ``day`` from the given input."""
+        self.days[day] = {
+            "input_hash": input_hash,
+            "rows": rows,
+            "files": sorted(path.relative_to(self.directory).as_posix() for path in files),
+        }
+
+    def discard(self, day: str) -> None:
+        """Forget ``day`` so its files are rewritten next time."""
+        self.days.pop(day, None)
+
+    def save(self) -> None:
+        write_text_atomic(
+            self.path,
+            json.dumps({"version": FORMAT_VERSION, "days": dict(sorted(self.days.items()))}, indent=2) + "\n",
+            keep_unchanged=True,
+        )
@@ -0,0 +1,289 @@
+"""
+Run metrics: request latency histograms, retries, response sizes and stage
+durations, written at the end of a run.
+
+``RunMetrics`` collects the numbers in memory (thread-safe) and writes them
+as a JSON document and a Prometheus textfile-collector file. When metrics
+are disabled the pipeline is handed ``NULL_METRICS``, whose methods do
+nothing, so instrumented code paths need no conditionals.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import urlparse
+
+from .atomic import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_PREFIX = "dashboard_scraper"
+
+
+def endpoint_label(url: str) -> str:
+    """Reduce a request URL to its path, so query strings do not split series."""
+    # The base URL ends with "/" and endpoints start with one
+    return re.sub(r"/{2,}", "/", urlparse(url).path) or "/"
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le, cumulative count) pairs in Prometheus order, ending with +Inf."""
+        out: List[Tuple[str, int]] = []
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            out.append((repr(bound), running))
+        out.append(("+Inf", self.count))
+        return out
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.responses: Dict[str, int] = {}
+        self.retries = 0
+        self.failures = 0
+        self.skipped = 0
+        self.response_bytes = 0
+        self.wire_bytes = 0
+
+
+class RunMetrics:
+    enabled = True
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.gauges: Dict[str, float] = {}
+        # HTTP sends by whether they opened a new connection or reused a pooled one
+        self.connections = {"opened": 0, "reused": 0}
+
+    def _endpoint(self, url: str) -> EndpointStats:
+        key = endpoint_label(url)
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        return stats
+
+    def observe_request(self, url: str, status: str, seconds: float, response_bytes: int = 0) -> None:
+        """
+        Record one HTTP attempt.
+
+        Args:
+            url: Request URL (reduced to its path for the endpoint label)
+            status: HTTP status code, or "error" for connection-level failures
+            seconds: Wall time of the attempt
+            response_bytes: Size of the response body
+        """
+        with self._lock:
+            stats = self._endpoint(url)
+            stats.latency.observe(seconds)
+            stats.responses[status] = stats.responses.get(status, 0) + 1
+            stats.response_bytes += response_bytes
+
+    def record_transfer(self, url: str, wire_bytes: int, body_bytes: int) -> None:
+        """
+        Record a fully read response body.
+
+        Args:
+            url: Request URL
+            wire_bytes: Bytes received on the connection (compressed)
+            body_bytes: Bytes after content decoding
+        """
+        with self._lock:
+            stats = self._endpoint(url)
+            stats.wire_bytes += wire_bytes
+            stats.response_bytes += body_bytes
+
+    def record_retry(self, url: str) -> None:
+        with self._lock:
+            self._endpoint(url).retries += 1
+
+    def record_skip(self, url: str) -> None:
+        """Record a request refused by the endpoint's open circuit breaker."""
+        with self._lock:
+            self._endpoint(url).skipped += 1
+
+    def record_connection(self, reused: bool) -> None:
+        """Record whether an HTTP send reused a pooled connection or opened a new one."""
+        with self._lock:
+            self.connections["reused" if reused else "opened"] += 1
+
+    def record_failure(self, url: str) -> None:
+        """Record a request that failed after exhausting its retries."""
+        with self._lock:
+            self._endpoint(url).failures += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the wall time of the enclosed block to stage ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self.stages.setdefault(name, {"seconds": 0.0, "count": 0})
+                stats["seconds"] += elapsed
+                stats["count"] += 1
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": round(time.time() - self.started_at, 6),
+                "gauges": dict(self.gauges),
+                "stages": {name: dict(s) for name, s in self.stages.items()},
+                "connections": dict(self.connections),
+                "endpoints": {
+                    path: {
+                        "requests": s.latency.count,
+                        "responses": dict(s.responses),
+                        "retries": s.retries,
+                        "failures": s.failures,
+                        "skipped": s.skipped,
+                        "response_bytes": s.response_bytes,
+                        "wire_bytes": s.wire_bytes,
+                        "latency_seconds": {
+                            "sum": s.latency.sum,
+                            "buckets": dict(s.latency.cumulative()),
+                        },
+                    }
+                    for path, s in self.endpoints.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        p = PROMETHEUS_PREFIX
+        data = self.to_dict()
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+
+        family("run_duration_seconds", "gauge", "Wall time of the last run.")
+        lines.append(f"{p}_run_duration_seconds {data['duration_seconds']}")
+        family("run_start_timestamp_seconds", "gauge", "Unix time the last run started.")
+        lines.append(f"{p}_run_start_timestamp_seconds {data['started_at']}")
+        for name, value in sorted(data["gauges"].items()):
+            family(name, "gauge", f"Run gauge {name}.")
+            lines.append(f"{p}_{name} {value}")
+
+        family("stage_duration_seconds", "gauge", "Total wall time spent in each pipeline stage.")
+        for name, s in data["stages"].items():
+            lines.append(f'{p}_stage_duration_seconds{{stage="{name}"}} {s["seconds"]}')
+
+        family("http_connections_total", "counter", "HTTP sends by whether a pooled connection was reused.")
+        lines.append(f'{p}_http_connections_total{{reused="false"}} {data["connections"]["opened"]}')
+        lines.append(f'{p}_http_connections_total{{reused="true"}} {data["connections"]["reused"]}')
+
+        endpoints = data["endpoints"]
+        family("http_request_duration_seconds", "histogram", "HTTP request latency per attempt.")
+        for path, e in endpoints.items():
+            for le, n in e["latency_seconds"]["buckets"].items():
+                lines.append(f'{p}_http_request_duration_seconds_bucket{{endpoint="{path}",le="{le}"}} {n}')
+            lines.append(f'{p}_http_request_duration_seconds_sum{{endpoint="{path}"}} {e["latency_seconds"]["sum"]}')
+            lines.append(f'{p}_http_request_duration_seconds_count{{endpoint="{path}"}} {e["requests"]}')
+
+        family("http_responses_total", "counter", "HTTP attempts by status code.")
+        for path, e in endpoints.items():
+            for status, n in sorted(e["responses"].items()):
+                lines.append(f'{p}_http_responses_total{{endpoint="{path}",status="{status}"}} {n}')
+        family("http_retries_total", "counter", "Retried HTTP attempts.")
+        for path, e in endpoints.items():
+            lines.append(f'{p}_http_retries_total{{endpoint="{path}"}} {e["retries"]}')
+        family("http_failures_total", "counter", "Requests that failed after all retries.")
+        for path, e in endpoints.items():
+            lines.append(f'{p}_http_failures_total{{endpoint="{path}"}} {e["failures"]}')
+        family("http_skipped_total", "counter", "Requests not sent because the endpoint's circuit breaker was open.")
+        for path, e in endpoints.items():
+            lines.append(f'{p}_http_skipped_total{{endpoint="{path}"}} {e["skipped"]}')
+        family("http_response_bytes_total", "counter", "Response body bytes after content decoding.")
+        for path, e in endpoints.items():
+            lines.append(f'{p}_http_response_bytes_total{{endpoint="{path}"}} {e["response_bytes"]}')
+        family("http_wire_bytes_total", "counter", "Response bytes received on the wire (compressed).")
+        for path, e in endpoints.items():
+            lines.append(f'{p}_http_wire_bytes_total{{endpoint="{path}"}} {e["wire_bytes"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, json_path: Path, prometheus_path: Path) -> None:
+        """
+        Write the JSON document and the Prometheus textfile.
+
+        Both files are replaced atomically so a collector never reads a
+        partial file.
+
+        Args:
+            json_path: Path for the JSON document
+            prometheus_path: Path for the .prom textfile
+        """
+        write_text_atomic(json_path, json.dumps(self.to_dict(), indent=2) + "\n")
+        write_text_atomic(prometheus_path, self.to_prometheus())
+        logger.info("Wrote run metrics to %s and %s", json_path, prometheus_path)
+
+
+class NullMetrics:
+    """Stand-in used when run metrics are disabled; every method is a no-op."""
+
+    enabled = False
+
+    def observe_request(self, url: str, status: str, seconds: float, response_bytes: int = 0) -> None:
+        pass
+
+    def record_transfer(self, url: str, wire_bytes: int, body_bytes: int) -> None:
+        pass
+
+    def record_retry(self, url: str) -> None:
+        pass
+
+    def record_skip(self, url: str) -> None:
+        pass
+
+    def record_connection(self, reused: bool) -> None:
+        pass
+
+    def record_failure(self, url: str) -> None:
+        pass
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        yield
+
+    def set_gauge(self, name: str, value: float) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
@@ -0,0 +1,162 @@
+"""
+Background execution of output writes.
+
+``OutputExecutor`` runs write tasks (file writes, summaries, fsync) on a
+small thread pool, so disk I/O overlaps with the next day's network
+fetches. Tasks are submitted to named lanes: tasks in one lane run one at
+a time in submission order, so a sink sees days in order and need not be
+thread-safe, while different lanes run in parallel.
+
+At most ``max_pending`` tasks may be queued; ``submit`` blocks beyond that,
+so a slow disk slows the producer down instead of buffering every day in
+memory. A failing task does not stop the others: the error is logged and
+kept in ``errors``. ``drain()`` waits for every submitted task, and leaving
+the ``with`` block drains and shuts the pool down even if the body raised.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_Task = Tuple[str, contextvars.Context, Callable[..., Optional[Iterable[Path]]], Tuple[Any, ...]]
+
+
+class OutputError(NamedTuple):
+    lane: str
+    label: str
+    error: Exception
+
+
+def fsync_file(path: Path) -> None:
+    """Flush a written file's data to disk."""
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+def fsync_dir(path: Path) -> None:
+    """Flush a directory entry (new or renamed files) to disk; a no-op where unsupported."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Directories cannot be fsynced on some platforms (e.g. Windows)
+        pass
+    finally:
+        os.close(fd)
+
+
+class _Lane:
+    def __init__(self) -> None:
+        self.tasks: Deque[_Task] = deque()
+        self.running = False
+
+
+class OutputExecutor:
+    def __init__(self, max_workers: int = 2, fsync: bool = False, max_pending: int = 16) -> None:
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Worker threads; 0 runs every task inline in submit()
+            fsync: fsync the files each task reports as written, and their
+                directories on drain()
+            max_pending: Tasks that may be queued before submit() blocks
+        """
+        self.fsync = fsync
+        self.errors: List[OutputError] = []
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="output") if max_workers > 0 else None
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._lanes: Dict[str, _Lane] = {}
+        self._pending = 0
+        self._dirs: Set[Path] = set()
+
+    def submit(self, lane: str, label: str, fn: Callable[..., Optional[Iterable[Path]]], *args: Any) -> None:
+        """
+        Queue ``fn(*args)`` on ``lane``.
+
+        Args:
+            lane: Tasks with the same lane run in submission order
+            label: What the task writes (used in error reports, e.g. the day)
+            fn: The task; may return the paths it wrote (to be fsynced)
+            *args: Arguments for ``fn``
+        """
+        # Run in a copy of the caller's context, so spans nest under the current one
+        task: _Task = (label, contextvars.copy_context(), fn, args)
+        if self._pool is None:
+            self._run(lane, task)
+            return
+
+        self._slots.acquire()
+        with self._lock:
+            self._pending += 1
+            state = self._lanes.setdefault(lane, _Lane())
+            state.tasks.append(task)
+            if state.running:
+                return
+            state.running = True
+        self._pool.submit(self._run_lane, lane, state)
+
+    def _run_lane(self, lane: str, state: _Lane) -> None:
+        while True:
+            with self._lock:
+                if not state.tasks:
+                    state.running = False
+                    return
+                task = state.tasks.popleft()
+            try:
+                self._run(lane, task)
+            finally:
+                self._slots.release()
+                with self._lock:
+                    self._pending -= 1
+                    if not self._pending:
+                        self._idle.notify_all()
+
+    def _run(self, lane: str, task: _Task) -> None:
+        label, context, fn, args = task
+        try:
+            written = context.run(fn, *args)
+            if self.fsync and written:
+                for path in written:
+                    fsync_file(path)
+                    with self._lock:
+                        self._dirs.add(path.parent)
+        except Exception as e:
+            logger.error("Failed to write %s output for %s: %s", lane, label, e)
+            with self._lock:
+                self.errors.append(OutputError(lane, label, e))
+
+    def drain(self) -> None:
+        """Wait until every submitted task has finished."""
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+            dirs, self._dirs = self._dirs, set()
+        for directory in sorted(dirs):
+            fsync_dir(directory)
+
+    def close(self) -> None:
+        """Drain and stop the worker threads."""
+        self.drain()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "OutputExecutor":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
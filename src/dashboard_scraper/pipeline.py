@@ -0,0 +1,199 @@
+"""
+Streaming stage pipeline for multi-day runs.
+
+A run is a chain of per-day stages ending in a set of sinks::
+
+    fetch -> normalize -> convert -> sinks (CSV, Copilot JSON, enterprise summary, aggregate, store)
+
+``run_pipeline`` runs the source and every stage on its own thread,
+connected by bounded queues, so day N+1 is fetched while day N is converted
+and written. A full queue blocks the stage feeding it (backpressure): at
+most ``queue_size`` batches wait between two stages, so memory stays
+bounded however many days are processed. Each stage has one thread, so
+batches come out in the order the source produced them.
+
+With ``threaded=False`` the same stages are chained as plain generators on
+the calling thread (used with --profile, since cProfile only sees the
+thread it was enabled on).
+
+Sinks see every batch once and are closed at the end, so adding an output
+means adding a Sink, not another pass over the data.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Stage = Tuple[str, Callable[[Any], Any]]
+
+# How often blocked queue operations check whether the pipeline was stopped
+_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception raised by a stage to the consumer."""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class DayBatch:
+    """One day's data as it moves through the pipeline."""
+
+    def __init__(self, date: datetime, records: Optional[List[Dict[str, Any]]], directory: Path) -> None:
+        """
+        Initialize a batch.
+
+        Args:
+            date: The day
+            records: Augment rows for the day, or None if the fetch failed
+            directory: Where the day's files are written
+        """
+        self.date = date
+        self.day = date.strftime("%Y-%m-%d")
+        self.records = records
+        self.directory = directory
+        # Filled in by the normalize and convert stages
+        self.input_hash: Optional[str] = None
+        # Same input as the files already on disk for this day (see manifest.py)
+        self.unchanged = False
+        self.snapshot_path: Optional[Path] = None
+        self.copilot: Optional[List[Dict[str, Any]]] = None
+        self.summary: Optional[Dict[str, Any]] = None
+        # Per-day files written (or kept) for this day
+        self.files: List[Path] = []
+
+    @property
+    def fetched(self) -> bool:
+        return self.records is not None
+
+    @property
+    def converted(self) -> bool:
+        return self.copilot is not None
+
+
+class Sink:
+    """
+    Receives every batch that leaves the pipeline, then is closed once.
+
+    ``write`` and ``close`` return the paths of the files they wrote (so
+    they can be fsynced). Calls for one sink never overlap and arrive in
+    day order, but may run on a background thread (see output_executor.py).
+    """
+
+    name = "sink"
+
+    def write(self, batch: DayBatch) -> List[Path]:
+        raise NotImplementedError
+
+    def close(self) -> List[Path]:
+        return []
+
+
+def run_pipeline(
+    source: Iterable[Any],
+    stages: Sequence[Stage],
+    queue_size: int = 2,
+    threaded: bool = True,
+) -> Iterator[Any]:
+    """
+    Run ``source`` through ``stages`` and yield the results in order.
+
+    Args:
+        source: Items to process (typically a generator that fetches them)
+        stages: (name, function) pairs; each function maps one item to the
+            item passed to the next stage
+        queue_size: Maximum number of items waiting between two stages
+        threaded: Run the source and each stage on its own thread; when
+            False, stages are chained lazily on the calling thread
+
+    Yields:
+        The output of the last stage for each source item
+
+    Raises:
+        Any exception raised by the source or a stage, once the items before
+        it have been yielded. Stopping iteration early stops all threads.
+    """
+    if not threaded:
+        items: Iterator[Any] = iter(source)
+        for _, fn in stages:
+            items = map(fn, items)
+        yield from items
+        return
+
+    stop = threading.Event()
+    queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=max(queue_size, 1)) for _ in range(len(stages) + 1)]
+
+    def put(q: "queue.Queue[Any]", item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(q: "queue.Queue[Any]") -> Any:
+        while True:
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if stop.is_set():
+                    return _DONE
+
+    def produce() -> None:
+        try:
+            for item in source:
+                if not put(queues[0], item):
+                    return
+        except BaseException as e:
+            put(queues[0], _Failure(e))
+            return
+        put(queues[0], _DONE)
+
+    def work(fn: Callable[[Any], Any], inbox: "queue.Queue[Any]", outbox: "queue.Queue[Any]") -> None:
+        while True:
+            item = get(inbox)
+            if item is _DONE or isinstance(item, _Failure):
+                put(outbox, item)
+                return
+            try:
+                result = fn(item)
+            except BaseException as e:
+                put(outbox, _Failure(e))
+                return
+            if not put(outbox, result):
+                return
+
+    # Each thread runs in a copy of the caller's context, so spans nest under the current one
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(produce,),
+                                name="pipeline-source", daemon=True)]
+    for i, (name, fn) in enumerate(stages):
+        threads.append(threading.Thread(target=contextvars.copy_context().run,
+                                        args=(work, fn, queues[i], queues[i + 1]),
+                                        name=f"pipeline-{name}", daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = get(queues[-1])
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,114 @@
+"""
+Per-stage CPU and memory profiling for --profile runs.
+
+Each named stage (fetch, csv, convert, aggregate) gets its own cProfile
+profile, accumulated across every time the stage is entered, plus the peak
+traced memory seen while it ran. At the end of the run the profiles are
+written as ``profile_<stage>.pstats`` files together with a short
+``profile_summary.txt`` listing the top-N hotspots per stage.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from .atomic import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+
+class StageStats:
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.peak_memory_bytes = 0
+
+
+class StageProfiler:
+    def __init__(self, output_dir: Path, top_n: int = 15) -> None:
+        """
+        Initialize the profiler and start tracing memory allocations.
+
+        Args:
+            output_dir: Directory for the pstats files and summary
+            top_n: Number of hotspots listed per stage in the summary
+        """
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.stages: Dict[str, StageStats] = {}
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profile the enclosed block as part of stage ``name``."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        stats.profile.enable()
+        try:
+            yield
+        finally:
+            stats.profile.disable()
+            stats.wall_seconds += time.perf_counter() - start
+            stats.calls += 1
+            _, peak = tracemalloc.get_traced_memory()
+            stats.peak_memory_bytes = max(stats.peak_memory_bytes, peak)
+
+    def _hotspots(self, stats: StageStats) -> str:
+        stream = io.StringIO()
+        ps = pstats.Stats(stats.profile, stream=stream)
+        ps.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        # Drop the preamble pstats prints before the table
+        text = stream.getvalue()
+        table_start = text.find("   ncalls")
+        return text[table_start:].rstrip() if table_start >= 0 else text.rstrip()
+
+    def write_reports(self) -> List[Path]:
+        """
+        Write one pstats file per stage and a top-N hotspot summary.
+
+        Returns:
+            Paths of the files written
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written: List[Path] = []
+
+        lines = ["Stage profile summary", "=" * 80, ""]
+        lines.append(f"{'stage':<12} {'calls':>6} {'wall s':>10} {'peak MB':>10}")
+        for name, stats in self.stages.items():
+            lines.append(
+                f"{name:<12} {stats.calls:>6} {stats.wall_seconds:>10.3f} {stats.peak_memory_bytes / 1e6:>10.2f}")
+
+        for name, stats in self.stages.items():
+            pstats_path = self.output_dir / f"profile_{name}.pstats"
+            stats.profile.dump_stats(str(pstats_path))
+            written.append(pstats_path)
+
+            lines += ["", "=" * 80, f"{name}: top {self.top_n} by cumulative time", "=" * 80]
+            lines.append(self._hotspots(stats))
+
+        summary_path = self.output_dir / "profile_summary.txt"
+        write_text_atomic(summary_path, "\n".join(lines) + "\n")
+        written.append(summary_path)
+
+        logger.info("Wrote profiling reports to %s", self.output_dir)
+        return written
+
+    def close(self) -> None:
+        """Stop memory tracing if this profiler started it."""
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -0,0 +1,198 @@
+"""
+Progress and ETA reporting for multi-day runs.
+
+A reporter counts finished units (days), records and bytes, and renders
+throughput and an ETA at most once per refresh interval, so per-day cost is
+a lock acquisition and a clock read. All methods are thread-safe, so days
+may complete concurrently and out of order.
+
+Modes:
+
+- ``tty``: a single status line on stderr, redrawn in place
+- ``log``: a periodic ``logger.info`` line (for cron and CI logs)
+- ``silent``: nothing is reported
+- ``auto``: ``tty`` when stderr is a terminal, otherwise ``log``
+"""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_MODES = ("auto", "tty", "log", "silent")
+
+TTY_REFRESH_SECONDS = 0.2
+LOG_REFRESH_SECONDS = 10.0
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def _format_bytes(n: float) -> str:
+    if n < 1024:
+        return f"{n:.0f}B"
+    for unit in ("KB", "MB"):
+        n /= 1024
+        if n < 1024:
+            return f"{n:.1f}{unit}"
+    return f"{n / 1024:.1f}GB"
+
+
+class ProgressReporter:
+    """Base reporter: tracks counts and rates; subclasses decide how to render them."""
+
+    refresh_seconds = TTY_REFRESH_SECONDS
+
+    def __init__(
+        self,
+        label: str,
+        total: int,
+        bytes_source: Optional[Callable[[], int]] = None,
+    ) -> None:
+        """
+        Initialize the reporter.
+
+        Args:
+            label: Short name of the phase (e.g. "Fetching")
+            total: Number of units (days) expected
+            bytes_source: Returns the running total of bytes received; its
+                value at construction is taken as the starting point
+        """
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.records = 0
+        self._bytes_source = bytes_source
+        self._bytes_start = bytes_source() if bytes_source else 0
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_render = 0.0
+        self._closed = False
+
+    def advance(self, records: int = 0, failed: bool = False) -> None:
+        """Mark one unit as finished, with the number of records it produced."""
+        with self._lock:
+            self.done += 1
+            self.records += records
+            if failed:
+                self.failed += 1
+            now = time.monotonic()
+            if now - self._last_render < self.refresh_seconds:
+                return
+            self._last_render = now
+            self._render(self.status_line(now))
+
+    def close(self) -> None:
+        """Render the final state once."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._finish(self.status_line(time.monotonic()))
+
+    def __enter__(self) -> "ProgressReporter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def status_line(self, now: float) -> str:
+        elapsed = max(now - self._started, 1e-9)
+        received = (self._bytes_source() - self._bytes_start) if self._bytes_source else 0
+        parts = [
+            f"{self.label} {self.done}/{self.total}",
+            f"{self.done / elapsed:.2f} days/s",
+            f"{self.records / elapsed:,.0f} records/s",
+        ]
+        if self._bytes_source:
+            parts.append(f"{_format_bytes(received / elapsed)}/s")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        if self.done < self.total and self.done:
+            parts.append(f"ETA {_format_duration((self.total - self.done) * elapsed / self.done)}")
+        else:
+            parts.append(f"elapsed {_format_duration(elapsed)}")
+        return " | ".join(parts)
+
+    def _render(self, line: str) -> None:
+        pass
+
+    def _finish(self, line: str) -> None:
+        pass
+
+
+class SilentProgress(ProgressReporter):
+    def advance(self, records: int = 0, failed: bool = False) -> None:
+        with self._lock:
+            self.done += 1
+            self.records += records
+            if failed:
+                self.failed += 1
+
+
+class LogProgress(ProgressReporter):
+    refresh_seconds = LOG_REFRESH_SECONDS
+
+    def _render(self, line: str) -> None:
+        logger.info("%s", line)
+
+    def _finish(self, line: str) -> None:
+        if self.done:
+            logger.info("%s (done)", line)
+
+
+class TTYProgress(ProgressReporter):
+    def __init__(self, *args, stream: Optional[TextIO] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stream = stream or sys.stderr
+
+    def _render(self, line: str) -> None:
+        # \r plus erase-to-end-of-line redraws the status line in place
+        self.stream.write(f"\r\x1b[K{line}")
+        self.stream.flush()
+
+    def _finish(self, line: str) -> None:
+        self.stream.write(f"\r\x1b[K{line}\n")
+        self.stream.flush()
+
+
+def create_progress(
+    mode: str,
+    label: str,
+    total: int,
+    bytes_source: Optional[Callable[[], int]] = None,
+) -> ProgressReporter:
+    """
+    Create a reporter for ``mode`` (see PROGRESS_MODES).
+
+    Args:
+        mode: "auto", "tty", "log" or "silent"
+        label: Short name of the phase
+        total: Number of units expected
+        bytes_source: Optional running total of bytes received
+
+    Returns:
+        A progress reporter
+    """
+    mode = mode.lower()
+    if mode == "auto":
+        mode = "tty" if sys.stderr.isatty() else "log"
+    if mode == "tty":
+        return TTYProgress(label, total, bytes_source)
+    if mode == "log":
+        return LogProgress(label, total, bytes_source)
+    if mode == "silent":
+        return SilentProgress(label, total, bytes_source)
+    raise ValueError(f"Unknown progress mode '{mode}'. Expected one of: {', '.join(PROGRESS_MODES)}")
@@ -0,0 +1,210 @@
+"""
+Local HTTP query server over generated Copilot metrics.
+
+Exposes the per-user daily and aggregated records in the shape of the
+GitHub Copilot Metrics API so consumers can query them instead of copying
+JSON files around:
+
+    GET /enterprises/{enterprise}/copilot/metrics/users
+        ?since=YYYY-MM-DD&until=YYYY-MM-DD&user=login[,login]&per_page=100&after=<cursor>
+    GET /enterprises/{enterprise}/copilot/metrics/users/aggregated
+        ?window=28d&user=login&per_page=100&after=<cursor>
+
+Responses are JSON arrays. When more results are available, a ``Link``
+header with ``rel="next"`` carries the cursor for the next page. Bodies are
+gzip-compressed when the client sends ``Accept-Encoding: gzip``.
+
+New exports are picked up without a restart: each request first lets the
+store rescan the export directory if it has changed (see
+``MetricsStore.refresh_if_changed``).
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import logging
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from .store import MetricsStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PER_PAGE = 100
+MAX_PER_PAGE = 1000
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 512
+
+_USERS_RE = re.compile(r"^/enterprises/([^/]+)/copilot/metrics/users(/aggregated)?/?$")
+_DAY_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class BadRequest(Exception):
+    """Raised for invalid query parameters."""
+    pass
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"o": offset}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json.loads(base64.urlsafe_b64decode(padded))["o"]
+    except (ValueError, KeyError, TypeError):
+        raise BadRequest(f"Invalid cursor: {cursor}")
+    if not isinstance(offset, int) or offset < 0:
+        raise BadRequest(f"Invalid cursor: {cursor}")
+    return offset
+
+
+def _single(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[-1] if values else None
+
+
+def _parse_day(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    value = _single(params, name)
+    if value is not None and not _DAY_RE.match(value):
+        raise BadRequest(f"Invalid {name}: {value}. Expected YYYY-MM-DD")
+    return value
+
+
+def _parse_per_page(params: Dict[str, List[str]]) -> int:
+    value = _single(params, "per_page")
+    if value is None:
+        return DEFAULT_PER_PAGE
+    try:
+        per_page = int(value)
+    except ValueError:
+        raise BadRequest(f"Invalid per_page: {value}")
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+def _parse_users(params: Dict[str, List[str]]) -> List[str]:
+    return [u.strip() for value in params.get("user", []) for u in value.split(",") if u.strip()]
+
+
+def paginate(
+    records: List[Dict[str, Any]],
+    params: Dict[str, List[str]]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Slice one page out of ``records``.
+
+    Returns:
+        Tuple of (page records, cursor for the next page or None)
+    """
+    per_page = _parse_per_page(params)
+    after = _single(params, "after")
+    offset = decode_cursor(after) if after else 0
+
+    page = records[offset:offset + per_page]
+    next_offset = offset + len(page)
+    next_cursor = encode_cursor(next_offset) if next_offset < len(records) else None
+    return page, next_cursor
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    server_version = "dashboard-scraper"
+    protocol_version = "HTTP/1.1"
+
+    # Set by make_server()
+    store: MetricsStore
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        accept = self.headers.get("Accept-Encoding", "")
+        compress = "gzip" in accept and len(payload) >= GZIP_MIN_BYTES
+        if compress:
+            payload = gzip.compress(payload, compresslevel=5)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Vary", "Accept-Encoding")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send_json(status, {"message": message})
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+
+        match = _USERS_RE.match(url.path)
+        if not match:
+            self._send_error(404, "Not Found")
+            return
+
+        enterprise, aggregated = match.group(1), bool(match.group(2))
+        # Pick up exports written since the server started
+        self.store.refresh_if_changed()
+        try:
+            if aggregated:
+                window = _single(params, "window") or "all"
+                result = self.store.query_aggregated(window)
+                if result is None:
+                    self._send_error(404, f"No aggregate available for window {window}")
+                    return
+            else:
+                since = _parse_day(params, "since")
+                until = _parse_day(params, "until")
+                result = self.store.query_days(since, until)
+
+            records = result.select(enterprise, _parse_users(params))
+            page, next_cursor = paginate(records, params)
+        except BadRequest as e:
+            self._send_error(400, str(e))
+            return
+
+        headers = {}
+        if next_cursor:
+            query = {k: v[-1] for k, v in params.items() if k != "after"}
+            query["after"] = next_cursor
+            headers["Link"] = f'<{url.path}?{urlencode(query)}>; rel="next"'
+        self._send_json(200, page, headers)
+
+
+def make_server(store: MetricsStore, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a threaded HTTP server bound to ``host:port``.
+
+    Args:
+        store: Store to serve records from
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+    """
+    handler = type("BoundMetricsRequestHandler", (MetricsRequestHandler,), {"store": store})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(store: MetricsStore, host: str, port: int) -> None:
+    """Serve the store until interrupted."""
+    server = make_server(store, host, port)
+    bound_host, bound_port = server.server_address[:2]
+    logger.info("Serving Copilot metrics from %s on http://%s:%d", store.export_dir, bound_host, bound_port)
+    print(f"🌐 Serving Copilot metrics on http://{bound_host}:{bound_port}")
+    windows = ", ".join(store.available_windows()) or "none"
+    print(f"   Days available: {len(store.available_days())}, aggregate windows: {windows}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down server.")
+    finally:
+        server.server_close()
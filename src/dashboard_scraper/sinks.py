@@ -0,0 +1,140 @@
+"""
+Output sinks for the multi-day pipeline (see pipeline.py).
+
+Each sink writes one kind of output from the batches it receives: per-day
+files as each day arrives, and range-level files (the enterprise summary
+and the window aggregates) when it is closed. Nothing but the per-user
+counters of the aggregates is kept across days.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .copilot_aggregator import AggregationWindow, WindowAggregator, write_aggregated_json
+from .copilot_converter import write_copilot_json
+from .enterprise_summary import write_enterprise_summary
+from .export import write_csv
+from .pipeline import DayBatch, Sink
+from .store import MetricsStore
+
+logger = logging.getLogger(__name__)
+
+
+class CsvSink(Sink):
+    """Writes each fetched day to ``augment_metrics_<day>.csv`` (Augment format), unless unchanged."""
+
+    name = "csv"
+
+    def __init__(self) -> None:
+        self.files: List[Path] = []
+
+    def write(self, batch: DayBatch) -> List[Path]:
+        if not batch.fetched:
+            return []
+        if batch.unchanged:
+            self.files.append(batch.directory / f"augment_metrics_{batch.day}.csv")
+            return []
+        csv_path = write_csv(
+            batch.records or [],
+            batch.directory,
+            filename=f"augment_metrics_{batch.day}.csv",
+            start_date=batch.date,
+            end_date=batch.date
+        )
+        logger.debug("Wrote daily CSV: %s", csv_path)
+        self.files.append(csv_path)
+        batch.files.append(csv_path)
+        return [csv_path]
+
+
+class CopilotJsonSink(Sink):
+    """Writes each converted day to ``copilot_metrics_<day>.json``, unless unchanged."""
+
+    name = "copilot_json"
+
+    def __init__(self) -> None:
+        self.files: List[Path] = []
+
+    def write(self, batch: DayBatch) -> List[Path]:
+        if not batch.converted:
+            return []
+        json_path = batch.directory / f"copilot_metrics_{batch.day}.json"
+        self.files.append(json_path)
+        if batch.unchanged:
+            return []
+        write_copilot_json(batch.copilot or [], json_path)
+        batch.files.append(json_path)
+        return [json_path]
+
+
+class EnterpriseSummarySink(Sink):
+    """Collects the per-day enterprise summaries and writes them on close."""
+
+    name = "enterprise_summary"
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.summaries: List[Dict[str, Any]] = []
+        self.written = False
+
+    def write(self, batch: DayBatch) -> List[Path]:
+        if batch.summary is not None:
+            self.summaries.append(batch.summary)
+        return []
+
+    def close(self) -> List[Path]:
+        if not self.summaries:
+            return []
+        write_enterprise_summary(self.summaries, self.path)
+        self.written = True
+        return [self.path]
+
+
+class AggregateSink(Sink):
+    """Aggregates converted days over every window, writing one file per window on close."""
+
+    name = "aggregate"
+
+    def __init__(self, daily_dir: Path, windows: List[AggregationWindow]) -> None:
+        self.daily_dir = daily_dir
+        self.aggregator = WindowAggregator(windows)
+        # (window, path, number of users) for each file written
+        self.files: List[Tuple[AggregationWindow, Path, int]] = []
+
+    def write(self, batch: DayBatch) -> List[Path]:
+        if batch.converted:
+            self.aggregator.add_day(batch.day, batch.copilot or [])
+        return []
+
+    def close(self) -> List[Path]:
+        if not self.aggregator.days:
+            return []
+        aggregates = self.aggregator.results()
+        for window in self.aggregator.windows:
+            if window.name == "all":
+                filename = "copilot_metrics_aggregated.json"
+            else:
+                filename = f"copilot_metrics_aggregated_{window.name}.json"
+            path = self.daily_dir / filename
+            write_aggregated_json(aggregates[window.name], path)
+            self.files.append((window, path, len(aggregates[window.name])))
+        return [path for _, path, _ in self.files]
+
+
+class StoreSink(Sink):
+    """Re-indexes a MetricsStore once the run's files are written, so a running server sees them."""
+
+    name = "store"
+
+    def __init__(self, store: MetricsStore) -> None:
+        self.store = store
+
+    def write(self, batch: DayBatch) -> List[Path]:
+        return []
+
+    def close(self) -> List[Path]:
+        self.store.refresh()
+        return []
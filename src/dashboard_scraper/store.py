@@ -0,0 +1,243 @@
+"""
+Indexed, read-only store over generated Copilot JSON files.
+
+The store scans the export directory for daily Copilot files
+(``copilot_metrics_YYYY-MM-DD.json``) and aggregated files
+(``copilot_metrics_aggregated[_<window>].json``) and indexes them by day and
+window. Query results for a date range are kept in a small LRU cache so
+repeated requests for hot windows are served from memory.
+
+Exports are written atomically (a rename into the directory), so every new
+or rewritten file changes the modification time of the directory holding it.
+``refresh_if_changed`` compares those times, at most once per
+``refresh_seconds``, and rescans (dropping the cache) when any has changed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DAILY_RE = re.compile(r"^copilot_metrics_(\d{4}-\d{2}-\d{2})\.json$")
+_AGGREGATED_RE = re.compile(r"^copilot_metrics_aggregated(?:_(\w+))?\.json$")
+
+
+class WindowResult:
+    """Records for one date range, sorted by (day, user_login), with user and enterprise indexes."""
+
+    def __init__(self, records: List[Dict[str, Any]]) -> None:
+        self.records = records
+        self.by_user: Dict[str, List[int]] = {}
+        self.by_enterprise: Dict[str, List[Dict[str, Any]]] = {}
+        for i, record in enumerate(records):
+            self.by_user.setdefault(record["user_login"], []).append(i)
+            self.by_enterprise.setdefault(str(record.get("enterprise_id")), []).append(record)
+
+    def select(self, enterprise: str, users: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Records of ``enterprise``, optionally restricted to ``users``."""
+        if not users:
+            return self.by_enterprise.get(enterprise, [])
+        indexes = sorted(i for user in set(users) for i in self.by_user.get(user, []))
+        return [
+            self.records[i] for i in indexes
+            if str(self.records[i].get("enterprise_id")) == enterprise
+        ]
+
+
+def _tree_signature(root: Path) -> Tuple[int, int]:
+    """Number of directories under ``root`` and their latest modification time (ns)."""
+    count, latest = 0, 0
+    for dirpath, _, _ in os.walk(root):
+        try:
+            mtime = os.stat(dirpath).st_mtime_ns
+        except FileNotFoundError:
+            # Removed by an export rotation after os.walk listed it
+            continue
+        count += 1
+        latest = max(latest, mtime)
+    return count, latest
+
+
+class MetricsStore:
+    def __init__(
+        self,
+        export_dir: Path,
+        cache_size: int = 32,
+        refresh_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            export_dir: Base export directory containing daily_exports_* directories
+            cache_size: Number of query windows kept in the LRU cache
+            refresh_seconds: Minimum seconds between checks for new exports in
+                refresh_if_changed (0 checks on every call)
+            clock: Time source for refresh_seconds
+        """
+        self.export_dir = export_dir
+        self.cache_size = cache_size
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._days: Dict[str, Path] = {}
+        self._aggregated: Dict[str, Path] = {}
+        self._cache: "OrderedDict[Tuple[str, str], WindowResult]" = OrderedDict()
+        # Bumped by refresh(); results computed against an older index are not cached
+        self._generation = 0
+        self._signature: Tuple[int, int] = (0, 0)
+        self._checked_at = 0.0
+        self.refresh()
+
+    def refresh_if_changed(self) -> bool:
+        """
+        Rescan the export directory if anything was written to it since the last scan.
+
+        Returns:
+            Whether the store was refreshed
+        """
+        now = self.clock()
+        with self._lock:
+            if now - self._checked_at < self.refresh_seconds:
+                return False
+            self._checked_at = now
+        if _tree_signature(self.export_dir) == self._signature:
+            return False
+        self.refresh()
+        return True
+
+    def refresh(self) -> None:
+        """Rescan the export directory and drop cached windows."""
+        # Taken before the scan, so files written during it trigger another refresh
+        signature = _tree_signature(self.export_dir)
+        days: Dict[str, Tuple[float, Path]] = {}
+        aggregated: Dict[str, Tuple[str, float, Path]] = {}
+
+        for path in self.export_dir.rglob("copilot_metrics_*.json"):
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                # Removed (e.g. by retention cleanup) between listing and stat
+                continue
+            daily = _DAILY_RE.match(path.name)
+            if daily:
+                day = daily.group(1)
+                # The most recently written copy of a day wins
+                if day not in days or mtime > days[day][0]:
+                    days[day] = (mtime, path)
+                continue
+            agg = _AGGREGATED_RE.match(path.name)
+            if agg:
+                window = agg.group(1) or "all"
+                # Prefer the aggregate covering the latest range, then the newest file
+                key = (path.parent.name, mtime)
+                if window not in aggregated or key > aggregated[window][:2]:
+                    aggregated[window] = (path.parent.name, mtime, path)
+
+        with self._lock:
+            self._days = {day: path for day, (_, path) in days.items()}
+            self._aggregated = {window: path for window, (_, _, path) in aggregated.items()}
+            self._cache.clear()
+            self._generation += 1
+            self._signature = signature
+            self._checked_at = self.clock()
+
+        logger.info("Indexed %d days and %d aggregate windows under %s",
+                    len(self._days), len(self._aggregated), self.export_dir)
+
+    def available_days(self) -> List[str]:
+        return sorted(self._days)
+
+    def available_windows(self) -> List[str]:
+        return sorted(self._aggregated)
+
+    def aggregated_path(self, window: str = "all") -> Optional[Path]:
+        """Path of the latest aggregated file for a window, if any."""
+        return self._aggregated.get(window)
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[WindowResult]:
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _remember(self, key: Tuple[str, str], result: WindowResult, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _read(path: Path) -> List[Dict[str, Any]]:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def query_days(self, since: Optional[str], until: Optional[str]) -> WindowResult:
+        """
+        Get per-user daily records for an inclusive day range.
+
+        Args:
+            since: First day (YYYY-MM-DD), or None for the earliest available
+            until: Last day (YYYY-MM-DD), or None for the latest available
+
+        Returns:
+            WindowResult for the range
+        """
+        with self._lock:
+            generation, days_index = self._generation, self._days
+        days = sorted(days_index)
+        since = since or (days[0] if days else "")
+        until = until or (days[-1] if days else "")
+        key = (since, until)
+
+        result = self._cached(key)
+        if result is not None:
+            return result
+
+        records: List[Dict[str, Any]] = []
+        for day in days:
+            if since <= day <= until:
+                day_records = self._read(days_index[day])
+                for record in day_records:
+                    # Daily files carry the run's report range; expose the actual day
+                    record["day"] = day
+                records.extend(sorted(day_records, key=lambda r: r["user_login"]))
+
+        result = WindowResult(records)
+        self._remember(key, result, generation)
+        return result
+
+    def query_aggregated(self, window: str) -> Optional[WindowResult]:
+        """
+        Get the latest aggregated records for a window ("all", "7d", "28d", ...).
+
+        Returns:
+            WindowResult, or None if no aggregate exists for the window
+        """
+        with self._lock:
+            generation, path = self._generation, self._aggregated.get(window)
+        if path is None:
+            return None
+
+        key = ("aggregated", window)
+        result = self._cached(key)
+        if result is not None:
+            return result
+
+        result = WindowResult(sorted(self._read(path), key=lambda r: r["user_login"]))
+        self._remember(key, result, generation)
+        return result
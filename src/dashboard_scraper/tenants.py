@@ -0,0 +1,336 @@
+"""
+Scraping several Augment tenants in one process (--tenants).
+
+A tenants file lists the tenants to scrape; each entry has a ``name`` plus
+any settings that differ from the process settings (cookie file, base URL,
+enterprise id, rate limit, ...)::
+
+    {
+      "tenants": [
+        {"name": "payments", "cookie_file": "secrets/payments.json", "enterprise_id": "1001"},
+        {"name": "search", "cookie_file": "secrets/search.json", "enterprise_id": "1002",
+         "metrics_api_base_url": "https://search.augmentcode.com/", "max_requests_per_second": 2}
+      ]
+    }
+
+Unless a tenant sets ``export_dir``, its outputs go to ``<EXPORT_DIR>/<name>``.
+
+Tenants run concurrently on a pool of ``TENANT_WORKERS`` threads. Each has
+its own cookies, HTTP session, rate limiter and run metrics, and a failing
+tenant (expired cookies, API errors) does not affect the others. Every line
+a tenant prints or logs is prefixed with ``[<name>]``. Once all have
+finished, a combined report is printed and written to
+``tenants_report_<timestamp>.json`` in the export directory.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, TextIO
+
+from .atomic import write_text_atomic
+from .client import DashboardClient
+from .config import Settings
+from .cookie_auth import CookieAuth
+from .export import write_csv
+from .http import AuthenticationExpiredError, HTTPClient
+from .metrics import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+# Name of the tenant being scraped by the current worker thread
+_current_tenant: ContextVar[Optional[str]] = ContextVar("tenant", default=None)
+
+
+class Tenant(NamedTuple):
+    name: str
+    settings: Settings
+
+
+class TenantResult(NamedTuple):
+    name: str
+    status: str  # "ok", "failed" or "auth_expired"
+    seconds: float
+    error: str
+    metrics: Dict[str, Any]
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+class _TenantLabelledOutput:
+    """
+    Stand-in for sys.stdout that prefixes lines printed by a tenant's worker with ``[<name>]``.
+
+    Each thread's output is buffered up to the end of the line, so concurrent
+    tenants never interleave within a line. Output from other threads passes
+    through unchanged.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        name = _current_tenant.get()
+        if name is None:
+            return self.stream.write(text)
+        *lines, self._local.partial = (getattr(self._local, "partial", "") + text).split("\n")
+        if lines:
+            with self._lock:
+                self.stream.write("".join(f"[{name}] {line}\n" for line in lines))
+        return len(text)
+
+    def end_tenant(self) -> None:
+        """Write out what the current thread printed after its last newline."""
+        partial, self._local.partial = getattr(self._local, "partial", ""), ""
+        if partial:
+            self.write("\n")
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+
+class _TenantLogFilter(logging.Filter):
+    """Prefixes log records emitted by a tenant's worker with ``[<name>]``."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        name = _current_tenant.get()
+        # A record passes every handler's filter; label it once
+        if name is not None and getattr(record, "tenant", None) is None:
+            record.tenant = name
+            record.msg = f"[{name}] {record.msg}"
+        return True
+
+
+@contextmanager
+def _labelled_output() -> Iterator[_TenantLabelledOutput]:
+    """Label stdout lines and log records with the tenant that produced them."""
+    stdout = sys.stdout
+    output = _TenantLabelledOutput(stdout)
+    log_filter = _TenantLogFilter()
+    handlers = list(logging.getLogger().handlers)
+    sys.stdout = output
+    for handler in handlers:
+        handler.addFilter(log_filter)
+    try:
+        yield output
+    finally:
+        sys.stdout = stdout
+        for handler in handlers:
+            handler.removeFilter(log_filter)
+
+
+def load_tenants(path: Path, base: Settings) -> List[Tenant]:
+    """
+    Read a tenants file.
+
+    Args:
+        path: JSON file with a "tenants" list (or a bare list)
+        base: Settings the tenants' overrides are applied to
+
+    Returns:
+        One Tenant per entry, in file order
+
+    Raises:
+        ValueError: If the file is malformed, a name is missing, invalid or
+            repeated, or an entry sets an unknown setting
+    """
+    data = json.loads(path.read_text(encoding="utf-8"))
+    entries = data.get("tenants") if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path}: expected a non-empty \"tenants\" list")
+
+    fields = set(type(base).model_fields)
+    tenants: List[Tenant] = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: tenant #{i + 1} is not an object")
+        overrides = dict(entry)
+        name = str(overrides.pop("name", ""))
+        if not _NAME_RE.match(name):
+            raise ValueError(f"{path}: tenant #{i + 1} needs a name of letters, digits, '.', '_' or '-'")
+        if any(t.name == name for t in tenants):
+            raise ValueError(f"{path}: duplicate tenant name '{name}'")
+        unknown = sorted(set(overrides) - fields)
+        if unknown:
+            raise ValueError(f"{path}: tenant '{name}' has unknown settings: {', '.join(unknown)}")
+
+        overrides.setdefault("export_dir", str(Path(base.export_dir) / name))
+        # Validated like environment values, so "2" or "true" work as well as 2 or true
+        settings = type(base)(**{**base.model_dump(), **overrides}, _env_file=None)
+        tenants.append(Tenant(name, settings))
+    return tenants
+
+
+def _scrape_tenant(tenant: Tenant, start: datetime, end: datetime, last_28_days: bool,
+                   progress_mode: Optional[str], write_metrics: bool,
+                   output: _TenantLabelledOutput) -> TenantResult:
+    # Pool threads are reused, so the label is reset before the next tenant
+    token = _current_tenant.set(tenant.name)
+    try:
+        return _scrape_labelled_tenant(tenant, start, end, last_28_days, progress_mode, write_metrics)
+    finally:
+        output.end_tenant()
+        _current_tenant.reset(token)
+
+
+def _scrape_labelled_tenant(tenant: Tenant, start: datetime, end: datetime, last_28_days: bool,
+                            progress_mode: Optional[str], write_metrics: bool) -> TenantResult:
+    s = tenant.settings
+    metrics = RunMetrics()
+    started = time.perf_counter()
+    status, error = "ok", ""
+    out_path = None
+
+    http = None
+    try:
+        # Set up inside the try, so a tenant whose client cannot be built (unreadable
+        # cookies, missing cassette, ...) fails on its own instead of aborting run_tenants
+        cookie_auth = CookieAuth(s.cookie_file_path())
+        if not cookie_auth.has_cookies():
+            return TenantResult(tenant.name, "auth_expired", 0.0, f"no cookies in {s.cookie_file}", {})
+        http = HTTPClient(s, cookie_auth=cookie_auth, metrics=metrics)
+        client = DashboardClient(s, http)
+        if last_28_days:
+            from .daily_metrics import process_last_28_days
+
+            process_last_28_days(client, s, start, end, metrics=metrics, progress_mode=progress_mode)
+            if not metrics.gauges.get("days_successful"):
+                status, error = "failed", "no data fetched for any day"
+        else:
+            with metrics.stage("export"):
+                out_path = write_csv(client.iter_metrics(start, end), s.export_dir_path(),
+                                     start_date=start, end_date=end)
+    except AuthenticationExpiredError as e:
+        status, error = "auth_expired", str(e)
+    except Exception as e:
+        logger.error("Tenant %s failed: %s", tenant.name, e, exc_info=True)
+        status, error = "failed", str(e)
+    finally:
+        if http is not None:
+            http.close()
+
+    summary = metrics.to_dict()
+    # Endpoint errors are logged and skipped per day, so also fail a tenant whose API never answered
+    if status == "ok" and not _successful_responses(summary):
+        status, error = "failed", "no successful API responses"
+    if status == "ok" and out_path is not None:
+        print(f"✅ Metrics exported to: {out_path}")
+
+    metrics.set_gauge("run_success", 1 if status == "ok" else 0)
+    if write_metrics or s.run_metrics:
+        try:
+            metrics.write(s.export_dir_path() / "run_metrics.json", s.run_metrics_textfile_path())
+        except OSError as e:
+            logger.error("Failed to write run metrics for %s: %s", tenant.name, e)
+    return TenantResult(tenant.name, status, time.perf_counter() - started, error, metrics.to_dict())
+
+
+def _successful_responses(summary: Dict[str, Any]) -> int:
+    return sum(count for endpoint in summary["endpoints"].values()
+               for status, count in endpoint["responses"].items() if status.startswith("2"))
+
+
+def run_tenants(
+    tenants: List[Tenant],
+    start: datetime,
+    end: datetime,
+    last_28_days: bool = False,
+    workers: int = 4,
+    progress_mode: Optional[str] = "silent",
+    write_metrics: bool = False,
+) -> List[TenantResult]:
+    """
+    Scrape every tenant, up to ``workers`` at a time.
+
+    While they run, each line a tenant prints or logs is prefixed with ``[<name>]``.
+
+    Args:
+        tenants: Tenants to scrape
+        start: Start of the date range
+        end: End of the date range
+        last_28_days: Run the 28-day daily pipeline instead of a single CSV export
+        workers: Tenants scraped concurrently
+        progress_mode: Progress output of each tenant's 28-day run
+        write_metrics: Write each tenant's run metrics to its export directory
+
+    Returns:
+        One result per tenant, in the order given
+    """
+    with _labelled_output() as output, \
+            ThreadPoolExecutor(max(1, min(workers, len(tenants))), thread_name_prefix="tenant") as pool:
+        futures = [
+            pool.submit(_scrape_tenant, tenant, start, end, last_28_days, progress_mode, write_metrics, output)
+            for tenant in tenants
+        ]
+        return [future.result() for future in futures]
+
+
+def build_report(results: List[TenantResult], start: datetime, end: datetime) -> Dict[str, Any]:
+    """Combine tenant results into one report (written as tenants_report_*.json)."""
+    tenants = []
+    for result in results:
+        endpoints = result.metrics.get("endpoints", {})
+        gauges = result.metrics.get("gauges", {})
+        tenants.append({
+            "name": result.name,
+            "status": result.status,
+            "error": result.error,
+            "seconds": round(result.seconds, 3),
+            "days_successful": gauges.get("days_successful"),
+            "days_failed": gauges.get("days_failed"),
+            "requests": sum(e["requests"] for e in endpoints.values()),
+            "retries": sum(e["retries"] for e in endpoints.values()),
+            "failures": sum(e["failures"] for e in endpoints.values()),
+            "skipped": sum(e["skipped"] for e in endpoints.values()),
+            "wire_bytes": sum(e["wire_bytes"] for e in endpoints.values()),
+        })
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "succeeded": sum(1 for r in results if r.ok),
+        "failed": sum(1 for r in results if not r.ok),
+        "tenants": tenants,
+    }
+
+
+def write_report(report: Dict[str, Any], export_dir: Path) -> Path:
+    path = export_dir / f"tenants_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    write_text_atomic(path, json.dumps(report, indent=2) + "\n")
+    return path
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print()
+    print("=" * 80)
+    print("🏢 Tenants Summary")
+    print("=" * 80)
+    for t in report["tenants"]:
+        icon = "✅" if t["status"] == "ok" else "❌"
+        days = ""
+        if t["days_successful"] is not None:
+            days = f", {t['days_successful']} days ok, {t['days_failed']} failed"
+        print(f"{icon} {t['name']}: {t['status']} in {t['seconds']:.1f}s "
+              f"({t['requests']} requests, {t['retries']} retries, {t['failures']} failed, "
+              f"{t['skipped']} skipped{days})")
+        if t["error"]:
+            print(f"   {t['error']}")
+    print(f"\nSucceeded: {report['succeeded']}  Failed: {report['failed']}")
@@ -0,0 +1,232 @@
+"""
+Optional span tracing exported as OTLP-compatible JSON.
+
+Instrumented code calls ``get_tracer().start_span(name, attributes)`` as a
+context manager. Until a ``Tracer`` is installed with ``set_tracer`` the
+global tracer is a no-op, so tracing costs almost nothing when disabled.
+
+The current span is tracked in a ``contextvars.ContextVar``. New threads do
+not inherit it; code that hands work to a thread pool should submit
+``contextvars.copy_context().run`` so worker spans nest under the caller.
+
+``Tracer.write`` produces the OTLP/JSON layout used by the OpenTelemetry
+collector's file exporter (``resourceSpans`` -> ``scopeSpans`` -> ``spans``,
+hex trace/span ids, nanosecond timestamps as strings), so the file can be
+loaded by tools that read OTLP JSON, e.g. Jaeger's or otel-desktop-viewer's
+file import.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SCOPE_NAME = "dashboard_scraper"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+class Span:
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: str,
+        kind: int,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.thread = threading.current_thread().name
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": dict(attributes or {})})
+
+    def set_error(self, message: str) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = message
+
+    def to_otlp(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"code": self.status_code}
+        if self.status_message:
+            status["message"] = self.status_message
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes({**self.attributes, "thread.name": self.thread}),
+            "events": [
+                {
+                    "timeUnixNano": str(e["time_ns"]),
+                    "name": e["name"],
+                    "attributes": _otlp_attributes(e["attributes"]),
+                }
+                for e in self.events
+            ],
+            "status": status,
+        }
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("dashboard_scraper_span", default=None)
+
+
+class Tracer:
+    enabled = True
+
+    def __init__(self, service_name: str = "dashboard-scraper") -> None:
+        """
+        Initialize a tracer; every span it starts belongs to a single trace.
+
+        Args:
+            service_name: Value of the service.name resource attribute
+        """
+        self.service_name = service_name
+        self.trace_id = os.urandom(16).hex()
+        self._lock = threading.Lock()
+        self._finished: List[Span] = []
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+    ) -> Iterator[Span]:
+        """
+        Start a span as a child of the current span and make it current.
+
+        Exceptions escaping the block mark the span as an error and are
+        re-raised.
+        """
+        parent = _current_span.get()
+        span = Span(name, self.trace_id, parent.span_id if parent else "", kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            with self._lock:
+                self._finished.append(span)
+
+    @property
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._finished)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": self.service_name,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": SCOPE_NAME},
+                    "spans": [s.to_otlp() for s in spans],
+                }],
+            }],
+        }
+
+    def write(self, path: Path) -> None:
+        """Write all finished spans to ``path`` as OTLP JSON."""
+        with atomic_write(path) as f:
+            json.dump(self.to_otlp(), f)
+        logger.info("Wrote %d spans to %s", len(self._finished), path)
+
+
+class NoopTracer:
+    """Default tracer; spans are not recorded."""
+
+    enabled = False
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+    ) -> Iterator[_NoopSpan]:
+        yield _NOOP_SPAN
+
+
+_tracer: Tracer | NoopTracer = NoopTracer()
+
+
+def get_tracer() -> Tracer | NoopTracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer | NoopTracer) -> None:
+    """Install ``tracer`` as the process-wide tracer (pass NoopTracer() to disable)."""
+    global _tracer
+    _tracer = tracer
+
+
+def current_span() -> Span | _NoopSpan:
+    """The innermost active span, or a no-op span when none is active."""
+    return _current_span.get() or _NOOP_SPAN
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Callable, Iterator, List, Optional
+
+import pytest
+
+from dashboard_scraper.config import Settings
+from dashboard_scraper.cookie_auth import CookieAuth
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant, start_fake_server
+from dashboard_scraper.http import HTTPClient
+from dashboard_scraper.metrics import NULL_METRICS, NullMetrics, RunMetrics
+
+
+@pytest.fixture
+def fake_api() -> Iterator[Callable[..., str]]:
+    """Start stand-in API servers for a test and shut them all down afterwards.
+
+    Yields:
+        ``start(tenant, faults=None)``, which returns the server's base URL
+    """
+    servers = []
+
+    def start(tenant: SyntheticTenant, faults: Optional[FaultInjector] = None) -> str:
+        server, base_url = start_fake_server(tenant, faults)
+        servers.append(server)
+        return base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def cookie_file() -> Iterator[Path]:
+    """A cookies.json holding a test session cookie."""
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cookies.json"
+        path.write_text(json.dumps({"_session": "test"}))
+        yield path
+
+
+@pytest.fixture
+def http_client(cookie_file: Path) -> Iterator[Callable[..., HTTPClient]]:
+    """Build HTTP clients authenticated with ``cookie_file`` and close them all afterwards.
+
+    Yields:
+        ``make(base_url, metrics=NULL_METRICS, **settings)``; the settings are
+        available on the client as ``.s`` and never read from a .env file
+    """
+    clients: List[HTTPClient] = []
+
+    def make(base_url: str, metrics: RunMetrics | NullMetrics = NULL_METRICS, **settings) -> HTTPClient:
+        s = Settings(metrics_api_base_url=base_url, _env_file=None, **settings)
+        http = HTTPClient(s, cookie_auth=CookieAuth(cookie_file), metrics=metrics)
+        clients.append(http)
+        return http
+
+    yield make
+    for http in clients:
+        http.close()
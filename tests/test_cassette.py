@@ -0,0 +1,98 @@
+import gzip
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+
+import pytest
+
+from dashboard_scraper.cassette import CassetteMissError, load_cassette
+from dashboard_scraper.client import DashboardClient
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant
+
+DAY = datetime(2025, 10, 22, tzinfo=timezone.utc)
+
+
+def test_record_then_replay_offline(fake_api, http_client):
+    """Test that a replayed run yields the recorded rows, including retried errors, without a server."""
+    with TemporaryDirectory() as tmpdir:
+        cassette = Path(tmpdir) / "run.cassette.jsonl.gz"
+
+        base_url = fake_api(SyntheticTenant(40, seed=9), FaultInjector(error_rate=0.5, seed=4))
+        http = http_client(base_url, scrape_endpoints="user_stats", retry_backoff_seconds=0.01,
+                           cassette_mode="record", cassette_file=str(cassette), max_retries=10)
+        recorded_rows = list(DashboardClient(http.s, http).iter_metrics(DAY, DAY))
+        http.close()
+
+        entries = load_cassette(cassette)
+        statuses = [e["status"] for e in entries]
+        assert statuses[-1] == 200
+        assert 503 in statuses
+        assert entries[0]["url"].startswith("/api/user-feature-stats?startDate=")
+
+        # Different host: only path and query are matched
+        http = http_client("http://replay.invalid/", scrape_endpoints="user_stats", retry_backoff_seconds=0.01,
+                           cassette_mode="replay", cassette_file=str(cassette), max_retries=10)
+        assert list(DashboardClient(http.s, http).iter_metrics(DAY, DAY)) == recorded_rows
+        assert http.cassette.replayed == len(statuses)
+
+
+def test_replay_latency_and_misses(fake_api, http_client):
+    """Test latency reproduction, path-only matching and unmatched requests."""
+    with TemporaryDirectory() as tmpdir:
+        cassette = Path(tmpdir) / "c.jsonl.gz"
+        base_url = fake_api(SyntheticTenant(5), FaultInjector(latency_ms=50))
+        http = http_client(base_url, cassette_mode="record", cassette_file=str(cassette))
+        DashboardClient(http.s, http).fetch_endpoint("/api/user-feature-stats", DAY, DAY)
+        http.close()
+
+        http = http_client("http://replay.invalid/", cassette_mode="replay", cassette_file=str(cassette),
+                           cassette_latency_scale=1.0, cassette_match_query=False)
+        client = DashboardClient(http.s, http)
+        started = time.perf_counter()
+        data = client.fetch_endpoint("/api/user-feature-stats", datetime(2024, 1, 1), datetime(2024, 1, 1))
+        assert time.perf_counter() - started >= 0.05
+        assert "userFeatureStats" in data
+
+        with pytest.raises(CassetteMissError):
+            client.fetch_endpoint("/api/tenant-monthly-active-users", DAY, DAY)
+
+
+class _SessionRotatingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'{"monthlyActiveUsers": 3}'
+        self.send_response(200)
+        self.send_header("Set-Cookie", "_session=secret-rotated-token; Path=/; HttpOnly")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_recorded_cassette_has_no_session_tokens(http_client):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SessionRotatingHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with TemporaryDirectory() as tmpdir:
+            cassette = Path(tmpdir) / "c.jsonl.gz"
+            http = http_client(f"http://127.0.0.1:{server.server_address[1]}/", cassette_mode="record",
+                               cassette_file=str(cassette), persist_cookies=False)
+            client = DashboardClient(http.s, http)
+            assert client.fetch_endpoint("/api/tenant-monthly-active-users", DAY, DAY) == {"monthlyActiveUsers": 3}
+            http.close()
+
+            (entry,) = load_cassette(cassette)
+            assert entry["headers"]["Content-Type"] == "application/json"
+            assert not any(k.lower() == "set-cookie" for k in entry["headers"])
+            with gzip.open(cassette, "rt") as f:
+                text = f.read()
+            assert "secret-rotated-token" not in text
+            assert '"test"' not in text  # the cookie sent with the request
+    finally:
+        server.shutdown()
+        server.server_close()
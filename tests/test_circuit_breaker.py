@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+from dashboard_scraper.client import DashboardClient
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant
+from dashboard_scraper.http import CircuitBreaker, CircuitOpenError, is_outage
+from dashboard_scraper.metrics import RunMetrics
+
+
+def test_breaker_opens_probes_and_closes():
+    now = [0.0]
+    breaker = CircuitBreaker(2, 10.0, clock=lambda: now[0])
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.allow() == CircuitBreaker.PROBE
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    now[0] = 20.0
+    assert breaker.allow() == CircuitBreaker.PROBE
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() == CircuitBreaker.PASS
+    assert breaker.skipped == 3
+
+
+def test_down_endpoint_is_skipped_after_threshold(fake_api, http_client):
+    """Test that a dead endpoint stops costing retries while the others are still fetched."""
+    base_url = fake_api(SyntheticTenant(20, seed=4), FaultInjector(down_endpoints=["tenant_mau"]))
+    metrics = RunMetrics()
+    http = http_client(base_url, metrics, retry_backoff_seconds=0.01, circuit_breaker_threshold=2)
+    client = DashboardClient(http.s, http)
+    for day in range(1, 6):
+        start = datetime(2025, 9, day, tzinfo=timezone.utc)
+        records = list(client.iter_metrics(start, start.replace(hour=23, minute=59, second=59)))
+        assert any(r.get("Metric Type") == "Tenant Summary" for r in records)
+        assert not any(r.get("Metric Type") == "Monthly Active Users" for r in records)
+    with pytest.raises(CircuitOpenError):
+        client.fetch_endpoint(http.s.tenant_mau_endpoint, start, start)
+
+    mau = metrics.to_dict()["endpoints"]["/api/tenant-monthly-active-users"]
+    # Two days with all their retries, then nothing is sent
+    assert mau["requests"] == 2 * (http.s.max_retries + 1)
+    assert mau["failures"] == 2
+    assert mau["skipped"] == 4
+    assert "/api/tenant-monthly-active-users: circuit open, 4 requests skipped" in http.transfer_summary()
+    assert 'http_skipped_total{endpoint="/api/tenant-monthly-active-users"} 4' in metrics.to_prometheus()
+
+
+def test_client_errors_do_not_open_the_circuit(fake_api, http_client):
+    """Test that a 4xx is blamed on the request, while 429 and 5xx count as the endpoint being down."""
+    http = http_client(fake_api(SyntheticTenant(5)), max_retries=0, circuit_breaker_threshold=1)
+    for _ in range(3):
+        with pytest.raises(requests.HTTPError):
+            http.request("GET", http.s.metrics_api_base_url + "api/no-such-endpoint")
+    assert http.breakers["/api/no-such-endpoint"].state == CircuitBreaker.CLOSED
+
+    def http_error(status):
+        resp = requests.Response()
+        resp.status_code = status
+        return requests.HTTPError(response=resp)
+
+    assert [is_outage(http_error(status)) for status in (400, 404, 429, 500, 503)] == [
+        False, False, True, True, True]
+    assert is_outage(requests.ConnectionError()) and is_outage(requests.ReadTimeout())
+    assert not is_outage(requests.exceptions.InvalidURL())
+
+
+def test_probe_that_raises_unexpectedly_frees_its_slot(http_client, monkeypatch):
+    """Test that a probe ending in a non-HTTP error (cassette miss, bad body, ...) does not wedge the circuit."""
+    http = http_client("http://127.0.0.1:9/", max_retries=0, circuit_breaker_threshold=1,
+                       circuit_breaker_reset_seconds=0)
+    url = http.s.metrics_api_base_url + "api/tenant-monthly-active-users"
+    with pytest.raises(requests.ConnectionError):
+        http.request("GET", url)
+    breaker = http.breakers["/api/tenant-monthly-active-users"]
+    assert breaker.state == CircuitBreaker.OPEN
+
+    def broken(*args, **kwargs):
+        raise ValueError("unreadable body")
+
+    monkeypatch.setattr(http.session, "request", broken)
+    with pytest.raises(ValueError):
+        http.request("GET", url)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() == CircuitBreaker.PROBE
@@ -0,0 +1,60 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from dashboard_scraper.columnar import open_snapshot, read_snapshot_rows, write_snapshot
+
+
+def _rows() -> list:
+    return [
+        {"User": "a@example.com", "First Seen": "2025-01-02", "Last Seen": "2025-10-28",
+         "Active Days": 1, "Completions": 12, "Accept Rate": "41.67%", "Agent Lines of Code": 2**40},
+        {"User": "b@example.com", "First Seen": "2025-01-02", "Last Seen": "2025-10-28",
+         "Active Days": "1", "Chat Messages": "3", "Accept Rate": "0.00%"},
+        {"Metric Type": "Monthly Active Users", "Value": 2},
+    ]
+
+
+def test_snapshot_round_trip():
+    """Test that user rows survive a write/read cycle and summary rows are skipped."""
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "day.dscol"
+        assert write_snapshot(_rows(), path) == 2
+
+        rows = read_snapshot_rows(path)
+        assert [r["User"] for r in rows] == ["a@example.com", "b@example.com"]
+        assert rows[0]["Completions"] == 12
+        assert rows[0]["Accept Rate"] == "41.67%"
+        assert rows[0]["Agent Lines of Code"] == 2**40
+        assert rows[1]["Chat Messages"] == 3
+        assert rows[1]["Tool Uses"] == 0
+
+
+def test_snapshot_columns_are_zero_copy_views():
+    """Test column access by name, including interned string columns."""
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "day.dscol"
+        write_snapshot(_rows(), path)
+
+        with open_snapshot(path) as snapshot:
+            assert snapshot.rows == 2
+            assert snapshot.header["strings"]["count"] == 4
+            completions = snapshot.column("Completions")
+            assert isinstance(completions, memoryview)
+            assert list(completions) == [12, 0]
+            assert list(snapshot.column("First Seen")) == ["2025-01-02", "2025-01-02"]
+            del completions
+
+
+def test_snapshot_empty_and_invalid():
+    """Test empty snapshots and rejection of foreign files."""
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "empty.dscol"
+        write_snapshot([], path)
+        assert read_snapshot_rows(path) == []
+
+        bogus = Path(tmpdir) / "bogus.dscol"
+        bogus.write_bytes(b"not a snapshot at all")
+        with pytest.raises(ValueError):
+            read_snapshot_rows(bogus)
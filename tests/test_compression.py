@@ -0,0 +1,77 @@
+import json
+import zlib
+from datetime import datetime, timezone
+
+from dashboard_scraper.client import DashboardClient
+from dashboard_scraper.fake_server import SyntheticTenant
+from dashboard_scraper.http import _ContentDecoder, resolve_accept_encoding
+from dashboard_scraper.metrics import RunMetrics
+
+
+def test_resolve_accept_encoding():
+    assert resolve_accept_encoding("auto").startswith("gzip, deflate")
+    assert resolve_accept_encoding("identity") == "identity"
+    assert resolve_accept_encoding("gzip") == "gzip"
+
+
+def test_deflate_decoder_accepts_zlib_and_raw_streams():
+    data = json.dumps({"userFeatureStats": list(range(1000))}).encode()
+    raw = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    for body in (zlib.compress(data), raw.compress(data) + raw.flush()):
+        decoder = _ContentDecoder("deflate")
+        out = b"".join(decoder.decompress(body[i:i + 100]) for i in range(0, len(body), 100))
+        assert out + decoder.flush() == data
+
+
+def test_wire_and_decoded_bytes_per_endpoint(fake_api, http_client):
+    """Test that gzip is negotiated and wire bytes are counted before decoding, streamed or not."""
+    base_url = fake_api(SyntheticTenant(300, seed=5))
+    url = base_url + "api/user-feature-stats"
+    params = {"startDate": json.dumps({"year": 2025, "month": 10, "day": 1}),
+              "endDate": json.dumps({"year": 2025, "month": 10, "day": 28})}
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 10, 28, tzinfo=timezone.utc)
+
+    transfer = {}
+    for accept_encoding in ("auto", "identity"):
+        metrics = RunMetrics()
+        http = http_client(base_url, metrics, accept_encoding=accept_encoding)
+        users = http.request("GET", url, params=params).json()["userFeatureStats"]
+        client = DashboardClient(http.s, http)
+        streamed = client.stream_endpoint_items("/api/user-feature-stats", "userFeatureStats", start, end)
+        assert list(streamed) == users
+
+        stats = http.transfer["/api/user-feature-stats"]
+        assert stats.responses == 2
+        assert http.bytes_received == stats.wire_bytes
+        endpoint = metrics.to_dict()["endpoints"]["/api/user-feature-stats"]
+        assert endpoint["wire_bytes"] == stats.wire_bytes
+        assert endpoint["response_bytes"] == stats.body_bytes
+        transfer[accept_encoding] = stats
+
+    assert transfer["auto"].encodings == {"gzip": 2}
+    assert transfer["auto"].wire_bytes * 3 < transfer["auto"].body_bytes
+    assert transfer["identity"].encodings == {"identity": 2}
+    assert transfer["identity"].wire_bytes >= transfer["identity"].body_bytes
+    assert transfer["identity"].body_bytes == transfer["auto"].body_bytes
+
+
+def test_connection_reuse_is_counted(fake_api, http_client):
+    """Test that sequential requests reuse one pooled connection, and that keep-alive off reconnects."""
+    base_url = fake_api(SyntheticTenant(10, seed=5))
+    url = base_url + "api/tenant-feature-stats"
+    params = {"startDate": json.dumps({"year": 2025, "month": 10, "day": 1}),
+              "endDate": json.dumps({"year": 2025, "month": 10, "day": 1})}
+    counts = {}
+    for keep_alive in (True, False):
+        metrics = RunMetrics()
+        http = http_client(base_url, metrics, http_keep_alive=keep_alive)
+        for _ in range(5):
+            assert http.request("GET", url, params=params).status_code == 200
+        http.close()
+        counts[keep_alive] = (http.connections_opened, http.connections_reused)
+        assert metrics.to_dict()["connections"] == {"opened": counts[keep_alive][0],
+                                                    "reused": counts[keep_alive][1]}
+    assert counts[True] == (1, 4)
+    assert counts[False] == (5, 0)
+    assert http.transfer_summary()[-1] == "connections: 5 opened, 0 reused"
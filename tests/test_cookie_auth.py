@@ -0,0 +1,82 @@
+import json
+import os
+import stat
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+
+from dashboard_scraper import cookie_auth as cookie_auth_module
+from dashboard_scraper.config import Settings
+from dashboard_scraper.cookie_auth import CookieAuth
+from dashboard_scraper.http import HTTPClient
+
+
+def test_cookies_are_parsed_once_until_the_file_changes(monkeypatch):
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(cookie_auth_module.json, "load", lambda f: loads.append(1) or real_load(f))
+
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cookies.json"
+        path.write_text(json.dumps({"_session": "a"}))
+        auth = CookieAuth(path)
+        assert auth.has_cookies()
+        assert auth.get_cookies_dict() == {"_session": "a"}
+        assert len(loads) == 1
+
+        path.write_text(json.dumps({"_session": "bb"}))
+        assert auth.get_cookies_dict() == {"_session": "bb"}
+        assert len(loads) == 2
+
+
+def test_update_cookies_rewrites_only_changed_values():
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cookies.json"
+        auth = CookieAuth(path)
+        auth.save_cookies({"_session": "a", "other": "x"})
+        assert not auth.update_cookies({"_session": "a"})
+        assert auth.update_cookies({"_session": "b"})
+        assert json.loads(path.read_text()) == {"_session": "b", "other": "x"}
+        if os.name == "posix":
+            assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+class _RotatingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        sent = self.headers.get("Cookie", "")
+        body = json.dumps({"cookie": sent}).encode()
+        self.send_response(200)
+        self.send_header("Set-Cookie", "_session=rotated; Path=/")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_rotated_cookies_are_persisted():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RotatingHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    try:
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "cookies.json"
+            path.write_text(json.dumps({"_session": "original"}))
+
+            for persist, expected in ((False, "original"), (True, "rotated")):
+                s = Settings(persist_cookies=persist, _env_file=None)
+                http = HTTPClient(s, cookie_auth=CookieAuth(path))
+                try:
+                    assert http.request("GET", url).json() == {"cookie": "_session=original"}
+                    assert http.request("GET", url).json() == {"cookie": "_session=rotated"}
+                    # The client's own write does not count as an external change
+                    assert not http.reload_cookies_if_changed()
+                finally:
+                    http.close()
+                assert json.loads(path.read_text()) == {"_session": expected}
+    finally:
+        server.shutdown()
+        server.server_close()
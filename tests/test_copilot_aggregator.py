@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from dashboard_scraper.copilot_aggregator import (
+    AggregationWindow,
+    aggregate_daily_json_files,
+    aggregate_windows,
+    resolve_windows,
+)
+from dashboard_scraper.copilot_converter import convert_csv_row_to_copilot_json
+
+
+def _daily_record(user: str, day: str, completions: int) -> dict:
+    row = {"User": user, "Completions": completions, "Accepted Completions": 1, "Chat Messages": 2}
+    record = convert_csv_row_to_copilot_json(row, "2025-10-01", "2025-10-28")
+    record["day"] = day
+    return record
+
+
+def test_resolve_windows():
+    """Test numeric and calendar-month windows ending on the last day."""
+    windows = resolve_windows(["1", "7", "28", "month"], "2025-10-01", "2025-10-28")
+    assert windows == [
+        AggregationWindow("1d", "2025-10-28", "2025-10-28"),
+        AggregationWindow("7d", "2025-10-22", "2025-10-28"),
+        AggregationWindow("28d", "2025-10-01", "2025-10-28"),
+        AggregationWindow("month", "2025-10-01", "2025-10-28"),
+    ]
+
+
+def test_resolve_windows_clips_and_skips_invalid():
+    """Test that windows are clipped to available data and bad specs are ignored."""
+    windows = resolve_windows(["90", "abc", "0"], "2025-10-01", "2025-10-28")
+    assert windows == [AggregationWindow("90d", "2025-10-01", "2025-10-28")]
+
+
+def test_aggregate_windows_single_pass():
+    """Test that each window only sums the days it contains."""
+    daily = {
+        "2025-10-26": [_daily_record("a@example.com", "2025-10-26", 5)],
+        "2025-10-27": [
+            _daily_record("a@example.com", "2025-10-27", 3),
+            _daily_record("b@example.com", "2025-10-27", 1),
+        ],
+        "2025-10-28": [_daily_record("a@example.com", "2025-10-28", 2)],
+    }
+    windows = [
+        AggregationWindow("all", "2025-10-26", "2025-10-28"),
+        AggregationWindow("1d", "2025-10-28", "2025-10-28"),
+    ]
+    results = aggregate_windows(daily, windows)
+
+    all_by_user = {r["user_login"]: r for r in results["all"]}
+    assert all_by_user["a@example.com"]["code_generation_activity_count"] == 10
+    assert all_by_user["b@example.com"]["code_generation_activity_count"] == 1
+    assert all_by_user["a@example.com"]["report_start_day"] == "2025-10-26"
+
+    assert len(results["1d"]) == 1
+    one_day = results["1d"][0]
+    assert one_day["code_generation_activity_count"] == 2
+    assert one_day["report_start_day"] == "2025-10-28"
+    features = {f["feature"]: f for f in one_day["totals_by_feature"]}
+    assert features["chat_panel"]["user_initiated_interaction_count"] == 2
+
+
+def test_aggregate_daily_json_files_matches_windows():
+    """Test that the file-based aggregator agrees with the in-memory one."""
+    daily = {
+        "2025-10-27": [_daily_record("a@example.com", "2025-10-27", 3)],
+        "2025-10-28": [_daily_record("a@example.com", "2025-10-28", 2)],
+    }
+    with TemporaryDirectory() as tmpdir:
+        files = []
+        for day, records in daily.items():
+            path = Path(tmpdir) / f"copilot_metrics_{day}.json"
+            path.write_text(json.dumps(records))
+            files.append(path)
+        out_path = Path(tmpdir) / "aggregated.json"
+        assert aggregate_daily_json_files(files, out_path, "2025-10-27", "2025-10-28") == 1
+        from_files = json.loads(out_path.read_text())
+
+    in_memory = aggregate_windows(daily, [AggregationWindow("all", "2025-10-27", "2025-10-28")])["all"]
+    assert from_files == in_memory
@@ -0,0 +1,59 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from dashboard_scraper.daemon import Daemon, next_run_time, parse_schedule
+from dashboard_scraper.fake_server import SyntheticTenant
+from dashboard_scraper.http import AuthenticationExpiredError
+
+
+def test_next_run_time():
+    schedule = parse_schedule("15:30, 03:00")
+    assert next_run_time(schedule, datetime(2025, 9, 1, 2, 0, tzinfo=timezone.utc)) == datetime(
+        2025, 9, 1, 3, 0, tzinfo=timezone.utc)
+    assert next_run_time(schedule, datetime(2025, 9, 1, 3, 0, tzinfo=timezone.utc)) == datetime(
+        2025, 9, 1, 15, 30, tzinfo=timezone.utc)
+    assert next_run_time(schedule, datetime(2025, 9, 1, 16, 0, tzinfo=timezone.utc)) == datetime(
+        2025, 9, 2, 3, 0, tzinfo=timezone.utc)
+    with pytest.raises(ValueError, match="25:00"):
+        parse_schedule("25:00")
+
+
+def test_runs_reuse_the_session_and_reload_changed_cookies(fake_api, http_client, cookie_file):
+    cookie_file.write_text(json.dumps({"_session": "first"}))
+    with TemporaryDirectory() as tmp:
+        http = http_client(fake_api(SyntheticTenant(10, seed=7)), export_dir=tmp)
+        start = datetime(2025, 9, 1, tzinfo=timezone.utc)
+        end = datetime(2025, 9, 1, 23, 59, 59, tzinfo=timezone.utc)
+        stop = threading.Event()
+        sessions = []
+
+        def sync(client, metrics):
+            sessions.append((client.http.session, client.http.session.cookies.get("_session")))
+            with metrics.stage("fetch"):
+                list(client.iter_metrics(start, end))
+            if len(sessions) == 2:
+                raise AuthenticationExpiredError("Session expired")
+            if len(sessions) == 3:
+                stop.set()
+
+        status_path = Path(tmp) / "status.json"
+        daemon = Daemon(http.s, http, status_path, sync=sync)
+        assert daemon.run_once()["status"] == "ok"
+        cookie_file.write_text(json.dumps({"_session": "second"}))
+        os.utime(cookie_file, ns=(0, 0))
+        assert daemon.run_once()["status"] == "auth_expired"
+        daemon.run_forever(stop)
+
+        assert sessions[0][0] is sessions[1][0] is sessions[2][0]
+        assert [cookie for _, cookie in sessions] == ["first", "second", "second"]
+        status = json.loads(status_path.read_text())
+        assert (status["state"], status["runs"], status["failed_runs"]) == ("stopped", 3, 1)
+        assert status["last_run"]["status"] == "ok"
+        assert status["last_run"]["stages"]["fetch"]["count"] == 1
+        assert "cookies_reloaded_at" in status
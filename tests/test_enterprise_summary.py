@@ -0,0 +1,39 @@
+from dashboard_scraper.enterprise_summary import build_enterprise_day_summary
+
+
+def _row(user: str, **counts) -> dict:
+    row = {"User": user, "Active Days": 1}
+    row.update(counts)
+    return row
+
+
+def test_build_enterprise_day_summary():
+    """Test totals and engaged-user counts for a small day."""
+    rows = [
+        _row("a@example.com", **{"Completions": 10, "Accepted Completions": 4, "Chat Messages": 2}),
+        _row("b@example.com", **{"Agent Messages": 3, "Tool Uses": 7, "Agent Lines of Code": 50}),
+        _row("c@example.com", **{"Interactive CLI Agent Messages": "1", "CLI Agent Lines of Code": "20"}),
+        _row("d@example.com", **{"Active Days": 1}),
+        {"Metric Type": "Tenant Summary", "User Messages": 99},
+    ]
+    summary = build_enterprise_day_summary("2025-10-28", rows)
+
+    assert summary["date"] == "2025-10-28"
+    assert summary["total_active_users"] == 4
+    assert summary["total_engaged_users"] == 3
+    assert summary["augment_ide_code_completions"]["total_engaged_users"] == 1
+    assert summary["augment_ide_code_completions"]["total_completions"] == 10
+    assert summary["augment_ide_chat"]["total_engaged_users"] == 2
+    assert summary["augment_agent"]["total_engaged_users"] == 1
+    assert summary["augment_agent"]["total_tool_uses"] == 7
+    assert summary["augment_agent"]["total_agent_lines_of_code"] == 50
+    assert summary["augment_cli_agent"]["total_engaged_users"] == 1
+    assert summary["augment_cli_agent"]["total_cli_agent_lines_of_code"] == 20
+
+
+def test_build_enterprise_day_summary_empty():
+    """Test that a day without users yields zero counts."""
+    summary = build_enterprise_day_summary("2025-10-28", [])
+    assert summary["total_active_users"] == 0
+    assert summary["total_engaged_users"] == 0
+    assert summary["augment_agent"]["total_agent_messages"] == 0
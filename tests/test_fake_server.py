@@ -0,0 +1,39 @@
+from datetime import date, datetime, timezone
+
+import pytest
+import requests
+
+from dashboard_scraper.client import DashboardClient
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant
+
+
+def test_synthetic_tenant_is_deterministic():
+    """Test that the same seed yields the same records."""
+    day = date(2025, 10, 22)
+    a = list(SyntheticTenant(50, seed=3).iter_user_stats(day, day))
+    b = list(SyntheticTenant(50, seed=3).iter_user_stats(day, day))
+    assert a == b
+    assert 0 < len(a) <= 50
+
+
+def test_client_against_fake_server(fake_api, http_client):
+    """Test the real client end to end against the stand-in server."""
+    tenant = SyntheticTenant(200, seed=5)
+    http = http_client(fake_api(tenant), retry_backoff_seconds=0.01)
+    day = datetime(2025, 10, 22, tzinfo=timezone.utc)
+    rows = list(DashboardClient(http.s, http).iter_metrics(day, day.replace(hour=23, minute=59)))
+
+    users = [r for r in rows if "User" in r]
+    expected = list(tenant.iter_user_stats(date(2025, 10, 22), date(2025, 10, 22)))
+    assert [r["User"] for r in users] == [r["userEmail"] for r in expected]
+    assert any(r.get("Metric Type") == "Monthly Active Users" for r in rows)
+    assert any(r.get("Metric Type") == "Tenant Summary" for r in rows)
+
+
+def test_fake_server_injects_errors(fake_api, http_client):
+    """Test that injected 5xx responses surface after retries are exhausted."""
+    base_url = fake_api(SyntheticTenant(10), FaultInjector(error_rate=1.0))
+    http = http_client(base_url, retry_backoff_seconds=0.01, max_retries=1)
+    day = datetime(2025, 10, 22, tzinfo=timezone.utc)
+    with pytest.raises(requests.HTTPError):
+        DashboardClient(http.s, http).fetch_endpoint("/api/user-feature-stats", day, day)
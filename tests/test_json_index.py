@@ -0,0 +1,49 @@
+import json
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from dashboard_scraper.copilot_converter import convert_csv_row_to_copilot_json
+from dashboard_scraper.json_index import index_path_for, lookup_records, write_indexed_json
+
+
+def _records(n: int) -> list:
+    return [
+        convert_csv_row_to_copilot_json({"User": f"user{i}@example.com", "Completions": i}, "2025-10-01", "2025-10-28")
+        for i in range(n)
+    ]
+
+
+def test_write_indexed_json_matches_json_dump():
+    """Test that the indexed writer produces the same bytes as json.dump(indent=2)."""
+    with TemporaryDirectory() as tmpdir:
+        for n in (0, 1, 5):
+            path = Path(tmpdir) / f"out{n}.json"
+            records = _records(n)
+            write_indexed_json(records, path)
+            assert path.read_text() == json.dumps(records, indent=2)
+            assert index_path_for(path).exists()
+
+
+def test_lookup_records_by_login_and_id():
+    """Test random access by user_login and user_id."""
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "aggregated.json"
+        records = _records(50)
+        write_indexed_json(records, path)
+
+        assert lookup_records(path, "user17@example.com") == [records[17]]
+        assert lookup_records(path, str(records[3]["user_id"])) == [records[3]]
+        assert lookup_records(path, "missing@example.com") == []
+
+
+def test_lookup_records_stale_index_falls_back():
+    """Test that a file modified after indexing is parsed in full."""
+    with TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "aggregated.json"
+        write_indexed_json(_records(3), path)
+        records = _records(4)
+        path.write_text(json.dumps(records))
+        os.utime(path, ns=(1, 1))
+
+        assert lookup_records(path, "user3@example.com") == [records[3]]
@@ -0,0 +1,92 @@
+import json
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import pytest
+
+from dashboard_scraper.client import DashboardClient, IncompleteStreamError
+from dashboard_scraper.daily_metrics import _fetch_single_day_metrics
+from dashboard_scraper.fake_server import SyntheticTenant
+from dashboard_scraper.json_stream import iter_array_items
+
+
+def _chunks(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def test_items_decoded_across_chunk_boundaries():
+    """Test every chunk size, with numbers and multi-byte characters split between chunks."""
+    doc = {
+        "before": {"nested": [1, 2, {"x": "]}"}]},
+        "userFeatureStats": [{"userEmail": "ünïcødé@example.com", "n": 12345}, {"n": -1.5e3}, [], "s", 987654321],
+        "after": 123456,
+    }
+    data = json.dumps(doc, indent=1).encode("utf-8")
+    for size in (1, 2, 3, 7, 64, len(data)):
+        assert list(iter_array_items(_chunks(data, size), "userFeatureStats")) == doc["userFeatureStats"]
+
+
+def test_missing_empty_and_malformed():
+    assert list(iter_array_items([b'{"other": [1, 2]}'], "userFeatureStats")) == []
+    assert list(iter_array_items([b'{"userFeatureStats": []}'], "userFeatureStats")) == []
+    assert list(iter_array_items([b'{"userFeatureStats": null}'], "userFeatureStats")) == []
+    assert list(iter_array_items([b"{}"], "userFeatureStats")) == []
+    with pytest.raises(ValueError):
+        list(iter_array_items([b'[{"a": 1}]'], "userFeatureStats"))
+    with pytest.raises(ValueError):
+        list(iter_array_items([b'{"userFeatureStats": [{"a": 1} {"b": 2}]}'], "userFeatureStats"))
+    with pytest.raises(ValueError):
+        list(iter_array_items([b'{"userFeatureStats": [{"a": 1}, {"b":'], "userFeatureStats"))
+
+
+def test_streamed_rows_match_buffered_rows(fake_api, http_client):
+    """Test that streaming decode yields the same formatted rows as resp.json()."""
+    base_url = fake_api(SyntheticTenant(500, seed=11))
+    day = datetime(2025, 10, 22, tzinfo=timezone.utc)
+
+    rows = {}
+    for stream_json in (False, True):
+        http = http_client(base_url, scrape_endpoints="user_stats", stream_json=stream_json)
+        rows[stream_json] = list(DashboardClient(http.s, http).iter_metrics(day, day))
+        assert http.bytes_received > 0
+
+    assert len(rows[True]) > 100
+    assert rows[True] == rows[False]
+
+
+class _TruncatingHandler(BaseHTTPRequestHandler):
+    """Announces a full user-stats body but closes the connection half way through the array."""
+
+    def do_GET(self):
+        users = [{"userEmail": f"user{i}@example.com", "totalActiveDays": 1} for i in range(200)]
+        body = json.dumps({"userFeatureStats": users}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body[:len(body) // 2])
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+def test_stream_cut_off_mid_array_fails_the_day(http_client):
+    """Test that a body cut off after some users were yielded fails the day instead of keeping part of it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TruncatingHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        http = http_client(f"http://127.0.0.1:{server.server_address[1]}/", scrape_endpoints="user_stats",
+                           stream_json=True, max_retries=0)
+        client = DashboardClient(http.s, http)
+        day = datetime(2025, 10, 22, tzinfo=timezone.utc)
+        rows = []
+        with pytest.raises(IncompleteStreamError):
+            for row in client.iter_metrics(day, day):
+                rows.append(row)
+        assert 0 < len(rows) < 200
+        assert _fetch_single_day_metrics(client, day, 1, 1) is None
+    finally:
+        server.shutdown()
+        server.server_close()
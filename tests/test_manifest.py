@@ -0,0 +1,120 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from dashboard_scraper.atomic import atomic_write, write_text_atomic
+from dashboard_scraper.client import DashboardClient
+from dashboard_scraper.daily_metrics import process_last_28_days
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant
+
+
+def test_failed_write_keeps_previous_file():
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out.json"
+        path.write_text("old")
+        with pytest.raises(RuntimeError):
+            with atomic_write(path) as f:
+                f.write("partial")
+                raise RuntimeError("interrupted")
+        assert path.read_text() == "old"
+        assert [p.name for p in Path(tmp).iterdir()] == ["out.json"]
+
+
+def test_keep_unchanged_leaves_identical_file_untouched():
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "out.json"
+        write_text_atomic(path, "same")
+        inode = path.stat().st_ino
+        write_text_atomic(path, "same", keep_unchanged=True)
+        assert path.stat().st_ino == inode
+        write_text_atomic(path, "new", keep_unchanged=True)
+        assert path.read_text() == "new"
+
+
+def test_rerun_skips_unchanged_days(fake_api, http_client):
+    start = datetime(2025, 9, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 9, 3, 23, 59, 59, 999999, tzinfo=timezone.utc)
+    base_url = fake_api(SyntheticTenant(30, seed=4))
+    with TemporaryDirectory() as tmp:
+        def run(**settings):
+            http = http_client(base_url, export_dir=str(Path(tmp) / "out"), progress="silent", **settings)
+            process_last_28_days(DashboardClient(http.s, http), http.s, start, end)
+            daily_dir = Path(tmp) / "out" / "daily_exports_2025-09-01_to_2025-09-03"
+            return daily_dir, {p.name: p.stat().st_ino for p in daily_dir.iterdir()}
+
+        daily_dir, first = run()
+        manifest = json.loads((daily_dir / "manifest.json").read_text())
+        assert sorted(manifest["days"]) == ["2025-09-01", "2025-09-02", "2025-09-03"]
+        assert manifest["days"]["2025-09-01"]["files"] == [
+            "augment_metrics_2025-09-01.csv", "augment_metrics_2025-09-01.dscol",
+            "copilot_metrics_2025-09-01.json"]
+
+        _, second = run()
+        assert second == first
+
+        _, third = run(skip_unchanged_days=False)
+        assert third["augment_metrics_2025-09-01.csv"] != first["augment_metrics_2025-09-01.csv"]
+        assert third["copilot_metrics_aggregated.json"] == first["copilot_metrics_aggregated.json"]
+
+
+def test_partitioned_layout_stores_each_day_once(fake_api, http_client):
+    """Test that overlapping runs share day partitions and build the same aggregates as the range layout."""
+    base_url = fake_api(SyntheticTenant(30, seed=5))
+    with TemporaryDirectory() as tmp:
+        def run(export_dir, first_day, last_day, **settings):
+            http = http_client(base_url, export_dir=str(export_dir), progress="silent", **settings)
+            start = datetime(2025, 9, first_day, tzinfo=timezone.utc)
+            end = datetime(2025, 9, last_day, 23, 59, 59, tzinfo=timezone.utc)
+            process_last_28_days(DashboardClient(http.s, http), http.s, start, end)
+
+        out = Path(tmp) / "partitioned"
+        run(out, 1, 3, output_layout="partitioned")
+        run(out, 2, 4, output_layout="partitioned")
+        run(Path(tmp) / "range", 2, 4)
+
+        assert len(list(out.rglob("copilot_metrics_2025-09-03.json"))) == 1
+        assert (out / "partitions/year=2025/month=09/day=03/augment_metrics_2025-09-03.dscol").exists()
+        manifest = json.loads((out / "partitions" / "manifest.json").read_text())
+        assert sorted(manifest["days"]) == ["2025-09-01", "2025-09-02", "2025-09-03", "2025-09-04"]
+        assert sorted(p.name for p in (out / "daily_exports_2025-09-02_to_2025-09-04").glob("*.json")) == [
+            "augment_enterprise_daily.json", "copilot_metrics_aggregated.json",
+            "copilot_metrics_aggregated_1d.json", "copilot_metrics_aggregated_28d.json",
+            "copilot_metrics_aggregated_7d.json"]
+        for name in ("copilot_metrics_aggregated.json", "augment_enterprise_daily.json"):
+            partitioned = (out / "daily_exports_2025-09-02_to_2025-09-04" / name).read_text()
+            assert partitioned == (Path(tmp) / "range" / "daily_exports_2025-09-02_to_2025-09-04" / name).read_text()
+
+
+def test_partition_is_kept_when_an_endpoint_fails(fake_api, http_client):
+    """Test that a partly fetched day leaves its stored partition alone and aggregates read the partitions."""
+    tenant = SyntheticTenant(30, seed=6)
+    healthy_url = fake_api(tenant)
+    mau_down_url = fake_api(tenant, FaultInjector(down_endpoints=["tenant_mau"]))
+    with TemporaryDirectory() as tmp:
+        out = Path(tmp) / "out"
+
+        def run(base_url, first_day, last_day):
+            http = http_client(base_url, export_dir=str(out), progress="silent", output_layout="partitioned",
+                               retry_backoff_seconds=0.01, max_retries=0)
+            start = datetime(2025, 9, first_day, tzinfo=timezone.utc)
+            end = datetime(2025, 9, last_day, 23, 59, 59, tzinfo=timezone.utc)
+            process_last_28_days(DashboardClient(http.s, http), http.s, start, end)
+
+        run(healthy_url, 1, 3)
+        day_2 = out / "partitions/year=2025/month=09/day=02"
+        stored = {p.name: (p.stat().st_ino, p.read_bytes()) for p in day_2.iterdir()}
+
+        run(mau_down_url, 2, 4)
+        assert {p.name: (p.stat().st_ino, p.read_bytes()) for p in day_2.iterdir()} == stored
+        assert not (out / "partitions/year=2025/month=09/day=04").exists()
+        manifest = json.loads((out / "partitions" / "manifest.json").read_text())
+        assert sorted(manifest["days"]) == ["2025-09-01", "2025-09-02", "2025-09-03"]
+
+        # The range outputs come from the stored days 2 and 3, though neither was fetched completely this time
+        range_dir = out / "daily_exports_2025-09-02_to_2025-09-04"
+        summary = json.loads((range_dir / "augment_enterprise_daily.json").read_text())
+        assert [s["date"] for s in summary] == ["2025-09-02", "2025-09-03"]
+        assert json.loads((range_dir / "copilot_metrics_aggregated.json").read_text())
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+import requests
+
+from dashboard_scraper.client import DashboardClient
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant
+from dashboard_scraper.metrics import RunMetrics
+
+
+def test_histogram_and_stage_totals():
+    """Test that latency buckets are cumulative and stages accumulate."""
+    metrics = RunMetrics()
+    for seconds in (0.01, 0.2, 0.2, 3.0, 120.0):
+        metrics.observe_request("https://x/api/user-feature-stats?startDate=a", "200", seconds, 10)
+    for _ in range(2):
+        with metrics.stage("convert"):
+            pass
+
+    data = metrics.to_dict()
+    endpoint = data["endpoints"]["/api/user-feature-stats"]
+    buckets = endpoint["latency_seconds"]["buckets"]
+    assert buckets["0.05"] == 1
+    assert buckets["0.25"] == 3
+    assert buckets["5.0"] == 4
+    assert buckets["60.0"] == 4
+    assert buckets["+Inf"] == 5
+    assert endpoint["response_bytes"] == 50
+    assert data["stages"]["convert"]["count"] == 2
+
+    text = metrics.to_prometheus()
+    assert (
+        'dashboard_scraper_http_request_duration_seconds_bucket{endpoint="/api/user-feature-stats",le="+Inf"} 5'
+        in text
+    )
+    assert "# TYPE dashboard_scraper_http_request_duration_seconds histogram" in text
+
+
+def test_http_client_records_retries(fake_api, http_client):
+    """Test that retried 503s and the final response are recorded per endpoint."""
+    base_url = fake_api(SyntheticTenant(10), FaultInjector(error_rate=1.0))
+    metrics = RunMetrics()
+    http = http_client(base_url, metrics, retry_backoff_seconds=0.01, max_retries=2)
+    client = DashboardClient(http.s, http)
+
+    day = datetime(2025, 10, 22, tzinfo=timezone.utc)
+    with pytest.raises(requests.HTTPError):
+        client.fetch_endpoint(http.s.user_feature_stats_endpoint, day, day)
+
+    endpoint = metrics.to_dict()["endpoints"]["/api/user-feature-stats"]
+    assert endpoint["responses"] == {"503": 3}
+    assert endpoint["retries"] == 2
+    assert endpoint["failures"] == 1
+
+    with TemporaryDirectory() as tmp:
+        metrics.write(Path(tmp) / "run.json", Path(tmp) / "out.prom")
+        assert 'dashboard_scraper_http_retries_total{endpoint="/api/user-feature-stats"} 2' in (
+            Path(tmp) / "out.prom").read_text()
@@ -0,0 +1,57 @@
+import random
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from dashboard_scraper import output_executor
+from dashboard_scraper.output_executor import OutputExecutor
+
+
+def test_each_lane_runs_in_submission_order():
+    seen = {"a": [], "b": []}
+
+    def task(lane, i):
+        time.sleep(random.uniform(0, 0.002))
+        seen[lane].append(i)
+
+    with OutputExecutor(max_workers=3, max_pending=4) as output:
+        for i in range(50):
+            output.submit("a", str(i), task, "a", i)
+            output.submit("b", str(i), task, "b", i)
+        output.drain()
+        assert seen == {"a": list(range(50)), "b": list(range(50))}
+
+
+def test_errors_are_collected_and_other_tasks_continue():
+    done = []
+
+    def task(i):
+        if i == 2:
+            raise OSError("disk full")
+        done.append(i)
+
+    for workers in (0, 2):
+        done.clear()
+        output = OutputExecutor(max_workers=workers)
+        with output:
+            for i in range(5):
+                output.submit("csv", f"day {i}", task, i)
+        assert done == [0, 1, 3, 4]
+        assert [(e.lane, e.label, str(e.error)) for e in output.errors] == [("csv", "day 2", "disk full")]
+
+
+def test_exit_drains_pending_tasks_and_fsyncs_written_files(monkeypatch):
+    synced = []
+    monkeypatch.setattr(output_executor, "fsync_file", lambda path: synced.append(path))
+
+    with TemporaryDirectory() as tmp:
+        def write(name):
+            time.sleep(0.01)
+            path = Path(tmp) / name
+            path.write_text("x")
+            return [path]
+
+        with OutputExecutor(max_workers=2, fsync=True) as output:
+            for i in range(6):
+                output.submit("json", str(i), write, f"{i}.json")
+        assert sorted(p.name for p in synced) == [f"{i}.json" for i in range(6)]
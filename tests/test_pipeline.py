@@ -0,0 +1,51 @@
+import threading
+import time
+
+import pytest
+
+from dashboard_scraper.pipeline import run_pipeline
+
+
+def test_results_in_order_threaded_and_inline():
+    stages = [("double", lambda x: x * 2), ("inc", lambda x: x + 1)]
+    for threaded in (True, False):
+        assert list(run_pipeline(range(50), stages, queue_size=1, threaded=threaded)) == [x * 2 + 1 for x in range(50)]
+
+
+def test_bounded_queues_apply_backpressure():
+    """Test that a slow consumer stops the source from running ahead of it."""
+    produced = []
+
+    def source():
+        for i in range(40):
+            produced.append(i)
+            yield i
+
+    ahead = []
+    for i, _ in enumerate(run_pipeline(source(), [("a", lambda x: x), ("b", lambda x: x)], queue_size=1)):
+        time.sleep(0.005)
+        ahead.append(len(produced) - i)
+    # One item in each of the 3 queues plus one held by the source and each stage
+    assert max(ahead) <= 7
+
+
+def test_stage_error_is_raised_after_earlier_items():
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return x
+
+    seen = []
+    with pytest.raises(ValueError, match="bad item"):
+        for item in run_pipeline(range(10), [("check", fail_on_three)]):
+            seen.append(item)
+    assert seen == [0, 1, 2]
+
+
+def test_stopping_early_stops_all_threads():
+    items = run_pipeline(iter(range(1000)), [("a", lambda x: x)], queue_size=1)
+    for item in items:
+        if item == 5:
+            break
+    items.close()
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
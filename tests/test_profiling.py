@@ -0,0 +1,32 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from dashboard_scraper.profiling import StageProfiler
+
+
+def _work(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def test_stage_reports_written():
+    with TemporaryDirectory() as tmp:
+        profiler = StageProfiler(Path(tmp) / "profile")
+        try:
+            for _ in range(2):
+                with profiler.stage("convert"):
+                    _work(10000)
+            with profiler.stage("aggregate"):
+                data = [bytes(1000) for _ in range(100)]
+                del data
+            written = profiler.write_reports()
+        finally:
+            profiler.close()
+
+        names = sorted(p.name for p in written)
+        assert names == ["profile_aggregate.pstats", "profile_convert.pstats", "profile_summary.txt"]
+        assert profiler.stages["convert"].calls == 2
+        assert profiler.stages["aggregate"].peak_memory_bytes >= 100 * 1000
+
+        summary = (Path(tmp) / "profile" / "profile_summary.txt").read_text()
+        assert "convert: top 15 by cumulative time" in summary
+        assert "_work" in summary
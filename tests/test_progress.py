@@ -0,0 +1,51 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dashboard_scraper.progress import LogProgress, TTYProgress, create_progress
+
+
+def test_tty_progress_batches_updates():
+    """Test that bursts of updates are rendered at most once per interval, plus the final line."""
+    stream = io.StringIO()
+    progress = TTYProgress("Fetching", 100, bytes_source=lambda: 2048, stream=stream)
+    with progress:
+        for _ in range(99):
+            progress.advance(records=10)
+    output = stream.getvalue()
+
+    assert output.count("\r") <= 3
+    assert output.endswith("\n")
+    last = output.rsplit("\r\x1b[K", 1)[1]
+    assert last.startswith("Fetching 99/100 | ")
+    assert "records/s" in last and "B/s" in last and "ETA" in last
+
+
+def test_concurrent_advance_counts_every_day():
+    """Test that days finished on several threads are all counted."""
+    progress = create_progress("silent", "Fetching", 200)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: progress.advance(records=i, failed=i % 10 == 0), range(200)))
+    assert progress.done == 200
+    assert progress.records == sum(range(200))
+    assert progress.failed == 20
+
+
+def test_log_progress_reports_completion(caplog):
+    """Test that log mode writes the final state once."""
+    with caplog.at_level(logging.INFO, logger="dashboard_scraper.progress"):
+        with LogProgress("Converting", 3) as progress:
+            for _ in range(3):
+                progress.advance(records=5)
+        progress.close()
+    lines = [r.getMessage() for r in caplog.records]
+    assert lines[-1].startswith("Converting 3/3 | ")
+    assert lines[-1].endswith("(done)")
+    assert sum("(done)" in line for line in lines) == 1
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        create_progress("fancy", "Fetching", 1)
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+
+from dashboard_scraper.client import DashboardClient, _should_split, merge_user_stats, range_days, split_range
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant
+from dashboard_scraper.http import CircuitOpenError
+
+
+def test_split_range_covers_every_day_once():
+    start = datetime(2025, 7, 1, tzinfo=timezone.utc)
+    for days in (2, 3, 28, 91):
+        end = (start + timedelta(days=days - 1)).replace(hour=23, minute=59, second=59)
+        (a, b), (c, d) = split_range(start, end)
+        assert (a, d) == (start, end)
+        assert c.date() - b.date() == timedelta(days=1)
+        assert range_days(a, b) + range_days(c, d) == days
+        assert range_days(a, b) == days // 2
+
+
+def test_merge_user_stats():
+    left = {"userFeatureStats": [
+        {"userEmail": "a@x", "firstSeen": "2025-07-02T09:00:00Z", "lastSeen": "2025-07-10T17:00:00Z",
+         "totalActiveDays": 3, "totalCompletionsInTimePeriod": 10, "acceptedCompletionsInTimePeriod": 5,
+         "acceptanceRatePercentage": 50.0},
+    ]}
+    right = {"userFeatureStats": [
+        {"userEmail": "b@x", "firstSeen": "2025-07-20T09:00:00Z", "lastSeen": "2025-07-21T17:00:00Z",
+         "totalActiveDays": 1, "totalCompletionsInTimePeriod": 0, "acceptedCompletionsInTimePeriod": 0,
+         "acceptanceRatePercentage": None},
+        {"userEmail": "a@x", "firstSeen": "2025-06-01T09:00:00Z", "lastSeen": "2025-07-30T17:00:00Z",
+         "totalActiveDays": 4, "totalCompletionsInTimePeriod": 30, "acceptedCompletionsInTimePeriod": 25,
+         "acceptanceRatePercentage": 83.33},
+    ]}
+    merged = {r["userEmail"]: r for r in merge_user_stats(left, right)["userFeatureStats"]}
+    assert merged["a@x"] == {
+        "userEmail": "a@x", "firstSeen": "2025-06-01T09:00:00Z", "lastSeen": "2025-07-30T17:00:00Z",
+        "totalActiveDays": 7, "totalCompletionsInTimePeriod": 40, "acceptedCompletionsInTimePeriod": 30,
+        "acceptanceRatePercentage": 75.0,
+    }
+    assert merged["b@x"] == right["userFeatureStats"][0]
+
+
+def test_oversized_range_is_bisected_and_merged(fake_api, http_client):
+    """Test that rows from a range the server rejects match the rows of a single unsplit request."""
+    start = datetime(2025, 9, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 9, 20, 23, 59, 59, 999999, tzinfo=timezone.utc)
+    tenant = SyntheticTenant(200, seed=3)
+    whole_url = fake_api(tenant)
+    split_url = fake_api(tenant, FaultInjector(max_range_days=6))
+
+    def rows(base_url, **settings):
+        http = http_client(base_url, scrape_endpoints="user_stats,tenant_stats", max_retries=0, **settings)
+        records = list(DashboardClient(http.s, http).iter_metrics(start, end))
+        return sorted(records, key=lambda r: r.get("User", ""))
+
+    expected = rows(whole_url)
+    assert len(expected) > 100
+    assert rows(split_url) == expected
+    assert rows(split_url, range_split_workers=3, stream_json=True) == expected
+    assert [r for r in rows(split_url, range_split=False) if "User" in r] == []
+
+
+def test_open_circuit_is_not_split():
+    """Test that a request refused by an open circuit is not retried as two smaller ranges."""
+    assert not _should_split(CircuitOpenError("open"))
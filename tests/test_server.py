@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+import threading
+import urllib.request
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from dashboard_scraper.copilot_converter import convert_csv_row_to_copilot_json, write_copilot_json
+from dashboard_scraper.server import decode_cursor, encode_cursor, make_server
+from dashboard_scraper.store import MetricsStore
+
+
+def _write_day(daily_dir: Path, day: str, users: list) -> None:
+    records = [
+        convert_csv_row_to_copilot_json({"User": user, "Completions": 1}, "2025-10-27", "2025-10-28")
+        for user in users
+    ]
+    write_copilot_json(records, daily_dir / f"copilot_metrics_{day}.json")
+
+
+def _get(url: str, gzip_ok: bool = False):
+    headers = {"Accept-Encoding": "gzip"} if gzip_ok else {}
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as resp:
+        body = resp.read()
+        if resp.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return json.loads(body), resp.headers
+
+
+def test_cursor_round_trip():
+    """Test that cursors decode back to their offset."""
+    assert decode_cursor(encode_cursor(250)) == 250
+
+
+def test_server_filters_and_paginates():
+    """Test date/user filters, cursor pagination and gzip responses."""
+    with TemporaryDirectory() as tmpdir:
+        daily_dir = Path(tmpdir) / "daily_exports_2025-10-27_to_2025-10-28"
+        users = [f"user{i:03d}@example.com" for i in range(30)]
+        _write_day(daily_dir, "2025-10-27", users)
+        _write_day(daily_dir, "2025-10-28", users[:5])
+
+        server = make_server(MetricsStore(Path(tmpdir)), "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/enterprises/283613/copilot/metrics/users"
+        try:
+            page, headers = _get(f"{base}?since=2025-10-28&until=2025-10-28")
+            assert len(page) == 5
+            assert {r["day"] for r in page} == {"2025-10-28"}
+
+            page, headers = _get(f"{base}?user=user001@example.com")
+            assert [r["day"] for r in page] == ["2025-10-27", "2025-10-28"]
+
+            seen = []
+            url = f"{base}?per_page=10"
+            while url:
+                page, headers = _get(url, gzip_ok=True)
+                seen.extend(r["user_login"] for r in page)
+                link = headers.get("Link")
+                url = f"http://127.0.0.1:{server.server_address[1]}{link[1:link.index('>')]}" if link else None
+            assert len(seen) == 35
+
+            page, _ = _get(base.replace("283613", "999"))
+            assert page == []
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_server_picks_up_new_exports():
+    """Test that days exported after the server started are served, replacing cached windows."""
+    with TemporaryDirectory() as tmpdir:
+        users = ["a@example.com", "b@example.com"]
+        _write_day(Path(tmpdir) / "daily_exports_2025-10-27_to_2025-10-27", "2025-10-27", users)
+        now = [0.0]
+        store = MetricsStore(Path(tmpdir), refresh_seconds=5.0, clock=lambda: now[0])
+
+        server = make_server(store, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/enterprises/283613/copilot/metrics/users"
+        try:
+            page, _ = _get(base)
+            assert {r["day"] for r in page} == {"2025-10-27"}
+
+            _write_day(Path(tmpdir) / "daily_exports_2025-10-28_to_2025-10-28", "2025-10-28", users[:1])
+            # Not checked again until refresh_seconds have passed
+            page, _ = _get(base)
+            assert len(page) == 2
+            now[0] = 5.0
+            page, _ = _get(base)
+            assert [r["day"] for r in page] == ["2025-10-27", "2025-10-27", "2025-10-28"]
+            assert store.available_days() == ["2025-10-27", "2025-10-28"]
+            now[0] = 10.0
+            assert not store.refresh_if_changed()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_store_skips_exports_removed_during_a_scan(monkeypatch):
+    """Test that a file or directory deleted between listing and stat is left out instead of failing the scan."""
+    with TemporaryDirectory() as tmpdir:
+        users = ["a@example.com"]
+        gone = Path(tmpdir) / "daily_exports_2025-10-28_to_2025-10-28"
+        _write_day(Path(tmpdir) / "daily_exports_2025-10-27_to_2025-10-27", "2025-10-27", users)
+        _write_day(gone, "2025-10-28", users)
+        path_stat, os_stat = Path.stat, os.stat
+
+        def vanished_path(self, *args, **kwargs):
+            if self.parent == gone:
+                raise FileNotFoundError(str(self))
+            return path_stat(self, *args, **kwargs)
+
+        def vanished_dir(path, *args, **kwargs):
+            if Path(path) == gone:
+                raise FileNotFoundError(str(path))
+            return os_stat(path, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "stat", vanished_path)
+        monkeypatch.setattr("dashboard_scraper.store.os.stat", vanished_dir)
+        store = MetricsStore(Path(tmpdir))
+        assert store.available_days() == ["2025-10-27"]
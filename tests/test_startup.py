@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+from typing import Dict, List
+
+import pytest
+
+# Cumulative import time of dashboard_scraper.main for the lightweight commands,
+# checked only when STARTUP_TIMING_TESTS=1 since wall-clock limits are flaky on
+# loaded CI machines. It was about 300 ms with requests and pydantic_settings
+# imported eagerly and is about 15 ms without them.
+IMPORT_BUDGET_US = 150_000
+
+
+def _import_times(args: List[str], cwd: str) -> Dict[str, int]:
+    """Run the CLI under -X importtime and return module -> cumulative import time (us)."""
+    env = dict(os.environ, COOKIE_FILE=os.path.join(cwd, "cookies.json"), EXPORT_DIR=cwd)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "dashboard_scraper", *args],
+        cwd=cwd, env=env, input="", capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+# Imported only by the commands that use them
+DEFERRED_MODULES = [
+    "requests",
+    "pydantic_settings",
+    "dashboard_scraper.config",
+    "dashboard_scraper.cookie_auth",
+    "dashboard_scraper.export",
+    "dashboard_scraper.metrics",
+    "dashboard_scraper.progress",
+    "dashboard_scraper.tracing",
+]
+
+
+def test_help_skips_heavy_imports():
+    with TemporaryDirectory() as tmp:
+        times = _import_times(["--help"], tmp)
+    assert "dashboard_scraper.main" in times
+    assert [name for name in DEFERRED_MODULES if name in times] == []
+
+
+@pytest.mark.skipif(os.environ.get("STARTUP_TIMING_TESTS") != "1", reason="set STARTUP_TIMING_TESTS=1 to run")
+def test_help_import_time_within_budget():
+    with TemporaryDirectory() as tmp:
+        times = _import_times(["--help"], tmp)
+    assert times["dashboard_scraper.main"] < IMPORT_BUDGET_US
+
+
+def test_auth_skips_settings_and_requests():
+    with TemporaryDirectory() as tmp:
+        times = _import_times(["--auth"], tmp)
+    assert "dashboard_scraper.cookie_auth" in times
+    assert [name for name in ("requests", "pydantic_settings", "dashboard_scraper.http") if name in times] == []
+
+
+def test_auth_settings_match_settings(monkeypatch):
+    from dashboard_scraper.config import Settings
+    from dashboard_scraper.main import AUTH_SETTINGS, read_auth_settings
+
+    assert AUTH_SETTINGS == {name: Settings.model_fields[name].default for name in AUTH_SETTINGS}
+    with TemporaryDirectory() as tmp:
+        monkeypatch.chdir(tmp)
+        monkeypatch.delenv("COOKIE_FILE", raising=False)
+        monkeypatch.delenv("LOG_LEVEL", raising=False)
+        with open(".env", "w") as f:
+            f.write('COOKIE_FILE="from-dotenv.json"\nLOG_LEVEL=DEBUG\n')
+        monkeypatch.setenv("log_level", "WARNING")
+        assert read_auth_settings() == {"cookie_file": "from-dotenv.json", "log_level": "WARNING"}
+        s = Settings()
+        assert (s.cookie_file, s.log_level) == ("from-dotenv.json", "WARNING")
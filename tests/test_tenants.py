@@ -0,0 +1,87 @@
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from dashboard_scraper.config import Settings
+from dashboard_scraper.fake_server import SyntheticTenant
+from dashboard_scraper.http import RateLimiter
+from dashboard_scraper.tenants import build_report, load_tenants, run_tenants
+
+
+def test_load_tenants_applies_overrides():
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tenants.json"
+        base = Settings(export_dir="out", _env_file=None)
+        path.write_text(json.dumps({"tenants": [
+            {"name": "a", "enterprise_id": "1", "max_requests_per_second": "2.5"},
+            {"name": "b", "export_dir": "elsewhere"},
+        ]}))
+        a, b = load_tenants(path, base)
+        assert (a.name, a.settings.enterprise_id, a.settings.max_requests_per_second) == ("a", "1", 2.5)
+        assert a.settings.export_dir == str(Path("out") / "a")
+        assert b.settings.export_dir == "elsewhere"
+
+        path.write_text(json.dumps([{"name": "a", "cookie_fiel": "x"}]))
+        with pytest.raises(ValueError, match="unknown settings: cookie_fiel"):
+            load_tenants(path, base)
+        path.write_text(json.dumps([{"name": "a"}, {"name": "a"}]))
+        with pytest.raises(ValueError, match="duplicate"):
+            load_tenants(path, base)
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(50)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - started >= 5 / 50 - 0.01
+    assert RateLimiter(0).acquire() == 0.0
+
+
+def test_failing_tenant_does_not_stop_the_others(fake_api, cookie_file, capsys):
+    base_url = fake_api(SyntheticTenant(20, seed=6))
+    with TemporaryDirectory() as tmp:
+        cookies = str(cookie_file)
+        path = Path(tmp) / "tenants.json"
+        path.write_text(json.dumps({"tenants": [
+            {"name": "good", "cookie_file": cookies, "enterprise_id": "1"},
+            {"name": "no-cookies", "cookie_file": str(Path(tmp) / "missing.json")},
+            {"name": "down", "cookie_file": cookies, "metrics_api_base_url": "http://127.0.0.1:9/"},
+            {"name": "other", "cookie_file": cookies, "enterprise_id": "2"},
+            # Fails while building its HTTP client
+            {"name": "no-cassette", "cookie_file": cookies, "cassette_mode": "replay",
+             "cassette_file": str(Path(tmp) / "missing.cassette.jsonl.gz")},
+        ]}))
+        base = Settings(metrics_api_base_url=base_url, export_dir=str(Path(tmp) / "out"), max_retries=0,
+                        request_timeout_seconds=5, _env_file=None)
+        start = datetime(2025, 9, 1, tzinfo=timezone.utc)
+        end = datetime(2025, 9, 2, 23, 59, 59, tzinfo=timezone.utc)
+
+        results = run_tenants(load_tenants(path, base), start, end, last_28_days=True, workers=3)
+        assert [(r.name, r.status) for r in results] == [
+            ("good", "ok"), ("no-cookies", "auth_expired"), ("down", "failed"), ("other", "ok"),
+            ("no-cassette", "failed")]
+        assert "missing.cassette" in results[4].error
+        for name, enterprise in (("good", "1"), ("other", "2")):
+            daily = Path(tmp) / "out" / name / "daily_exports_2025-09-01_to_2025-09-02"
+            records = json.loads((daily / "copilot_metrics_aggregated.json").read_text())
+            assert {r["enterprise_id"] for r in records} == {enterprise}
+
+        report = build_report(results, start, end)
+        assert (report["succeeded"], report["failed"]) == (2, 3)
+        assert report["tenants"][0]["days_successful"] == 2
+        assert report["tenants"][0]["requests"] > 0
+
+        # Each line is labelled with its tenant, and the export line is only printed for a tenant that got data
+        tenants = [t for t in load_tenants(path, base) if t.name in ("good", "down")]
+        capsys.readouterr()
+        results = run_tenants(tenants, start, end, workers=2)
+        assert [r.status for r in results] == ["ok", "failed"]
+        lines = [line for line in capsys.readouterr().out.splitlines() if line]
+        assert lines and all(line.startswith(("[good] ", "[down] ")) for line in lines)
+        assert any(line.startswith("[good] ✅ Metrics exported to:") for line in lines)
+        assert not any("✅" in line for line in lines if line.startswith("[down] "))
@@ -0,0 +1,88 @@
+import contextvars
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+import requests
+
+from dashboard_scraper.client import DashboardClient
+from dashboard_scraper.fake_server import FaultInjector, SyntheticTenant
+from dashboard_scraper.tracing import NoopTracer, Tracer, get_tracer, set_tracer
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    set_tracer(tracer)
+    yield tracer
+    set_tracer(NoopTracer())
+
+
+@pytest.fixture
+def fetch(fake_api, http_client):
+    def _fetch(faults: FaultInjector) -> None:
+        http = http_client(fake_api(SyntheticTenant(20, seed=2), faults), retry_backoff_seconds=0.01, max_retries=1)
+        day = datetime(2025, 10, 22, tzinfo=timezone.utc)
+        with get_tracer().start_span("day"):
+            DashboardClient(http.s, http).fetch_endpoint(http.s.user_feature_stats_endpoint, day, day)
+    return _fetch
+
+
+def test_spans_nest_and_export_as_otlp(tracer, fetch):
+    """Test that day -> fetch_endpoint -> HTTP GET spans share a trace and nest."""
+    fetch(FaultInjector())
+    with TemporaryDirectory() as tmp:
+        path = Path(tmp) / "trace.json"
+        tracer.write(path)
+        doc = json.loads(path.read_text())
+
+    spans = doc["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+    assert set(by_name) == {"day", "fetch_endpoint", "HTTP GET"}
+    assert by_name["day"]["parentSpanId"] == ""
+    assert by_name["fetch_endpoint"]["parentSpanId"] == by_name["day"]["spanId"]
+    assert by_name["HTTP GET"]["parentSpanId"] == by_name["fetch_endpoint"]["spanId"]
+    assert {span["traceId"] for span in spans} == {tracer.trace_id}
+    assert int(by_name["HTTP GET"]["endTimeUnixNano"]) >= int(by_name["HTTP GET"]["startTimeUnixNano"])
+
+    attributes = {a["key"]: a["value"] for a in by_name["HTTP GET"]["attributes"]}
+    assert attributes["url.path"] == {"stringValue": "/api/user-feature-stats"}
+    assert attributes["http.response.status_code"] == {"intValue": "200"}
+
+
+def test_retries_recorded_as_events(tracer, fetch):
+    """Test that retries become span events and the final failure marks the span as an error."""
+    with pytest.raises(requests.HTTPError):
+        fetch(FaultInjector(error_rate=1.0))
+
+    http_span = next(span for span in tracer.spans if span.name == "HTTP GET")
+    assert [e["name"] for e in http_span.events] == ["retry"]
+    assert http_span.events[0]["attributes"]["attempt"] == 1
+    assert http_span.status_code == 2
+    assert all(span.status_code == 2 for span in tracer.spans)
+
+
+def test_streamed_items_are_yielded_outside_the_fetch_span(tracer, fake_api, http_client):
+    """Test that the caller's spans between streamed items do not nest under fetch_endpoint."""
+    http = http_client(fake_api(SyntheticTenant(50, seed=2)))
+    client = DashboardClient(http.s, http)
+    endpoint = http.s.user_feature_stats_endpoint
+    day = datetime(2025, 10, 22, tzinfo=timezone.utc)
+    with get_tracer().start_span("day"):
+        for _ in client.stream_endpoint_items(endpoint, "userFeatureStats", day, day):
+            with get_tracer().start_span("consume"):
+                pass
+        abandoned = client.stream_endpoint_items(endpoint, "userFeatureStats", day, day)
+        next(abandoned)
+    # Closing from another context must not try to reset a span token set elsewhere
+    contextvars.copy_context().run(abandoned.close)
+
+    day_span = next(span for span in tracer.spans if span.name == "day")
+    fetch = [span for span in tracer.spans if span.name == "fetch_endpoint"]
+    consume = [span for span in tracer.spans if span.name == "consume"]
+    assert len(fetch) == 2 and len(consume) > 10
+    assert {span.parent_span_id for span in fetch + consume} == {day_span.span_id}
+    assert fetch[0].attributes["records"] == len(consume)
+    assert fetch[0].attributes["body.read_seconds"] > 0